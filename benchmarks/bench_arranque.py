@@ -0,0 +1,71 @@
+"""
+Arranque y re-ejecución de la página (calculadora.py) con el ejecutor de
+pruebas de Streamlit, cada repetición en un intérprete nuevo:
+
+- primera ejecución: importaciones de la página, estilos y primer cálculo
+  (lo que espera quien abre la página en un servidor recién levantado);
+- re-ejecución: la misma página otra vez con las mismas entradas (resultados
+  del caché), es decir, el costo fijo de cada interacción;
+- módulos pesados que la página dejó cargados sin que nadie exportara.
+
+Streamlit ya está importado antes de medir, como en el servidor.
+
+Uso: python benchmarks/bench_arranque.py [repeticiones] [reejecuciones]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+PESADOS = ("altair", "jinja2", "jsonschema", "xlsxwriter", "openpyxl", "multiprocessing")
+
+HIJO = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+antes = len(sys.modules)
+app = AppTest.from_file({pagina!r}, default_timeout=300)
+inicio = time.perf_counter()
+app.run()
+primera = time.perf_counter() - inicio
+assert not app.exception, app.exception
+tiempos = []
+for _ in range({reejecuciones}):
+    inicio = time.perf_counter()
+    app.run()
+    tiempos.append(time.perf_counter() - inicio)
+print(json.dumps({{
+    "primera": primera,
+    "reejecucion": sorted(tiempos)[len(tiempos) // 2],
+    "modulos": len(sys.modules) - antes,
+    "pesados": [m for m in {pesados!r} if m in sys.modules],
+}}))
+"""
+
+
+def medir(reejecuciones):
+    codigo = HIJO.format(pagina=str(RAIZ / "calculadora.py"), reejecuciones=reejecuciones, pesados=PESADOS)
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": str(RAIZ)}
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    reejecuciones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    corridas = [medir(reejecuciones) for _ in range(repeticiones)]
+
+    primera = statistics.median(c["primera"] for c in corridas)
+    reejecucion = statistics.median(c["reejecucion"] for c in corridas)
+    print(f"Primera ejecución: {primera * 1000:8.0f} ms  ({corridas[0]['modulos']} módulos importados)")
+    print(f"Re-ejecución:      {reejecucion * 1000:8.0f} ms  (mediana de {reejecuciones} por corrida, {repeticiones} corridas)")
+    print(f"Módulos pesados cargados: {', '.join(corridas[0]['pesados']) or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    main()
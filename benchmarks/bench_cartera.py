@@ -0,0 +1,43 @@
+"""
+Benchmark de la proyección masiva de cartera: genera una cartera sintética
+en CSV y la procesa por bloques, reportando planes por segundo.
+
+Uso: python benchmarks/bench_cartera.py [planes] [mensual|cerrada]
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import procesar_cartera
+
+
+def cartera_sintetica(n_planes, semilla=2025):
+    rng = np.random.default_rng(semilla)
+    es_dolares = rng.random(n_planes) < 0.3
+    return pd.DataFrame({
+        "id": np.arange(1, n_planes + 1),
+        "moneda": np.where(es_dolares, "USD", "CRC"),
+        "fecha_inicio": "2025-01-01",
+        "saldo_inicial": np.where(es_dolares, rng.integers(0, 50_000, n_planes), rng.integers(0, 20_000_000, n_planes)),
+        "aporte_mensual": np.where(es_dolares, rng.integers(10, 500, n_planes), rng.integers(5_000, 300_000, n_planes)),
+        "plazo_anos": rng.integers(1, 51, n_planes),
+    })
+
+
+def main():
+    n_planes = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    metodo = sys.argv[2] if len(sys.argv) > 2 else "mensual"
+    with tempfile.TemporaryDirectory() as tmp:
+        entrada = Path(tmp) / "cartera.csv"
+        cartera_sintetica(n_planes).to_csv(entrada, index=False)
+        stats = procesar_cartera(entrada, Path(tmp) / "resumen.csv", metodo=metodo)
+    print(f"[{metodo}] {stats['planes']:,} planes en {stats['segundos']:.2f} s ({stats['planes_por_segundo']:,.0f} planes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Costo de los cronogramas: el mismo plan de 50 años con tasa, aporte,
+comisión e inflación constantes frente a tasa que baja linealmente, aporte
+indexado al salario, comisión por tramos y curva de inflación. Con
+cronogramas equivalentes a las constantes verifica que el resultado sea
+idéntico.
+
+Uso: python benchmarks/bench_cronogramas.py [repeticiones]
+"""
+import sys
+import timeit
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import proyectar_escenarios
+
+ANOS = 50
+MESES = ANOS * 12
+INICIO = date(2025, 1, 1)
+
+PLANES = {
+    "constantes": dict(tasas=(9.0, 10.0, 17.0), aporte=200_000, comision=10.0, inflacion=3.0),
+    "cronogramas": dict(
+        tasas=({"lineal": {0: 12.0, MESES: 6.0}}, {0: 10.0, 300: 8.0}, 17.0),
+        aporte={"indexado": {"base": 200_000, "crecimiento_anual_pct": 4}},
+        comision={0: 10.0, 120: 8.0, 360: 6.0},
+        inflacion={"lineal": {0: 5.0, MESES: 2.5}},
+    ),
+    "constantes como cronograma": dict(
+        tasas=([9.0] * MESES, {0: 10.0}, {"lineal": {0: 17.0, MESES: 17.0}}),
+        aporte=np.full(MESES + 1, 200_000.0), comision={0: 10.0}, inflacion=[3.0] * MESES,
+    ),
+}
+
+
+def proyectar(tasas, aporte, comision, inflacion):
+    return proyectar_escenarios(tasas, ANOS, aporte, 1_000_000, comision, inflacion, {}, INICIO, False)
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    base = None
+    for nombre, plan in PLANES.items():
+        segundos = min(timeit.repeat(lambda: proyectar(**plan), number=repeticiones, repeat=3)) / repeticiones
+        if base is None:
+            base = segundos
+        print(f"{nombre:<28}{segundos * 1000:7.2f} ms  (x{segundos / base:.2f})")
+
+    constante = proyectar(**PLANES["constantes"])
+    equivalente = proyectar(**PLANES["constantes como cronograma"])
+    iguales = all(np.array_equal(constante[col], equivalente[col]) for col in ("saldo_final", "saldo_real"))
+    print(f"Cronogramas constantes idénticos al caso constante: {'sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Modo exacto (céntimos enteros) frente al motor en float64: compara
+tiempos y termina con error si el modo exacto es más de FACTOR_MAXIMO
+veces más lento que el motor float. La paridad con decimal.Decimal paso a
+paso se verifica en tests/test_exacto.py.
+
+Uso: python benchmarks/bench_exacto.py
+"""
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import proyectar_escenarios
+from motor.exacto import proyectar_escenarios_centimos
+
+FACTOR_MAXIMO = 5.0
+INICIO = date(2025, 1, 15)
+
+
+def cronometrar(funcion, *args, repeticiones=5, **kwargs):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*args, **kwargs)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    plan = (50, 200_000, 1_000_000, 10.0, 3.0, {}, INICIO, False)
+    peor = 0.0
+    for n in (1, 3, 100, 1000):
+        tasas = np.linspace(2, 20, n)
+        t_float = cronometrar(proyectar_escenarios, tasas, *plan)
+        t_exacto = cronometrar(proyectar_escenarios_centimos, tasas, *plan)
+        peor = max(peor, t_exacto / t_float)
+        print(f"{n:>5} escenarios x 50 años: float {t_float * 1000:7.2f} ms, exacto {t_exacto * 1000:7.2f} ms "
+              f"({t_exacto / t_float:.1f}x)")
+
+    if peor > FACTOR_MAXIMO:
+        raise SystemExit(f"El modo exacto es {peor:.1f}x más lento que el motor float (máximo {FACTOR_MAXIMO:g}x)")
+
+
+if __name__ == "__main__":
+    main()
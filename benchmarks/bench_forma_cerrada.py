@@ -0,0 +1,54 @@
+"""
+Motor en forma cerrada frente a la recurrencia mensual: tiempos en una
+cartera sintética y en el barrido de sensibilidad. La paridad entre ambos
+motores se verifica en tests/test_forma_cerrada.py.
+
+Uso: python benchmarks/bench_forma_cerrada.py [planes]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import proyectar_cartera
+from motor.sensibilidad import barrido_parametros
+
+
+
+def error_relativo(valor, referencia):
+    return float(np.nanmax(np.abs(valor - referencia) / np.maximum(np.abs(referencia), 1.0)))
+
+
+def cronometrar(funcion, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    n_planes = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    rng = np.random.default_rng(2025)
+    es_dolares = rng.random(n_planes) < 0.3
+    inicial = np.where(es_dolares, rng.integers(0, 50_000, n_planes), rng.integers(0, 20_000_000, n_planes))
+    aporte = np.where(es_dolares, rng.integers(10, 500, n_planes), rng.integers(5_000, 300_000, n_planes))
+    meses = rng.integers(1, 51, n_planes) * 12
+
+    tiempos = {}
+    for metodo in ("mensual", "cerrada"):
+        res, tiempos[metodo] = cronometrar(proyectar_cartera, inicial, aporte, meses, es_dolares, 10.0, 10.0, 3.0, metodo=metodo)
+        tiempos[metodo, "saldos"] = res["saldo_nominal"]
+    print(f"Cartera de {n_planes:,} planes: mensual {tiempos['mensual']:.2f} s, cerrada {tiempos['cerrada']:.3f} s "
+          f"({tiempos['mensual'] / tiempos['cerrada']:.0f}x, error {error_relativo(tiempos['cerrada', 'saldos'], tiempos['mensual', 'saldos']):.1e})")
+
+    malla = (np.linspace(2, 20, 50), np.linspace(0, 20, 20), np.linspace(0, 10, 20), np.arange(5, 51, 5))
+    for metodo in ("mensual", "cerrada"):
+        _, tiempos[metodo] = cronometrar(barrido_parametros, *malla, 200_000, 1_000_000, {}, False, metodo=metodo)
+    print(f"Barrido 50x20x20x10: mensual {tiempos['mensual'] * 1000:.0f} ms, cerrada {tiempos['cerrada'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Tamaño y tiempos de escritura/lectura de la tabla detallada en CSV, XLSX,
+Parquet y Arrow IPC para un plan con varios escenarios.
+
+Uso: python benchmarks/bench_formatos.py [plazo_anos] [escenarios]
+"""
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import calcular_escenarios
+from motor.columnar import escribir_arrow_detalle, escribir_parquet_detalle, leer_columnar
+from motor.exportar import escribir_csv, escribir_excel
+
+
+def escribir_csv_todos(ruta, proyecciones):
+    with open(ruta, "wb") as f:
+        for n, (nombre, proyeccion) in enumerate(proyecciones.items()):
+            escribir_csv(f, proyeccion, {"Escenario": nombre}, encabezado=n == 0)
+
+
+FORMATOS = {
+    "csv": (escribir_csv_todos, lambda ruta: pd.read_csv(ruta, parse_dates=["Fecha"])),
+    "xlsx": (escribir_excel, lambda ruta: pd.read_excel(ruta, sheet_name=None)),
+    "parquet": (escribir_parquet_detalle, lambda ruta: leer_columnar(ruta).to_pandas()),
+    "arrow": (escribir_arrow_detalle, lambda ruta: leer_columnar(ruta).to_pandas()),
+}
+
+
+def cronometrar(funcion, *args):
+    t = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - t
+
+
+def main():
+    anos = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    n_escenarios = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    tasas = tuple(np.linspace(4, 18, n_escenarios))
+    resultados = calcular_escenarios(tasas, anos, 200_000, 1_000_000, 10, 3, None, date(2025, 1, 31), False)
+    proyecciones = {f"Tasa {t:.2f}%": res["proyeccion"] for t, res in zip(tasas, resultados)}
+    filas = sum(len(p["saldo_final"]) for p in proyecciones.values())
+
+    print(f"{n_escenarios} escenarios x {anos} años = {filas:,} filas")
+    print(f"{'formato':<9}{'tamaño':>12}{'escritura':>12}{'lectura':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for formato, (escribir, leer) in FORMATOS.items():
+            ruta = Path(tmp) / f"detalle.{formato}"
+            t_escritura = cronometrar(escribir, ruta, proyecciones)
+            t_lectura = cronometrar(leer, ruta)
+            print(f"{formato:<9}{ruta.stat().st_size / 1024:>9,.0f} KB{t_escritura * 1000:>9,.0f} ms{t_lectura * 1000:>9,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
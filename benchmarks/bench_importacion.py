@@ -0,0 +1,41 @@
+"""
+Tiempo de importación en frío del núcleo `motor` frente al arranque de la
+app (Streamlit + pandas). Cada medición corre en un intérprete nuevo.
+
+Uso: python benchmarks/bench_importacion.py [repeticiones]
+"""
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+CASOS = {
+    "motor": "import motor",
+    "motor + proyección": "import motor; from datetime import date; motor.calcular_escenarios((10.0,), 30, 200, 0, 10, 3, None, date(2025, 1, 1), False)",
+    "streamlit + pandas": "import streamlit, pandas",
+}
+
+PLANTILLA = "import time; t = time.perf_counter(); {codigo}; print(time.perf_counter() - t)"
+
+
+def medir(codigo, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", PLANTILLA.format(codigo=codigo)],
+            cwd=RAIZ, capture_output=True, text=True, check=True
+        )
+        tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+    return statistics.median(tiempos)
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for nombre, codigo in CASOS.items():
+        print(f"{nombre:<22} {medir(codigo, repeticiones) * 1000:8.1f} ms (mediana de {repeticiones})")
+
+
+if __name__ == "__main__":
+    main()
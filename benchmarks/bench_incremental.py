@@ -0,0 +1,41 @@
+"""
+Latencia de edición interactiva: recálculo completo frente a reanudar
+desde el primer mes afectado (nuevo abono en el mes 240 de un plan de 360
+meses, extensión del plazo y cambio de inflación).
+
+Uso: python benchmarks/bench_incremental.py [repeticiones]
+"""
+import sys
+import timeit
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import proyectar_escenarios
+
+TASAS = (9.0, 10.0, 17.0)
+INICIO = date(2025, 1, 1)
+
+EDICIONES = {
+    "abono en el mes 240": dict(anos=30, inflacion_pct=3.0, abonos_map={240: 500_000}),
+    "plazo 30 -> 35 años": dict(anos=35, inflacion_pct=3.0, abonos_map={}),
+    "inflación 3% -> 4%": dict(anos=30, inflacion_pct=4.0, abonos_map={}),
+}
+
+
+def proyectar(anos, inflacion_pct, abonos_map, previo=None):
+    return proyectar_escenarios(TASAS, anos, 50_000, 1_000_000, 10.0, inflacion_pct, abonos_map, INICIO, False, previo=previo)
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    base = proyectar(30, 3.0, {})
+    for nombre, edicion in EDICIONES.items():
+        completo = timeit.timeit(lambda: proyectar(**edicion), number=repeticiones) / repeticiones
+        incremental = timeit.timeit(lambda: proyectar(**edicion, previo=base), number=repeticiones) / repeticiones
+        print(f"{nombre:<22} completo {completo * 1000:6.2f} ms  incremental {incremental * 1000:6.2f} ms  (x{completo / incremental:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Benchmark del modo Monte Carlo: 100k trayectorias x 600 meses en un núcleo.
+
+Uso: python benchmarks/bench_montecarlo.py [trayectorias] [años]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import simular_montecarlo
+
+
+def main():
+    n_trayectorias = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    anos = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    inicio = time.perf_counter()
+    res = simular_montecarlo(10.0, 8.0, n_trayectorias, anos, 200, 1000, 10.0, 3.0, {}, False, semilla=2025)
+    duracion = time.perf_counter() - inicio
+
+    p5, p50, p95 = res["bandas_nominales"][:, -1]
+    print(f"{n_trayectorias:,} trayectorias x {anos * 12} meses: {duracion:.2f} s "
+          f"({n_trayectorias * anos * 12 / duracion / 1e6:.1f} M trayectoria-mes/s)")
+    print(f"Saldo final P5={p5:,.0f} P50={p50:,.0f} P95={p95:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Escalamiento del backend de procesos: Monte Carlo y la proyección de la
+cartera con 1..N procesos.
+
+Verifica además que el resultado sea idéntico para cualquier número de
+procesos. Uso: python benchmarks/bench_paralelo.py [trayectorias] [max_procesos] [planes]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import procesos_disponibles, proyectar_cartera, simular_montecarlo
+
+
+def escalar(nombre, calcular, max_procesos):
+    referencia = None
+    base = None
+    n = 1
+    while n <= max_procesos:
+        inicio = time.perf_counter()
+        saldos = calcular(n)
+        duracion = time.perf_counter() - inicio
+        base = base or duracion
+        if referencia is None:
+            referencia = saldos
+        identico = np.array_equal(referencia, saldos)
+        print(f"{nombre}, {n:>3} procesos: {duracion:6.2f} s  aceleración x{base / duracion:4.1f}  idéntico={identico}")
+        n *= 2
+
+
+def main():
+    n_trayectorias = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    max_procesos = int(sys.argv[2]) if len(sys.argv) > 2 else procesos_disponibles()
+    n_planes = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+
+    escalar("Monte Carlo", lambda n: simular_montecarlo(
+        10.0, 8.0, n_trayectorias, 50, 200, 1000, 10.0, 3.0, {}, False, semilla=2025, n_procesos=n
+    )["saldo_final"], max_procesos)
+
+    rng = np.random.default_rng(2025)
+    es_dolares = rng.random(n_planes) < 0.3
+    inicial = np.where(es_dolares, rng.integers(0, 50_000, n_planes), rng.integers(0, 20_000_000, n_planes))
+    aporte = np.where(es_dolares, rng.integers(10, 500, n_planes), rng.integers(5_000, 300_000, n_planes))
+    meses = rng.integers(1, 51, n_planes) * 12
+    escalar("Cartera", lambda n: proyectar_cartera(
+        inicial, aporte, meses, es_dolares, 10.0, 10.0, 3.0, n_procesos=n
+    )["saldo_nominal"], max_procesos)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Tabla de retiro máximo sostenible (motor.retiro): montos críticos por
+trayectoria con Newton salvaguardado frente a bisecar el monto con
+simulaciones completas para cada horizonte y confianza. Verifica además
+que el monto reportado no supere el riesgo de ruina de su confianza.
+
+Uso: python benchmarks/bench_retiro.py [trayectorias] [pasos_biseccion]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor.retiro import CONFIANZAS, retiro_sostenible, simular_retiro
+
+SALDO = 150_000_000
+HORIZONTES = (10, 20, 30, 40)
+PARAMETROS = (7.0, 8.0)
+FIJOS = (10.0, 3.0, False)
+
+
+def ruina(monto, anos, n):
+    return simular_retiro(SALDO, anos, monto, *PARAMETROS, n, *FIJOS, semilla=2025)["prob_ruina"][0]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    pasos = int(sys.argv[2]) if len(sys.argv) > 2 else 14
+
+    retiro_sostenible(SALDO, HORIZONTES, *PARAMETROS, 200, *FIJOS, semilla=2025)  # calentamiento
+    sostenible = retiro_sostenible(SALDO, HORIZONTES, *PARAMETROS, n, *FIJOS, semilla=2025)
+    print(f"{n} trayectorias x {len(HORIZONTES)} horizontes: {sostenible['segundos'] * 1000:.0f} ms "
+          f"({sostenible['pasadas']} pasadas), {len(CONFIANZAS)} confianzas")
+
+    # Bisección del monto con simulaciones completas (un horizonte y una confianza a la vez)
+    inicio = time.perf_counter()
+    anos, confianza = HORIZONTES[-1], CONFIANZAS[-1]
+    abajo, arriba = 0.0, SALDO / (anos * 12) * 4
+    for _ in range(pasos):
+        medio = (abajo + arriba) / 2
+        if ruina(medio, anos, n) <= 1 - confianza:
+            abajo = medio
+        else:
+            arriba = medio
+    t_celda = time.perf_counter() - inicio
+    t_biseccion = t_celda * len(HORIZONTES) * len(CONFIANZAS)
+    print(f"Bisección con {pasos} simulaciones por celda (estimado): {t_biseccion:.1f} s "
+          f"({t_biseccion / sostenible['segundos']:.0f}x), precisión {(arriba - abajo) / abajo:.1e} relativa")
+
+    maximo = sostenible["retiro_maximo"][-1, -1]
+    print(f"{anos} años al {confianza:.0%}: {maximo:,.0f} (bisección {abajo:,.0f})")
+
+    peor = 0.0
+    for h, anos in enumerate(HORIZONTES):
+        for c, confianza in enumerate(CONFIANZAS):
+            monto = sostenible["retiro_maximo"][h, c]
+            exceso = ruina(monto, anos, n) - (1 - confianza)
+            peor = max(peor, exceso)
+    print(f"Riesgo simulado en el monto reportado: máximo exceso sobre 1 - confianza {peor:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
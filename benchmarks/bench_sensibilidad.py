@@ -0,0 +1,52 @@
+"""
+Benchmark del barrido de sensibilidad: malla tasa x comisión x inflación x
+plazo (por defecto 50 x 20 x 20 x 10 = 200k combinaciones) frente a llamar
+calcular_escenario_completo por combinación (estimado con una muestra).
+
+Uso: python benchmarks/bench_sensibilidad.py [tasas] [comisiones] [inflaciones] [plazos]
+"""
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import calcular_escenario_completo
+from motor.sensibilidad import barrido_parametros
+
+MUESTRA_REFERENCIA = 50
+
+
+def main():
+    n_tasas, n_comisiones, n_inflaciones, n_plazos = (
+        [int(v) for v in sys.argv[1:5]] if len(sys.argv) > 4 else (50, 20, 20, 10)
+    )
+    tasas = np.linspace(2, 20, n_tasas)
+    comisiones = np.linspace(0, 20, n_comisiones)
+    inflaciones = np.linspace(0, 10, n_inflaciones)
+    plazos = np.linspace(5, 50, n_plazos).astype(int)
+    combinaciones = n_tasas * n_comisiones * n_inflaciones * n_plazos
+
+    inicio = time.perf_counter()
+    barrido = barrido_parametros(tasas, comisiones, inflaciones, plazos, 200_000, 1_000_000, {}, False)
+    duracion = time.perf_counter() - inicio
+    print(f"Barrido {n_tasas}x{n_comisiones}x{n_inflaciones}x{n_plazos} = {combinaciones:,} combinaciones: "
+          f"{duracion * 1000:.0f} ms ({combinaciones / duracion:,.0f} combinaciones/s)")
+
+    rng = np.random.default_rng(2025)
+    inicio = time.perf_counter()
+    for _ in range(MUESTRA_REFERENCIA):
+        t, c, i, p = (rng.integers(n) for n in barrido["saldo_real"].shape)
+        res = calcular_escenario_completo(tasas[t], int(barrido["plazo_anos"][p]), 200_000, 1_000_000,
+                                          comisiones[c], inflaciones[i], None, date.today(), False)
+        assert np.isclose(res["saldo_real"], barrido["saldo_real"][t, c, i, p])
+    por_combinacion = (time.perf_counter() - inicio) / MUESTRA_REFERENCIA
+    print(f"Una llamada por combinación: {1 / por_combinacion:,.0f} combinaciones/s "
+          f"(~{por_combinacion * combinaciones:,.0f} s para toda la malla)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Extracción de series para gráficos: listas por comprensión (como antes en
+la app) frente a motor.series, en resolución anual, mensual y automática
+(LTTB), incluidas las bandas de Monte Carlo registradas mes a mes.
+
+Uso: python benchmarks/bench_series.py [repeticiones]
+"""
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor import calcular_escenarios, simular_montecarlo
+from motor.series import tabla_grafico
+
+
+def cronometrar(funcion, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    anos = 50
+    resultados = calcular_escenarios((9.0, 10.0, 17.0), anos, 200_000, 1_000_000, 10, 3, None, date(2025, 1, 15), False)
+    nombres = ("Conservador", "Moderado", "Optimista")
+    series = {nombre: res["serie_nominal"] for nombre, res in zip(nombres, resultados)}
+
+    def listas():
+        datos = pd.DataFrame()
+        for nombre, res in zip(nombres, resultados):
+            datos[nombre] = [res["serie_nominal"][i*12] for i in range(anos + 1)]
+        return datos
+
+    casos = {
+        "listas (anual)": listas,
+        "tabla_grafico anual": lambda: tabla_grafico(series),
+        "tabla_grafico mensual": lambda: tabla_grafico(series, resolucion="mensual"),
+        "tabla_grafico automática": lambda: tabla_grafico(series, resolucion="automatica"),
+    }
+    for nombre, funcion in casos.items():
+        datos, segundos = cronometrar(funcion, repeticiones)
+        print(f"{nombre:<28}{segundos * 1000:>8.3f} ms  {len(datos):>5} puntos")
+
+    mc = simular_montecarlo(10.0, 8.0, 10_000, anos, 200_000, 0, 10, 3, {}, False, semilla=2025, paso_meses=1)
+    bandas = {f"P{p}": banda for p, banda in zip(mc["percentiles"], mc["bandas_nominales"])}
+    datos, segundos = cronometrar(lambda: tabla_grafico(bandas, meses=mc["meses"], resolucion="automatica"), repeticiones)
+    print(f"{'bandas Monte Carlo LTTB':<28}{segundos * 1000:>8.3f} ms  {len(datos):>5} de {len(mc['meses'])} puntos")
+
+
+if __name__ == "__main__":
+    main()
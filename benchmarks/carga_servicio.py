@@ -0,0 +1,182 @@
+"""
+Prueba de carga local del servicio de proyecciones (motor.servicio).
+
+Levanta el servicio en un subproceso (o usa --url de uno ya levantado),
+abre --conexiones clientes concurrentes que envían --solicitudes en total
+y reporta latencias p50/p90/p99, solicitudes por segundo, errores y las
+estadísticas del servicio (cálculos, solicitudes unidas, caché).
+
+Una fracción --repetidas de las solicitudes usa planes de un conjunto
+pequeño (para ejercitar la unión de solicitudes en curso y el caché); el
+resto son planes distintos. Por defecto cada cliente reutiliza su conexión
+(keep-alive); --sin-reuso abre una conexión por solicitud para comparar.
+
+Uso:
+    python benchmarks/carga_servicio.py
+    python benchmarks/carga_servicio.py --conexiones 64 --solicitudes 5000 --ruta /v1/resumen
+    python benchmarks/carga_servicio.py --url http://127.0.0.1:8080 --sin-reuso
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def plan_sintetico(rng, distinto):
+    """
+    Plan de prueba: uno de 8 planes fijos o uno aleatorio distinto.
+    """
+    semilla = int(rng.integers(0, 2**31)) if distinto else int(rng.integers(0, 8))
+    r = np.random.default_rng(semilla)
+    return {
+        "moneda": "USD" if r.random() < 0.3 else "CRC",
+        "fecha_inicio": "2025-01-15",
+        "saldo_inicial": int(r.integers(0, 5_000_000)),
+        "aporte_mensual": int(r.integers(100, 300_000)),
+        "plazo_anos": int(r.integers(5, 51)),
+        "inflacion_pct": 3.0,
+        "comision_pct": 10.0,
+    }
+
+
+async def solicitar(lector, escritor, host, ruta, cuerpo, mantener):
+    escritor.write(
+        f"POST {ruta} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(cuerpo)}\r\nConnection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode("latin-1")
+        + cuerpo
+    )
+    await escritor.drain()
+    estado = int((await lector.readline()).split()[1])
+    largo = 0
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        if nombre.strip().lower() == "content-length":
+            largo = int(valor)
+    await lector.readexactly(largo)
+    return estado
+
+
+async def cliente(host, puerto, ruta, cuerpos, reusar, latencias, errores):
+    conexion = None
+    for cuerpo in cuerpos:
+        inicio = time.perf_counter()
+        try:
+            if conexion is None:
+                conexion = await asyncio.open_connection(host, puerto)
+            estado = await solicitar(*conexion, host, ruta, cuerpo, reusar)
+            if estado != 200:
+                errores.append(estado)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+            errores.append(type(e).__name__)
+            conexion = None
+            continue
+        latencias.append(time.perf_counter() - inicio)
+        if not reusar:
+            conexion[1].close()
+            conexion = None
+    if conexion is not None:
+        conexion[1].close()
+
+
+async def obtener_json(host, puerto, ruta):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    escritor.write(f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    await escritor.drain()
+    respuesta = await lector.read()
+    escritor.close()
+    return json.loads(respuesta.split(b"\r\n\r\n", 1)[1])
+
+
+async def cargar(args, host, puerto):
+    rng = np.random.default_rng(2025)
+    cuerpos = [
+        json.dumps(plan_sintetico(rng, distinto=rng.random() >= args.repetidas)).encode("utf-8")
+        for _ in range(args.solicitudes)
+    ]
+    # Calentamiento: procesos del pool e importaciones
+    await cliente(host, puerto, args.ruta, cuerpos[:args.conexiones], True, [], [])
+
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(host, puerto, args.ruta, cuerpos[k::args.conexiones], not args.sin_reuso, latencias, errores)
+        for k in range(args.conexiones)
+    ))
+    segundos = time.perf_counter() - inicio
+    return latencias, errores, segundos, await obtener_json(host, puerto, "/salud")
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar_puerto(host, puerto, segundos=30):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        try:
+            socket.create_connection((host, puerto), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"El servicio no respondió en {host}:{puerto}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de proyecciones.")
+    parser.add_argument("--url", help="Servicio ya levantado (por defecto se levanta uno local)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del servicio local")
+    parser.add_argument("--ruta", default="/v1/proyeccion", help="Ruta a cargar. Por defecto /v1/proyeccion")
+    parser.add_argument("--conexiones", type=int, default=32, help="Clientes concurrentes. Por defecto 32")
+    parser.add_argument("--solicitudes", type=int, default=2_000, help="Solicitudes en total. Por defecto 2000")
+    parser.add_argument("--repetidas", type=float, default=0.5, help="Fracción de planes repetidos. Por defecto 0.5")
+    parser.add_argument("--sin-reuso", action="store_true", help="Una conexión nueva por solicitud")
+    args = parser.parse_args(argv)
+
+    proceso = None
+    if args.url:
+        url = urlparse(args.url)
+        host, puerto = url.hostname, url.port or 80
+    else:
+        host, puerto = "127.0.0.1", puerto_libre()
+        comando = [sys.executable, "-m", "motor.servicio", "--host", host, "--puerto", str(puerto)]
+        if args.procesos:
+            comando += ["--procesos", str(args.procesos)]
+        proceso = subprocess.Popen(comando, cwd=RAIZ, env={**os.environ, "PYTHONPATH": str(RAIZ)},
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        esperar_puerto(host, puerto)
+        latencias, errores, segundos, salud = asyncio.run(cargar(args, host, puerto))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    ms = np.array(latencias) * 1000
+    print(f"{args.solicitudes:,} solicitudes a {args.ruta} con {args.conexiones} conexiones "
+          f"({'sin reuso' if args.sin_reuso else 'keep-alive'}, {args.repetidas:.0%} repetidas)")
+    if len(ms):
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        print(f"  {len(ms) / segundos:,.0f} solicitudes/s   p50 {p50:.1f} ms   p90 {p90:.1f} ms   p99 {p99:.1f} ms   máx {ms.max():.1f} ms")
+    print(f"  errores: {len(errores)}" + (f" ({', '.join(map(str, sorted(set(map(str, errores)))))})" if errores else ""))
+    print(f"  servicio: {salud['calculos']:,} cálculos, {salud['unidas']:,} unidas a uno en curso, "
+          f"caché {salud['cache']['aciertos']:,} aciertos / {salud['cache']['fallos']:,} fallos")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Suite de benchmarks del motor con historial y control de regresiones.
+
+Mide tiempo (mejor de varias repeticiones) y pico de memoria (tracemalloc)
+de cargas representativas: plazos de 1 a 50 años, CRC y USD, 3 a 1000
+escenarios, 0 a 5000 abonos, bonificación, exportación CSV/XLSX, cartera y
+Monte Carlo. Cada corrida se compara con la mediana de las últimas
+corridas guardadas en el historial para la misma máquina; si algún caso
+empeora más que el umbral, termina con código 1.
+
+Uso:
+    python benchmarks/suite.py                 # medir y comparar
+    python benchmarks/suite.py --guardar       # además, agregar al historial
+    python benchmarks/suite.py --casos abonos  # sólo los casos que contienen "abonos"
+    python benchmarks/suite.py --umbral 0.1 --historial otro.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from motor import (
+    backtesting, calcular_escenario_completo, calcular_escenarios, obtener_tasa_bonificacion, procesar_abonos,
+    proyectar_cartera, retiro_sostenible, simular_montecarlo, tasas_bonificacion
+)
+from motor.exportar import escribir_csv, escribir_excel
+
+HISTORIAL = Path(__file__).resolve().parent / "historial.json"
+
+# Un caso se considera regresión si su tiempo (o su pico de memoria) supera
+# al de referencia en más de esta fracción
+UMBRAL = 0.25
+
+# Tiempo mínimo acumulado por caso; se toma el mejor de las repeticiones
+SEGUNDOS_MINIMOS = 0.5
+MIN_REPETICIONES = 3
+
+# Corridas previas (de la misma máquina) que forman la referencia
+CORRIDAS_REFERENCIA = 3
+
+# Los casos que parecen empeorar se vuelven a medir (se conserva el mejor)
+# antes de reportarlos, para no fallar por ruido de la máquina
+REINTENTOS = 2
+
+# Debajo de estos valores la variación es ruido y no cuenta como regresión
+RUIDO_SEGUNDOS = 0.002
+RUIDO_MB = 1.0
+
+INICIO = date(2025, 1, 15)
+
+
+def abonos_sinteticos(n_abonos, anos, semilla=2025):
+    """
+    Tabla de abonos como la del editor de la app: fechas en texto
+    DD/MM/AAAA dentro del plazo y montos con separador de miles.
+    """
+    rng = np.random.default_rng(semilla)
+    dias = rng.integers(0, anos * 365, n_abonos)
+    fechas = pd.Timestamp(INICIO) + pd.to_timedelta(dias, unit="D")
+    return pd.DataFrame({
+        "Fecha": fechas.strftime("%d/%m/%Y"),
+        "Monto": [f"{m:,}" for m in rng.integers(1_000, 500_000, n_abonos)],
+    })
+
+
+def casos():
+    """
+    Diccionario nombre -> función sin argumentos a medir.
+    """
+    c = {}
+    for anos in (1, 10, 30, 50):
+        c[f"escenario/{anos}a_crc"] = lambda anos=anos: calcular_escenario_completo(10.0, anos, 200_000, 1_000_000, 10, 3, None, INICIO, False)
+    c["escenario/50a_usd"] = lambda: calcular_escenario_completo(10.0, 50, 300, 2_000, 10, 3, None, INICIO, True)
+    c["escenario/50a_crc_exacto"] = lambda: calcular_escenario_completo(10.0, 50, 200_000, 1_000_000, 10, 3, None, INICIO, False, exacto=True)
+    c["escenario/50a_crc_cronogramas"] = lambda: calcular_escenario_completo(
+        {"lineal": {0: 12.0, 600: 6.0}}, 50, {"indexado": {"base": 200_000, "crecimiento_anual_pct": 4}}, 1_000_000,
+        {0: 10.0, 120: 8.0}, {"lineal": {0: 5.0, 600: 2.5}}, None, INICIO, False)
+
+    for n in (3, 100, 1000):
+        tasas = tuple(np.linspace(2, 20, n))
+        c[f"escenarios/{n}x30a"] = lambda tasas=tasas: calcular_escenarios(tasas, 30, 200_000, 1_000_000, 10, 3, None, INICIO, False)
+
+    c["bonificacion/escalar_10k"] = lambda: [obtener_tasa_bonificacion(m % 120, m * 1_000.0) for m in range(10_000)]
+    meses, saldos = np.arange(1_000_000) % 600, np.linspace(0, 2e8, 1_000_000)
+    c["bonificacion/vector_1M"] = lambda: tasas_bonificacion(meses, saldos)
+
+    for n in (0, 100, 5000):
+        df = abonos_sinteticos(n, 30)
+        c[f"abonos/procesar_{n}"] = lambda df=df: procesar_abonos(df, INICIO, 30)
+    df_5000 = abonos_sinteticos(5000, 30)
+    c["abonos/escenario_5000"] = lambda: calcular_escenario_completo(10.0, 30, 200_000, 0, 10, 3, df_5000, INICIO, False)
+
+    proyeccion = calcular_escenario_completo(10.0, 50, 200_000, 1_000_000, 10, 3, None, INICIO, False)["proyeccion"]
+    c["exportar/csv_50a"] = lambda: escribir_csv(io.BytesIO(), proyeccion)
+    c["exportar/xlsx_50a"] = lambda: escribir_excel(io.BytesIO(), {"Proyeccion": proyeccion})
+
+    rng = np.random.default_rng(2025)
+    n_planes = 20_000
+    es_dolares = rng.random(n_planes) < 0.3
+    cartera = (
+        np.where(es_dolares, rng.integers(0, 50_000, n_planes), rng.integers(0, 20_000_000, n_planes)),
+        np.where(es_dolares, rng.integers(10, 500, n_planes), rng.integers(5_000, 300_000, n_planes)),
+        rng.integers(1, 51, n_planes) * 12, es_dolares,
+    )
+    for metodo in ("mensual", "cerrada"):
+        c[f"cartera/20k_{metodo}"] = lambda metodo=metodo: proyectar_cartera(*cartera, 10.0, 10.0, 3.0, metodo=metodo)
+
+    serie = {
+        "fechas": np.datetime64("1950-01", "M") + np.arange(1_200),
+        "rendimiento": rng.normal(0.008, 0.02, 1_200),
+        "inflacion": rng.normal(0.003, 0.002, 1_200),
+    }
+    c["historico/601v_x_50a"] = lambda: backtesting(serie, 50, 200_000, 1_000_000, 10, {}, False)
+
+    c["montecarlo/10k_x_30a"] = lambda: simular_montecarlo(10.0, 8.0, 10_000, 30, 200_000, 0, 10, 3, {}, False, semilla=2025)
+    c["retiro/sostenible_2000x30a"] = lambda: retiro_sostenible(150_000_000, (10, 20, 30), 7.0, 8.0, 2_000, 10, 3, False, semilla=2025)
+    return c
+
+
+def medir(funcion):
+    """
+    Mejor tiempo de varias repeticiones y pico de memoria (MB) de una
+    ejecución aparte con tracemalloc (que enlentece, por eso no se cronometra).
+    """
+    tiempos = []
+    total = time.perf_counter()
+    while len(tiempos) < MIN_REPETICIONES or time.perf_counter() - total < SEGUNDOS_MINIMOS:
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"segundos": min(tiempos), "pico_mb": pico / 1024**2, "repeticiones": len(tiempos)}
+
+
+def maquina():
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}|{platform.python_version()}|numpy {np.__version__}"
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def leer_historial(ruta):
+    if not ruta.exists():
+        return []
+    return json.loads(ruta.read_text(encoding="utf-8"))
+
+
+def referencia_de(previas):
+    """
+    Mediana por caso de las últimas CORRIDAS_REFERENCIA corridas, para que
+    una corrida previa con suerte (o con ruido) no fije la vara.
+    """
+    ultimas = previas[-CORRIDAS_REFERENCIA:]
+    nombres = {nombre for corrida in ultimas for nombre in corrida["resultados"]}
+    resultados = {}
+    for nombre in nombres:
+        medidas = [corrida["resultados"][nombre] for corrida in ultimas if nombre in corrida["resultados"]]
+        resultados[nombre] = {
+            "segundos": float(np.median([m["segundos"] for m in medidas])),
+            "pico_mb": float(np.median([m["pico_mb"] for m in medidas])),
+        }
+    return {"commit": ultimas[-1]["commit"], "fecha": ultimas[-1]["fecha"], "corridas": len(ultimas), "resultados": resultados}
+
+
+def regresiones(resultados, referencia, umbral):
+    """
+    Casos que empeoran más que `umbral` respecto de la corrida de
+    referencia, en tiempo o en pico de memoria.
+    """
+    encontradas = []
+    for nombre, actual in resultados.items():
+        previo = referencia["resultados"].get(nombre)
+        if previo is None:
+            continue
+        if actual["segundos"] > previo["segundos"] * (1 + umbral) and actual["segundos"] - previo["segundos"] > RUIDO_SEGUNDOS:
+            encontradas.append(f"{nombre}: tiempo {previo['segundos'] * 1000:.1f} -> {actual['segundos'] * 1000:.1f} ms")
+        if actual["pico_mb"] > previo["pico_mb"] * (1 + umbral) and actual["pico_mb"] - previo["pico_mb"] > RUIDO_MB:
+            encontradas.append(f"{nombre}: memoria {previo['pico_mb']:.1f} -> {actual['pico_mb']:.1f} MB")
+    return encontradas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del motor con historial y control de regresiones.")
+    parser.add_argument("--casos", default="", help="Sólo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--guardar", action="store_true", help="Agregar la corrida al historial")
+    parser.add_argument("--historial", type=Path, default=HISTORIAL, help=f"Archivo JSON del historial (por defecto {HISTORIAL.name})")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help=f"Empeoramiento tolerado (fracción). Por defecto {UMBRAL}")
+    args = parser.parse_args(argv)
+
+    seleccion = {nombre: f for nombre, f in casos().items() if args.casos in nombre}
+    resultados = {}
+    for nombre, funcion in seleccion.items():
+        resultados[nombre] = medir(funcion)
+        r = resultados[nombre]
+        print(f"{nombre:<28}{r['segundos'] * 1000:>10.2f} ms{r['pico_mb']:>10.1f} MB  ({r['repeticiones']} rep.)")
+
+    historial = leer_historial(args.historial)
+    esta_maquina = maquina()
+    previas = [corrida for corrida in historial if corrida["maquina"] == esta_maquina]
+    codigo = 0
+    if previas:
+        referencia = referencia_de(previas)
+        encontradas = regresiones(resultados, referencia, args.umbral)
+        for _ in range(REINTENTOS):
+            if not encontradas:
+                break
+            for nombre in {linea.split(":")[0] for linea in encontradas}:
+                nuevo = medir(seleccion[nombre])
+                resultados[nombre] = {
+                    "segundos": min(nuevo["segundos"], resultados[nombre]["segundos"]),
+                    "pico_mb": min(nuevo["pico_mb"], resultados[nombre]["pico_mb"]),
+                    "repeticiones": resultados[nombre]["repeticiones"] + nuevo["repeticiones"],
+                }
+            encontradas = regresiones(resultados, referencia, args.umbral)
+        if encontradas:
+            print(f"\nRegresiones frente a {referencia['commit'] or '?'} ({referencia['fecha']}, mediana de "
+                  f"{referencia['corridas']} corridas), umbral {args.umbral:.0%}:")
+            for linea in encontradas:
+                print(f"  {linea}")
+            codigo = 1
+        else:
+            print(f"\nSin regresiones frente a {referencia['commit'] or '?'} ({referencia['fecha']}, mediana de "
+                  f"{referencia['corridas']} corridas).")
+    else:
+        print("\nSin corridas previas en esta máquina para comparar.")
+
+    if args.guardar:
+        historial.append({
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_actual(),
+            "maquina": esta_maquina,
+            "resultados": resultados,
+        })
+        args.historial.write_text(json.dumps(historial, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Corrida guardada en {args.historial}")
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
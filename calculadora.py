@@ -1,9 +1,25 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import date, datetime, timedelta
-import textwrap
-import io # Necesario para manejar el archivo Excel en memoria
+from datetime import date, timedelta
+import importlib.util
+import hashlib
+import io # Archivos subidos en memoria
+import os
+
+from motor import (
+    EJES_BARRIDO, CacheResultados, backtesting, barrido_parametros, calcular_escenarios, construir_df_detalle,
+    corte_barrido, huella_plan, leer_archivo_abonos, leer_serie_historica, parsear_montos, procesar_abonos,
+    prob_ruina_de_monto, resolver_meta, retiro_sostenible, simular_montecarlo, simular_retiro, tabla_barrido,
+    tabla_sostenible, tabla_ventanas
+)
+from motor.exportar import a_archivo_temporal, escribir_csv, escribir_excel
+from motor.instrumentacion import MedicionEjecucion, configurar_logs, escribir_metricas, medir_tramo
+from motor.series import PUNTOS_GRAFICO, paso_montecarlo, tabla_grafico
+from interfaz import (
+    CABECERA, LEYENDA_ESCENARIOS_HTML, NOTA_EXPORTACION_HTML, PLANTILLA_INFLACION, RESULTADOS_HTML, grafico_histograma,
+    grafico_lineas, grafico_mapa_calor, tarjeta_html
+)
 
 # --- CONFIGURACIÓN DE LA PÁGINA ---
 st.set_page_config(
@@ -12,215 +28,30 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- DATOS DE NEGOCIO: MATRIZ DE BONIFICACIÓN BN VITAL (BIMONETARIA) ---
-def obtener_tasa_bonificacion(meses_antiguedad, saldo_acumulado, es_dolares=False):
-    """
-    Calcula el % de bonificación basándose en la antigüedad y el saldo.
-    Soporta lógica diferenciada para Colones y Dólares.
-    """
-    # 1. Definir COLUMNA (Eje Tiempo - Igual para ambas monedas)
-    if meses_antiguedad < 24:
-        col_idx = 0 # 1 a < 24 meses
-    elif meses_antiguedad < 48:
-        col_idx = 1 # 24 a < 48 meses
-    elif meses_antiguedad < 72:
-        col_idx = 2 # 48 a < 72 meses
-    elif meses_antiguedad < 96:
-        col_idx = 3 # 72 a < 96 meses
-    else:
-        col_idx = 4 # 96 meses o más
-
-    # 2. Definir FILA (Eje Saldo - Diferente según moneda)
-    porcentajes = [0.0] * 5 # Valor por defecto
-
-    if not es_dolares:
-        # --- TABLA COLONES (CRC) ---
-        if saldo_acumulado < 1000000:
-            porcentajes = [0.0, 1.00, 2.50, 4.50, 6.00]
-        elif saldo_acumulado < 2000000:
-            porcentajes = [1.00, 2.50, 4.00, 6.00, 8.00]
-        elif saldo_acumulado < 5000000:
-            porcentajes = [2.00, 4.50, 6.00, 8.00, 12.00]
-        elif saldo_acumulado < 10000000:
-            porcentajes = [3.00, 6.50, 9.00, 12.00, 15.00]
-        elif saldo_acumulado < 50000000:
-            porcentajes = [5.50, 8.50, 12.00, 15.00, 18.00]
-        elif saldo_acumulado < 100000000:
-            porcentajes = [7.50, 10.50, 15.00, 18.00, 21.00]
-        else: # > 100 Millones
-            porcentajes = [9.50, 12.50, 18.00, 21.00, 25.00]
-    else:
-        # --- TABLA DÓLARES (USD) ---
-        # Basado en la tabla Fondo Dólares B proporcionada
-        if saldo_acumulado < 2000:
-            porcentajes = [0.0, 1.00, 2.50, 4.50, 6.00]
-        elif saldo_acumulado < 4000:
-            porcentajes = [1.00, 2.50, 4.00, 6.00, 8.00]
-        elif saldo_acumulado < 10000:
-            porcentajes = [2.00, 4.50, 6.00, 8.00, 12.00]
-        elif saldo_acumulado < 20000:
-            porcentajes = [3.00, 6.50, 9.00, 12.00, 15.00]
-        elif saldo_acumulado < 100000:
-            porcentajes = [5.50, 8.50, 12.00, 15.00, 18.00]
-        elif saldo_acumulado < 200000:
-            porcentajes = [7.50, 10.50, 15.00, 18.00, 21.00]
-        else: # > 200,000 USD
-            porcentajes = [9.50, 12.50, 18.00, 21.00, 25.00]
-    
-    return porcentajes[col_idx]
-
-# --- ESTILOS CSS PROFESIONALES (THEME PREMIUM) ---
-st.markdown("""
-<style>
-    /* FONDO PREMIUM CON GRADIENTE PROFUNDO */
-    .stApp {
-        background: linear-gradient(135deg, #0f172a 0%, #1e293b 50%, #0f172a 100%);
-        background-attachment: fixed;
-    }
-    
-    /* HEADER TRANSPARENTE */
-    header[data-testid="stHeader"] {
-        background: transparent !important;
-    }
-    header[data-testid="stHeader"] .stActionIcon {
-        color: #cbd5e1 !important;
-    }
-    
-    /* ESTILOS GLOBALES DE TEXTO */
-    h1, h2, h3 {
-        color: #ffffff !important;
-        font-family: 'Inter', 'Segoe UI', system-ui, -apple-system, sans-serif;
-        font-weight: 700;
-        letter-spacing: -0.03em;
-    }
-    
-    h1 {
-        background: linear-gradient(135deg, #fbbf24 0%, #f59e0b 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-    
-    p, label, .stMarkdown, .caption {
-        color: #cbd5e1 !important;
-        font-family: 'Inter', system-ui, sans-serif;
-    }
-    
-    /* SIDEBAR CON GLASSMORPHISM */
-    section[data-testid="stSidebar"] {
-        background: rgba(15, 23, 42, 0.8) !important;
-        backdrop-filter: blur(20px);
-        border-right: 1px solid rgba(251, 191, 36, 0.1);
-    }
-    
-    section[data-testid="stSidebar"] > div {
-        background: transparent !important;
-    }
-    
-    /* INPUTS PREMIUM CON MEJOR CONTRASTE */
-    .stNumberInput input, .stDateInput input, .stSelectbox div[data-baseweb="select"] {
-        background: rgba(30, 41, 59, 0.8) !important;
-        color: #f8fafc !important; 
-        border: 1px solid rgba(148, 163, 184, 0.2) !important;
-        border-radius: 8px;
-        font-weight: 500;
-    }
-    
-    .stNumberInput input:focus, .stDateInput input:focus {
-        border-color: #fbbf24 !important;
-        box-shadow: 0 0 0 2px rgba(251, 191, 36, 0.2);
-    }
-    
-    /* TABS PREMIUM */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background: transparent;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: rgba(30, 41, 59, 0.6);
-        border: 1px solid rgba(255, 255, 255, 0.05);
-        border-radius: 8px;
-        padding: 8px 16px;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #fbbf24, #f59e0b) !important;
-        border: none;
-        box-shadow: 0 4px 12px rgba(251, 191, 36, 0.4);
-    }
+# --- MEDICIÓN POR ETAPAS (panel de depuración, logs JSON y métricas) ---
+medicion = MedicionEjecucion()
+medicion.etapa("estilos")
 
-    .stTabs [data-baseweb="tab"][aria-selected="true"] p {
-        color: #0f172a !important; 
-        font-weight: 800 !important;
-    }
-    
-    /* TABLAS Y DATA EDITOR (SIN FONDO BLANCO) */
-    [data-testid="stDataFrame"], [data-testid="stDataEditor"] {
-        background-color: transparent !important;
-        border: none !important;
-    }
-    
-    [data-testid="stDataFrame"] th, [data-testid="stDataEditor"] th {
-        background-color: #1e293b !important;
-        color: #fbbf24 !important;
-        border-bottom: 1px solid rgba(251, 191, 36, 0.2) !important;
-    }
-    
-    [data-testid="stDataFrame"] td, [data-testid="stDataEditor"] td {
-        background-color: #0f172a !important;
-        color: #cbd5e1 !important;
-        border-bottom: 1px solid rgba(148, 163, 184, 0.1) !important;
-    }
-    
-    /* EXPANDER */
-    .streamlit-expanderHeader {
-        background-color: rgba(30, 41, 59, 0.6) !important;
-        color: #fbbf24 !important;
-        border: 1px solid rgba(251, 191, 36, 0.1);
-        border-radius: 8px;
-    }
-    
-    .streamlit-expanderContent {
-        background-color: transparent !important;
-        border: none !important;
-        padding-top: 10px !important;
-    }
+@st.cache_resource
+def iniciar_logs():
+    configurar_logs()
 
-    /* SCROLLBAR */
-    ::-webkit-scrollbar {
-        width: 10px;
-        height: 10px;
-    }
-    ::-webkit-scrollbar-track {
-        background: #0f172a;
-    }
-    ::-webkit-scrollbar-thumb {
-        background: #475569;
-        border-radius: 5px;
-    }
-    ::-webkit-scrollbar-thumb:hover {
-        background: #fbbf24;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# --- TÍTULOS ---
-st.markdown("""
-<div style="margin-bottom: 2rem;">
-    <h1 style="font-size: 3rem; font-weight: 800; margin-bottom: 0.5rem; line-height: 1.2;">
-        Simulador de Inversión Avanzado
-    </h1>
-    <p style="font-size: 1.1rem; color: #94a3b8; margin: 0;">
-        Proyecta el crecimiento de tu patrimonio con 
-        <span style="color: #fbbf24; font-weight: 600;">aportes mensuales</span> y 
-        <span style="color: #10b981; font-weight: 600;">extraordinarios</span>
-    </p>
-</div>
-""", unsafe_allow_html=True)
+iniciar_logs()
+
+# --- ESTILOS CSS PROFESIONALES (THEME PREMIUM) Y TÍTULOS ---
+# Armados una vez por proceso en interfaz.py (estaticos/estilos.css)
+st.markdown(CABECERA, unsafe_allow_html=True)
+
+@st.cache_data
+def cargar_abonos_archivo(contenido, nombre):
+    return leer_archivo_abonos(io.BytesIO(contenido), nombre)
+
+@st.cache_data
+def cargar_serie_historica(contenido, nombre):
+    return leer_serie_historica(io.BytesIO(contenido), nombre)
 
 # --- BARRA LATERAL ---
+medicion.etapa("entradas")
 with st.sidebar:
     st.header("1. Tu Inversión")
 
@@ -252,6 +83,9 @@ with st.sidebar:
         st.error("⛔ La comisión no puede ser 100% o mayor")
         st.stop()
 
+    modo_exacto = st.toggle("🧾 Cálculo exacto al céntimo", value=False,
+                            help="Calcula en céntimos enteros, redondeando rendimiento, comisión y bonificación cada mes, como en los estados de cuenta")
+
     st.markdown("---")
     st.header("3. Escenarios (Tasas Brutas)")
     st.caption("Rendimiento anual antes de comisiones")
@@ -259,6 +93,30 @@ with st.sidebar:
     tasa_moderado = st.number_input("⚖️ Moderado (%)", value=10.0, min_value=0.0, step=0.25, format="%.2f")
     tasa_optimista = st.number_input("🚀 Optimista (%)", value=17.0, min_value=0.0, step=0.25, format="%.2f")
 
+    # --- SIMULACIÓN ESTOCÁSTICA ---
+    usar_montecarlo = st.toggle("🎲 Simulación Monte Carlo", value=False)
+    if usar_montecarlo:
+        mc_media = st.number_input("Rendimiento Esperado (%)", value=tasa_moderado, min_value=0.0, step=0.25, format="%.2f")
+        mc_volatilidad = st.number_input("Volatilidad Anual (%)", value=8.0, min_value=0.0, max_value=100.0, step=0.5, format="%.1f")
+        mc_trayectorias = st.select_slider("Trayectorias", options=[1_000, 10_000, 50_000, 100_000], value=10_000)
+
+    # --- BACKTESTING CON RENDIMIENTOS HISTÓRICOS ---
+    usar_historico = st.toggle("📜 Backtesting Histórico", value=False)
+    serie_historica = None
+    if usar_historico:
+        archivo_historico = st.file_uploader(
+            "Serie mensual del fondo (CSV/Excel)", type=["csv", "xlsx", "xls"],
+            help="Columnas Fecha, Rendimiento (% mensual) e Inflación (% mensual) o IPC. Sin inflación se usa la de la sección 2."
+        )
+        if archivo_historico is not None:
+            try:
+                contenido_historico = archivo_historico.getvalue()
+                serie_historica = cargar_serie_historica(contenido_historico, archivo_historico.name)
+                huella_serie = hashlib.sha1(contenido_historico).hexdigest()
+                st.caption(f"{len(serie_historica['fechas'])} meses: {serie_historica['fechas'][0]} a {serie_historica['fechas'][-1]}")
+            except Exception as e:
+                st.error(f"⛔ No se pudo leer la serie histórica: {e}")
+
     st.markdown("---")
     st.header("4. Abonos Extraordinarios")
     
@@ -275,11 +133,20 @@ with st.sidebar:
             key="abonos_editor"
         )
         
+        # Calendario importado (se suma a las filas del editor)
+        archivo_abonos = st.file_uploader("Importar calendario (CSV/Excel)", type=["csv", "xlsx", "xls"], help="Columnas Fecha y Monto")
+        if archivo_abonos is not None:
+            try:
+                abonos_archivo = cargar_abonos_archivo(archivo_abonos.getvalue(), archivo_abonos.name)
+                abonos_df = pd.concat([abonos_df, abonos_archivo], ignore_index=True)
+            except Exception as e:
+                st.error(f"⛔ No se pudo leer el archivo de abonos: {e}")
+        
         if not abonos_df.empty:
             df_valido = abonos_df.dropna(subset=["Fecha", "Monto"])
             if len(df_valido) > 0:
                 try:
-                    montos_numericos = pd.to_numeric(df_valido['Monto'], errors='coerce')
+                    montos_numericos = parsear_montos(df_valido['Monto'])
                     total_abonos = montos_numericos.sum()
                     if total_abonos > 0:
                         num_abonos = len(df_valido)
@@ -290,164 +157,119 @@ with st.sidebar:
     st.markdown("---")
     st.header("5. Visualización")
     escenario_view = st.selectbox("Seleccionar Escenario", ["Todos", "Conservador", "Moderado", "Optimista"])
-
-# --- FUNCIÓN DE CÁLCULO (BIMONETARIA) ---
-@st.cache_data
-def calcular_escenario_completo(tasa_bruta_pct, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_extra_df, start_date, es_dolares):
-    meses = int(anos * 12)
-    abonos_map = {}
-    abonos_ignorados = []
-    
-    if start_date is None: 
-        start_date = date.today()
-    
-    # --- Procesamiento de Abonos ---
-    if not abonos_extra_df.empty:
-        df_limpio = abonos_extra_df.copy()
-        for index, row in df_limpio.iterrows():
-            try:
-                raw_fecha = row.get("Fecha")
-                fecha_abono = None
-                
-                if isinstance(raw_fecha, (date, datetime)):
-                    fecha_abono = raw_fecha if isinstance(raw_fecha, date) else raw_fecha.date()
-                elif isinstance(raw_fecha, pd.Timestamp):
-                    fecha_abono = raw_fecha.date()
-                elif isinstance(raw_fecha, str) and raw_fecha.strip():
-                    try:
-                        ts = pd.to_datetime(raw_fecha, dayfirst=True)
-                        fecha_abono = ts.date()
-                    except:
-                         pass
-                
-                if not fecha_abono: continue
-                
-                monto_raw = row.get("Monto")
-                if isinstance(monto_raw, str):
-                    # Limpiamos ambos símbolos para evitar errores si el usuario cambia de moneda con datos cargados
-                    monto_raw = monto_raw.replace(",", "").replace("₡", "").replace("$", "").strip()
-                
-                monto_abono = pd.to_numeric(monto_raw, errors='coerce')
-                
-                if pd.isna(monto_abono) or monto_abono <= 0: continue
-                
-                monto_abono = float(monto_abono)
-                
-                diff_meses = (fecha_abono.year - start_date.year) * 12 + (fecha_abono.month - start_date.month)
-                
-                if 0 <= diff_meses < meses:
-                    abonos_map[diff_meses] = abonos_map.get(diff_meses, 0) + monto_abono
-                elif diff_meses < 0:
-                    abonos_ignorados.append(f"Fila {index+1}: Fecha {fecha_abono.strftime('%d/%m/%Y')} es anterior al inicio")
-                else:
-                    abonos_ignorados.append(f"Fila {index+1}: Fecha fuera del plazo ({anos} años)")
-                    
-            except Exception:
-                continue
-
-    # --- Tasas Mensuales ---
-    tasa_anual_bruta = tasa_bruta_pct / 100
-    tasa_mensual_bruta = (1 + tasa_anual_bruta)**(1/12) - 1
-    inflacion_mensual = (1 + inflacion_pct/100)**(1/12) - 1
-    
-    # Listas
-    valores_nominales = [inicial]
-    serie_aportes = [inicial] 
-    serie_real = [inicial]
-    filas_detalle = []
-    
-    saldo_actual = inicial
-    total_depositado = inicial
-    
-    # Fila Inicial
-    filas_detalle.append({
-        "Mes": 0,
-        "Fecha": start_date,
-        "Antigüedad (Meses)": 0,
-        "Saldo Inicial": 0,
-        "Aporte Total": inicial,
-        "Rendimiento Bruto": 0,
-        "Comisión Bruta": 0,
-        "% Bonificación": 0,
-        "Monto Bonificación": 0,
-        "Comisión Real": 0,
-        "Rendimiento Neto": 0,
-        "Saldo Final": inicial
-    })
-    
-    for i in range(1, meses + 1):
-        # Fecha
-        fecha_mes = pd.Timestamp(start_date) + pd.DateOffset(months=i)
-        
-        # Abonos
-        extra_este_mes = abonos_map.get(i, 0)
-        
-        # 1. Saldo Base
-        saldo_inicial_mes = saldo_actual
-        
-        # 2. Rendimiento Bruto (sobre saldo inicial)
-        rendimiento_bruto = saldo_inicial_mes * tasa_mensual_bruta
-        
-        # 3. Comisión Bruta (Standard)
-        comision_bruta = rendimiento_bruto * (comision_pct / 100)
-        
-        # 4. Lógica de Bonificación BN Vital (Matriz Bimonetaria)
-        # PASAMOS 'es_dolares' PARA ELEGIR LA TABLA CORRECTA
-        pct_bonificacion = obtener_tasa_bonificacion(i, saldo_inicial_mes, es_dolares)
-        monto_bonificacion = comision_bruta * (pct_bonificacion / 100)
-        
-        # 5. Comisión Real a Descontar
-        comision_real = comision_bruta - monto_bonificacion
-        
-        # 6. Rendimiento Neto
-        rendimiento_neto = rendimiento_bruto - comision_real
-        
-        # 7. Aporte Total
-        aporte_total_mes = aporte + extra_este_mes
-        
-        # 8. Saldo Final
-        nuevo_saldo = saldo_inicial_mes + rendimiento_neto + aporte_total_mes
-        
-        # Acumulados
-        nuevo_aporte_acumulado = total_depositado + aporte_total_mes
-        factor_inflacion = (1 + inflacion_mensual)**i
-        saldo_real = nuevo_saldo / factor_inflacion
-        
-        # Guardar
-        valores_nominales.append(nuevo_saldo)
-        serie_aportes.append(nuevo_aporte_acumulado)
-        serie_real.append(saldo_real)
-        
-        filas_detalle.append({
-            "Mes": i,
-            "Fecha": fecha_mes.date(),
-            "Antigüedad (Meses)": i,
-            "Saldo Inicial": saldo_inicial_mes,
-            "Aporte Total": aporte_total_mes,
-            "Rendimiento Bruto": rendimiento_bruto,
-            "Comisión Bruta": comision_bruta,
-            "% Bonificación": pct_bonificacion,
-            "Monto Bonificación": monto_bonificacion,
-            "Comisión Real": comision_real,
-            "Rendimiento Neto": rendimiento_neto,
-            "Saldo Final": nuevo_saldo
-        })
-        
-        saldo_actual = nuevo_saldo
-        total_depositado = nuevo_aporte_acumulado
-        
-    df_detalle = pd.DataFrame(filas_detalle)
-    
-    return {
-        "serie_nominal": valores_nominales,
-        "serie_aportes": serie_aportes,
-        "serie_real": serie_real,
-        "saldo_nominal": valores_nominales[-1],
-        "saldo_real": serie_real[-1],
-        "total_depositado": total_depositado,
-        "abonos_ignorados": abonos_ignorados,
-        "df_detalle": df_detalle
+    resoluciones_grafico = {
+        "Anual": "anual",
+        "Trimestral": "trimestral",
+        "Mensual": "mensual",
+        f"Automática ({PUNTOS_GRAFICO} puntos)": "automatica",
     }
+    etiqueta_resolucion = st.selectbox(
+        "Resolución de Gráficos", list(resoluciones_grafico),
+        help="Automática reduce la serie mensual a pocos puntos conservando su forma (LTTB)"
+    )
+    resolucion_grafico = resoluciones_grafico[etiqueta_resolucion]
+
+    # Panel de depuración: sólo con ?debug=1 o CALCULADORA_DEPURACION=1
+    mostrar_depuracion = False
+    if st.query_params.get("debug") == "1" or os.environ.get("CALCULADORA_DEPURACION") == "1":
+        mostrar_depuracion = st.toggle("🛠️ Panel de depuración", value=True)
+
+# --- FUNCIONES DE CÁLCULO (núcleo en el paquete motor) ---
+@st.cache_resource
+def obtener_cache():
+    """
+    Caché de resultados compartido por todas las sesiones del servidor.
+    """
+    return CacheResultados(max_entradas=512, max_bytes=128 * 1024**2, ttl_segundos=6 * 3600)
+
+cache_resultados = obtener_cache()
+
+def calcular_montecarlo(media_pct, volatilidad_pct, n_trayectorias, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_extra_df, start_date, es_dolares, paso_meses=12):
+    """
+    Bandas de percentiles (P5/P50/P95) del saldo con rendimientos aleatorios.
+    Semilla fija para que la misma configuración muestre las mismas bandas.
+    """
+    abonos_map, _ = procesar_abonos(abonos_extra_df, start_date, anos)
+    clave = ("montecarlo", float(media_pct), float(volatilidad_pct), int(n_trayectorias), int(paso_meses),
+             huella_plan(anos, aporte, inicial, comision_pct, inflacion_pct, abonos_map, start_date, es_dolares))
+    return cache_resultados.obtener_o_calcular(clave, lambda: simular_montecarlo(
+        media_pct, volatilidad_pct, n_trayectorias, anos, aporte, inicial,
+        comision_pct, inflacion_pct, abonos_map, es_dolares, semilla=2025, paso_meses=paso_meses
+    ))
+
+def calcular_backtesting(serie, huella_serie, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_extra_df, start_date, es_dolares):
+    """
+    Resultado del plan en cada fecha de inicio de la serie histórica.
+    """
+    abonos_map, _ = procesar_abonos(abonos_extra_df, start_date, anos)
+    clave = ("historico", huella_serie,
+             huella_plan(anos, aporte, inicial, comision_pct, inflacion_pct, abonos_map, start_date, es_dolares))
+    return cache_resultados.obtener_o_calcular(clave, lambda: backtesting(
+        serie, anos, aporte, inicial, comision_pct, abonos_map, es_dolares, inflacion_pct=inflacion_pct
+    ))
+
+def calcular_barrido(tasas, comisiones, inflaciones, plazos, aporte, inicial, abonos_extra_df, start_date, es_dolares):
+    """
+    Barrido de sensibilidad sobre la malla completa, compartido en el caché.
+    """
+    plazo_max = int(max(plazos))
+    abonos_map, _ = procesar_abonos(abonos_extra_df, start_date, plazo_max)
+    clave = ("barrido", tasas, comisiones, inflaciones, plazos,
+             huella_plan(plazo_max, aporte, inicial, 0, 0, abonos_map, start_date, es_dolares))
+    return cache_resultados.obtener_o_calcular(clave, lambda: barrido_parametros(
+        tasas, comisiones, inflaciones, plazos, aporte, inicial, abonos_map, es_dolares, metodo="cerrada"
+    ))
+
+def calcular_retiro(saldo, anos_retiro, monto, modalidad, media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct, es_dolares, antiguedad_meses, tasa_tecnica_pct, paso_meses=12):
+    """
+    Fase de retiro desde el saldo acumulado: bandas del saldo y del retiro y
+    riesgo de agotar el fondo para el monto elegido.
+    """
+    clave = ("retiro", float(saldo), int(anos_retiro), float(monto), modalidad, float(media_pct), float(volatilidad_pct),
+             int(n_trayectorias), float(comision_pct), float(inflacion_pct), bool(es_dolares), int(antiguedad_meses), float(tasa_tecnica_pct),
+             int(paso_meses))
+    return cache_resultados.obtener_o_calcular(clave, lambda: simular_retiro(
+        saldo, anos_retiro, monto, media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct, es_dolares,
+        modalidad=modalidad, antiguedad_meses=antiguedad_meses, tasa_tecnica_pct=tasa_tecnica_pct, semilla=2025,
+        paso_meses=paso_meses
+    ))
+
+def calcular_sostenible(saldo, horizontes, modalidad, media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct, es_dolares, antiguedad_meses):
+    """
+    Retiro máximo sostenible por horizonte y confianza (misma semilla que
+    calcular_retiro, así ambos ven los mismos rendimientos).
+    """
+    clave = ("sostenible", float(saldo), horizontes, modalidad, float(media_pct), float(volatilidad_pct), int(n_trayectorias),
+             float(comision_pct), float(inflacion_pct), bool(es_dolares), int(antiguedad_meses))
+    return cache_resultados.obtener_o_calcular(clave, lambda: retiro_sostenible(
+        saldo, horizontes, media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct, es_dolares,
+        modalidad=modalidad, antiguedad_meses=antiguedad_meses, semilla=2025
+    ))
+
+def resultado_formulario(nombre, enviado, clave, calcular):
+    """
+    Resultado de un cálculo pesado atado a un formulario: se calcula sólo
+    al enviarlo y queda en st.session_state con la clave de sus entradas,
+    así las demás interacciones de la página no lo repiten. Devuelve
+    (resultado, vigente): vigente es False si las entradas cambiaron desde
+    el último envío; sin envíos previos devuelve (None, False).
+    """
+    if enviado:
+        st.session_state[nombre] = (clave, calcular())
+    guardado = st.session_state.get(nombre)
+    if guardado is None:
+        return None, False
+    return guardado[1], guardado[0] == clave
+
+def huella_abonos(abonos_extra_df):
+    return pd.util.hash_pandas_object(abonos_extra_df).to_numpy().tobytes()
+
+def generar_descarga(nombre, escribir, *args):
+    """
+    Genera un archivo de descarga (al hacer clic) midiendo su tiempo.
+    """
+    with medir_tramo(f"exportar_{nombre}"):
+        return a_archivo_temporal(escribir, *args)
 
 escenarios_data = {
     "Conservador": tasa_conservador, 
@@ -456,27 +278,26 @@ escenarios_data = {
 }
 
 # --- VISUALIZACIÓN DE RESULTADOS ---
-st.markdown("""
-<div style="background: linear-gradient(135deg, rgba(251, 191, 36, 0.1), rgba(245, 158, 11, 0.05)); border-left: 4px solid #fbbf24; border-radius: 12px; padding: 16px 20px; margin: 2rem 0 1.5rem 0; box-shadow: 0 4px 12px rgba(0,0,0,0.3);">
-    <h2 style="margin: 0; font-size: 1.8rem; color: #fbbf24; font-weight: 700;">💰 Resultados de tu Inversión</h2>
-    <p style="margin: 8px 0 0 0; color: #94a3b8; font-size: 0.9rem;">Compara tres escenarios y visualiza el crecimiento de tu patrimonio</p>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(RESULTADOS_HTML, unsafe_allow_html=True)
 
 # Control de advertencias
 advertencias_mostradas = False
 
 cols = st.columns(3)
-datos_grafico = pd.DataFrame()
 resultados_completos = {}
 
-for (nombre, tasa_input), col in zip(escenarios_data.items(), cols):
-    res = calcular_escenario_completo(
-        tasa_input, plazo_anos, aporte_mensual, saldo_inicial, 
-        comision, inflacion, abonos_df, fecha_inicio, es_dolares
-    )
+medicion.etapa("calculo", escenarios=len(escenarios_data))
+resultados_lote = calcular_escenarios(
+    tuple(escenarios_data.values()), plazo_anos, aporte_mensual, saldo_inicial, 
+    comision, inflacion, abonos_df, fecha_inicio, es_dolares, cache=cache_resultados,
+    previo=st.session_state.get("resultados_previos"), exacto=modo_exacto
+)
+# Punto de partida para la siguiente edición (sólo se recalculan los meses afectados)
+st.session_state["resultados_previos"] = resultados_lote
+
+medicion.etapa("tarjetas_y_series")
+for (nombre, tasa_input), res, col in zip(escenarios_data.items(), resultados_lote, cols):
     resultados_completos[nombre] = res
-    datos_grafico[nombre] = [res["serie_nominal"][i*12] for i in range(plazo_anos + 1)]
     
     if not advertencias_mostradas and res["abonos_ignorados"]:
         with st.container():
@@ -486,121 +307,117 @@ for (nombre, tasa_input), col in zip(escenarios_data.items(), cols):
         advertencias_mostradas = True
     
     with col:
-        is_selected = (escenario_view == nombre)
-        
-        if is_selected:
-            border = "2px solid #fbbf24"
-            bg = "rgba(251, 191, 36, 0.12)"
-            shadow = "0 8px 24px rgba(251, 191, 36, 0.3)"
-            opacity = "1"
-            icon = "⭐"
-        else:
-            border = "1px solid rgba(148, 163, 184, 0.15)"
-            bg = "rgba(51, 65, 85, 0.5)"
-            shadow = "0 4px 12px rgba(0, 0, 0, 0.2)"
-            opacity = "0.88"
-            icon = "📊"
-
-        ganancia = res['saldo_nominal'] - res['total_depositado']
-        roi = (ganancia / res['total_depositado']) * 100 if res['total_depositado'] > 0 else 0
-
         # Tarjetas HTML con Símbolo Dinámico
-        card_html = textwrap.dedent(f"""
-            <div style="background: {bg}; border: {border}; border-radius: 12px; padding: 20px; box-shadow: {shadow}; margin-bottom: 20px; opacity: {opacity}; backdrop-filter: blur(10px); transition: all 0.3s ease;">
-                <h3 style="margin: 0 0 15px 0; font-size: 1.3rem; color: #fff; border-bottom: 1px solid rgba(255,255,255,0.1); padding-bottom: 10px;">
-                    {icon} {nombre} <span style="font-size: 0.8rem; color: #cbd5e1; font-weight: normal;">({tasa_input}%)</span>
-                </h3>
-                <div style="margin-bottom: 15px;">
-                    <div style="font-size: 0.85rem; color: #94a3b8; text-transform: uppercase; letter-spacing: 1px;">💰 Saldo Futuro</div>
-                    <div style="font-size: 2rem; font-weight: 700; color: #fff;">{simbolo}{res['saldo_nominal']:,.0f}</div>
-                </div>
-                <div style="background: rgba(16, 185, 129, 0.1); border: 1px solid rgba(16, 185, 129, 0.3); border-radius: 8px; padding: 12px; margin-bottom: 16px;">
-                    <div style="font-size: 0.8rem; color: #86efac; text-transform: uppercase; letter-spacing: 1px;">🎯 Poder de Compra Hoy</div>
-                    <div style="font-size: 1.4rem; font-weight: 700; color: #10b981;">{simbolo}{res['saldo_real']:,.0f}</div>
-                </div>
-                <div style="background: rgba(0,0,0,0.3); border-radius: 8px; padding: 12px; font-size: 0.9rem;">
-                    <div style="display: flex; justify-content: space-between; margin-bottom: 6px;">
-                        <span style="color: #cbd5e1;">💵 Inversión:</span>
-                        <span style="color: #fff; font-weight: 600;">{simbolo}{res['total_depositado']:,.0f}</span>
-                    </div>
-                    <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
-                        <span style="color: #cbd5e1;">📈 Ganancia:</span>
-                        <span style="color: #60a5fa; font-weight: 600;">{simbolo}{ganancia:,.0f}</span>
-                    </div>
-                    <div style="height: 1px; background: rgba(255,255,255,0.1); margin: 10px 0;"></div>
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <span style="color: #fbbf24; font-weight: 600; text-transform: uppercase; font-size: 0.85rem; letter-spacing: 1px;">⚡ ROI</span>
-                        <span style="font-size: 1.3rem; font-weight: 800; color: #fbbf24;">{roi:.1f}%</span>
-                    </div>
-                </div>
-            </div>
-        """)
-        st.markdown(card_html, unsafe_allow_html=True)
+        st.markdown(tarjeta_html(nombre, tasa_input, res, simbolo, escenario_view == nombre), unsafe_allow_html=True)
 
 st.markdown("---")
 
 # --- TABS ---
-tab1, tab2, tab3, tab4 = st.tabs(["📈 Crecimiento", "🍰 Composición", "💸 Inflación", "📋 Tabla Detallada"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["📈 Crecimiento", "🍰 Composición", "💸 Inflación", "📋 Tabla Detallada", "🎯 Meta", "🔥 Sensibilidad", "🏖️ Retiro"])
+
+datos_grafico = tabla_grafico(
+    {nombre: res["serie_nominal"] for nombre, res in resultados_completos.items()}, resolucion=resolucion_grafico
+)
 
 target_escenario = "Moderado" if escenario_view == "Todos" else escenario_view
 res_target = resultados_completos[target_escenario]
 
 # TAB 1: Crecimiento
+medicion.etapa("grafico_crecimiento")
 with tab1:
     if escenario_view == "Todos":
         st.subheader("📊 Evolución Comparativa")
-        st.line_chart(datos_grafico, use_container_width=True, color=["#6366f1", "#fbbf24", "#10b981"])
-        st.markdown("""
-        <div style="background: rgba(30, 41, 59, 0.6); border: 1px solid rgba(148, 163, 184, 0.2); border-radius: 8px; padding: 12px; margin-top: 12px; text-align: center;">
-            <span style="color: #6366f1; font-weight: 600;">━━</span> Conservador &nbsp;|&nbsp; 
-            <span style="color: #fbbf24; font-weight: 600;">━━</span> Moderado &nbsp;|&nbsp; 
-            <span style="color: #10b981; font-weight: 600;">━━</span> Optimista
-        </div>
-        """, unsafe_allow_html=True)
+        st.vega_lite_chart(*grafico_lineas(datos_grafico, ["#6366f1", "#fbbf24", "#10b981"]), use_container_width=True)
+        st.markdown(LEYENDA_ESCENARIOS_HTML, unsafe_allow_html=True)
     else:
         st.subheader(f"📈 Proyección - {escenario_view}")
         colors = {"Conservador": "#6366f1", "Moderado": "#fbbf24", "Optimista": "#10b981"}
-        st.line_chart(datos_grafico[escenario_view], use_container_width=True, color=colors[escenario_view])
+        st.vega_lite_chart(*grafico_lineas(datos_grafico[[escenario_view]], [colors[escenario_view]]), use_container_width=True)
         st.caption(f"Visualizando proyección del escenario **{escenario_view}** a lo largo del tiempo.")
 
+    if usar_montecarlo:
+        medicion.etapa("montecarlo", trayectorias=mc_trayectorias)
+        mc = calcular_montecarlo(
+            mc_media, mc_volatilidad, mc_trayectorias, plazo_anos, aporte_mensual, saldo_inicial,
+            comision, inflacion, abonos_df, fecha_inicio, es_dolares,
+            paso_meses=paso_montecarlo(mc_trayectorias, plazo_anos * 12, resolucion_grafico)
+        )
+        st.subheader(f"🎲 Monte Carlo ({mc_trayectorias:,} trayectorias)")
+        datos_bandas = tabla_grafico(
+            {f"P{p}": banda for p, banda in zip(mc["percentiles"], mc["bandas_nominales"])},
+            meses=mc["meses"], resolucion=resolucion_grafico
+        )
+        st.vega_lite_chart(*grafico_lineas(datos_bandas, ["#f87171", "#fbbf24", "#10b981"]), use_container_width=True)
+
+        mc_cols = st.columns(len(mc["percentiles"]))
+        for mc_col, p, nominal, real in zip(mc_cols, mc["percentiles"], mc["bandas_nominales"][:, -1], mc["bandas_reales"][:, -1]):
+            mc_col.metric(f"Saldo final P{p}", f"{simbolo}{nominal:,.0f}", f"Real: {simbolo}{real:,.0f}", delta_color="off")
+        st.caption(f"Rendimiento bruto esperado {mc_media}% con volatilidad {mc_volatilidad}% anual. Las bandas incluyen comisión y bonificación BN Vital.")
+
+    if serie_historica is not None:
+        medicion.etapa("historico")
+        if len(serie_historica["fechas"]) < plazo_anos * 12:
+            st.warning(f"⚠️ La serie histórica tiene {len(serie_historica['fechas'])} meses; el plazo de {plazo_anos} años necesita {plazo_anos * 12}.")
+        else:
+            bt = calcular_backtesting(
+                serie_historica, huella_serie, plazo_anos, aporte_mensual, saldo_inicial,
+                comision, inflacion, abonos_df, fecha_inicio, es_dolares
+            )
+            st.subheader(f"📜 Backtesting Histórico ({len(bt['fechas_inicio']):,} fechas de inicio)")
+            datos_historico = tabla_grafico(
+                {f"P{p}": banda for p, banda in zip(bt["percentiles"], bt["bandas_reales"])},
+                meses=bt["meses"], resolucion=resolucion_grafico
+            )
+            st.vega_lite_chart(*grafico_lineas(datos_historico, ["#f87171", "#fb923c", "#fbbf24", "#a3e635", "#10b981"]),
+                               use_container_width=True)
+
+            peor, mejor = int(bt["saldo_real"].argmin()), int(bt["saldo_real"].argmax())
+            bt_cols = st.columns(3)
+            bt_cols[0].metric(f"Peor inicio ({bt['fechas_inicio'][peor]})", f"{simbolo}{bt['saldo_real'][peor]:,.0f}",
+                              f"Tasa equiv. {bt['tasa_anual_equivalente'][peor]:.2%}", delta_color="off")
+            bt_cols[1].metric("Mediana (real)", f"{simbolo}{np.median(bt['saldo_real']):,.0f}",
+                              f"Depositado: {simbolo}{bt['total_depositado']:,.0f}", delta_color="off")
+            bt_cols[2].metric(f"Mejor inicio ({bt['fechas_inicio'][mejor]})", f"{simbolo}{bt['saldo_real'][mejor]:,.0f}",
+                              f"Tasa equiv. {bt['tasa_anual_equivalente'][mejor]:.2%}", delta_color="off")
+
+            ventanas = tabla_ventanas(bt, plazo_anos * 12)
+            st.vega_lite_chart(
+                ventanas[["Saldo Real"]],
+                grafico_histograma("Saldo Real", f"Saldo real final ({simbolo})", "Fechas de inicio", "#fbbf24"),
+                use_container_width=True
+            )
+            with st.expander("Resultado por fecha de inicio"):
+                st.dataframe(ventanas.sort_values("Saldo Real"), hide_index=True, use_container_width=True)
+            st.caption("Bandas en poder de compra de hoy, deflactadas con la inflación de cada ventana. Incluyen comisión y bonificación BN Vital.")
+
 # TAB 2: Composición
+medicion.etapa("grafico_composicion")
 with tab2:
     st.subheader(f"💎 Composición de Tu Patrimonio")
     
-    datos_area = pd.DataFrame({
-        "💵 Tu Capital": [res_target["serie_aportes"][i*12] for i in range(plazo_anos + 1)],
-        "✨ Intereses": [(res_target["serie_nominal"][i*12] - res_target["serie_aportes"][i*12]) for i in range(plazo_anos + 1)]
-    })
-    st.area_chart(datos_area, color=["#475569", "#fbbf24"], use_container_width=True)
+    datos_area = tabla_grafico({
+        "💵 Tu Capital": res_target["serie_aportes"],
+        "✨ Intereses": res_target["serie_nominal"] - res_target["serie_aportes"]
+    }, resolucion=resolucion_grafico)
+    st.vega_lite_chart(*grafico_lineas(datos_area, ["#475569", "#fbbf24"], area=True), use_container_width=True)
     st.info("💡 La zona **dorada** representa el dinero que trabaja para ti (Intereses).")
 
 # TAB 3: Inflación
+medicion.etapa("grafico_inflacion")
 with tab3:
     st.subheader(f"⚖️ Impacto de la Inflación")
     
-    datos_realidad = pd.DataFrame({
-        "💵 Saldo Nominal": [res_target["serie_nominal"][i*12] for i in range(plazo_anos + 1)],
-        "💎 Poder de Compra Real": [res_target["serie_real"][i*12] for i in range(plazo_anos + 1)]
-    })
-    st.line_chart(datos_realidad, color=["#60a5fa", "#10b981"], use_container_width=True)
+    datos_realidad = tabla_grafico({
+        "💵 Saldo Nominal": res_target["serie_nominal"],
+        "💎 Poder de Compra Real": res_target["serie_real"]
+    }, resolucion=resolucion_grafico)
+    st.vega_lite_chart(*grafico_lineas(datos_realidad, ["#60a5fa", "#10b981"]), use_container_width=True)
     
     perdida_inflacion = res_target["saldo_nominal"] - res_target["saldo_real"]
     porcentaje_perdida = (perdida_inflacion / res_target["saldo_nominal"]) * 100 if res_target["saldo_nominal"] > 0 else 0
     
-    st.markdown(f"""
-    <div style="background: linear-gradient(145deg, rgba(239, 68, 68, 0.1), rgba(220, 38, 38, 0.05)); border: 1px solid rgba(239, 68, 68, 0.3); border-radius: 12px; padding: 20px; margin-top: 16px;">
-        <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 12px;">
-            <div style="font-size: 1.5rem;">⚠️</div>
-            <div>
-                <div style="color: #fbbf24; font-weight: 700;">Erosión por Inflación ({inflacion}%)</div>
-            </div>
-        </div>
-        <div style="color: #cbd5e1; font-size: 0.95rem;">
-            Pérdida estimada de poder adquisitivo: <strong style="color: #f87171;">{simbolo}{perdida_inflacion:,.0f}</strong> ({porcentaje_perdida:.1f}%)
-            <br><em style="font-size: 0.85rem; opacity: 0.8;">La brecha entre ambas líneas es el "costo invisible" de la inflación.</em>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(PLANTILLA_INFLACION.format(inflacion=inflacion, simbolo=simbolo, perdida=perdida_inflacion, porcentaje=porcentaje_perdida),
+                unsafe_allow_html=True)
 
 # TAB 4: Tabla Detallada Mensual
 with tab4:
@@ -609,35 +426,33 @@ with tab4:
     if escenario_view == "Todos":
         st.info(f"ℹ️ Mostrando detalles del escenario **{target_escenario}**. Selecciona un escenario específico arriba para ver sus detalles.")
     
-    df_mostrar = res_target["df_detalle"].copy()
-    
-    # Configuración de columnas
+    # Paginación: sólo se arma la página visible de la tabla
+    filas_totales = len(res_target["serie_nominal"])
+    col_p1, col_p2 = st.columns([1, 1])
+    with col_p1:
+        filas_por_pagina = st.selectbox("Filas por página", [60, 120, 240, 600], index=1)
+    n_paginas = -(-filas_totales // filas_por_pagina)
+    with col_p2:
+        pagina = st.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, value=1, step=1)
+    desde = (pagina - 1) * filas_por_pagina
+    medicion.etapa("tabla_pagina", filas=filas_por_pagina)
+    df_pagina = construir_df_detalle(res_target["proyeccion"], desde, desde + filas_por_pagina)
+    
+    # Configuración de columnas (el formato de montos lo aplica el navegador, sin Styler)
+    formato_monto = f"{simbolo}%,.2f"
     column_config = {
         "Mes": st.column_config.NumberColumn("Mes", format="%d"),
         "Fecha": st.column_config.DateColumn("Fecha", format="DD/MM/YYYY"),
         "Antigüedad (Meses)": st.column_config.NumberColumn("Antigüedad", format="%d m"),
-        "Saldo Inicial": st.column_config.NumberColumn(f"Saldo Inicial ({simbolo})"),
-        "Aporte Total": st.column_config.NumberColumn(f"Aporte Total ({simbolo})"),
-        "Rendimiento Bruto": st.column_config.NumberColumn(f"Rend. Bruto ({simbolo})"),
-        "Comisión Bruta": st.column_config.NumberColumn(f"Com. Bruta ({simbolo})"),
+        "Saldo Inicial": st.column_config.NumberColumn(f"Saldo Inicial ({simbolo})", format=formato_monto),
+        "Aporte Total": st.column_config.NumberColumn(f"Aporte Total ({simbolo})", format=formato_monto),
+        "Rendimiento Bruto": st.column_config.NumberColumn(f"Rend. Bruto ({simbolo})", format=formato_monto),
+        "Comisión Bruta": st.column_config.NumberColumn(f"Com. Bruta ({simbolo})", format=formato_monto),
         "% Bonificación": st.column_config.NumberColumn("% Bonif.", format="%.2f%%"),
-        "Monto Bonificación": st.column_config.NumberColumn(f"Bonificación (+) ({simbolo})"),
-        "Comisión Real": st.column_config.NumberColumn(f"Com. Real (-) ({simbolo})"),
-        "Rendimiento Neto": st.column_config.NumberColumn(f"Ganancia Neta ({simbolo})"),
-        "Saldo Final": st.column_config.NumberColumn(f"Saldo Final ({simbolo})")
-    }
-    
-    # Formateo con Styler
-    format_str = f"{simbolo}{{:,.2f}}"
-    format_dict = {
-        "Saldo Inicial": format_str,
-        "Aporte Total": format_str,
-        "Rendimiento Bruto": format_str,
-        "Comisión Bruta": format_str,
-        "Monto Bonificación": format_str,
-        "Comisión Real": format_str,
-        "Rendimiento Neto": format_str,
-        "Saldo Final": format_str
+        "Monto Bonificación": st.column_config.NumberColumn(f"Bonificación (+) ({simbolo})", format=formato_monto),
+        "Comisión Real": st.column_config.NumberColumn(f"Com. Real (-) ({simbolo})", format=formato_monto),
+        "Rendimiento Neto": st.column_config.NumberColumn(f"Ganancia Neta ({simbolo})", format=formato_monto),
+        "Saldo Final": st.column_config.NumberColumn(f"Saldo Final ({simbolo})", format=formato_monto)
     }
 
     cols_to_show = [
@@ -646,71 +461,303 @@ with tab4:
         "Rendimiento Neto", "Saldo Final"
     ]
     
+    medicion.etapa("estilo_tabla")
     st.dataframe(
-        df_mostrar[cols_to_show].style.format(format_dict),
+        df_pagina[cols_to_show],
         column_config=column_config,
         use_container_width=True,
         height=500,
         hide_index=True
     )
     
-    st.markdown("""
-    <div style="background: rgba(30, 41, 59, 0.6); border-radius: 8px; padding: 12px; margin-top: 10px; font-size: 0.9rem; color: #cbd5e1;">
-        📥 <strong>Exportación:</strong> El archivo descargable incluye TODAS las columnas, incluyendo el desglose de la bonificación.
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(NOTA_EXPORTACION_HTML, unsafe_allow_html=True)
     
     # --- BOTONES DE DESCARGA (CSV Y EXCEL) ---
-    col_d1, col_d2 = st.columns([1, 1])
+    medicion.etapa("exportaciones")
+    # Los archivos se generan sólo al hacer clic, bloque a bloque
+    proyeccion_target = res_target["proyeccion"]
+    proyecciones_todas = {nombre: res["proyeccion"] for nombre, res in resultados_completos.items()}
+    col_d1, col_d2, col_d3 = st.columns([1, 1, 1])
     
     # 1. CSV
-    csv = df_mostrar.to_csv(index=False).encode('utf-8')
     with col_d1:
         st.download_button(
             label=f"📄 Descargar CSV", 
-            data=csv, 
+            data=lambda: generar_descarga("csv", escribir_csv, proyeccion_target), 
             file_name=f"detalle_{target_escenario}_{date.today()}.csv", 
             mime="text/csv"
         )
     
-    # 2. EXCEL (XLSX) con Formato de Tabla
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-        df_mostrar.to_excel(writer, sheet_name='Proyeccion', index=False)
-        workbook = writer.book
-        worksheet = writer.sheets['Proyeccion']
-        
-        # Obtener dimensiones
-        (max_row, max_col) = df_mostrar.shape
-        
-        # Crear tabla de Excel con estilo
-        worksheet.add_table(0, 0, max_row, max_col - 1, {
-            'columns': [{'header': col} for col in df_mostrar.columns],
-            'style': 'TableStyleMedium9',
-            'name': 'ProyeccionFinanciera'
-        })
-        
-        # Formato de moneda para columnas numéricas
-        currency_fmt = workbook.add_format({'num_format': f'{simbolo}#,##0.00'})
-        pct_fmt = workbook.add_format({'num_format': '0.00%'})
-        
-        for i, col_name in enumerate(df_mostrar.columns):
-            if col_name == "% Bonificación":
-                worksheet.set_column(i, i, 12, pct_fmt)
-            elif col_name in ["Saldo Inicial", "Aporte Total", "Rendimiento Bruto", "Comisión Bruta", 
-                              "Monto Bonificación", "Comisión Real", "Rendimiento Neto", "Saldo Final"]:
-                worksheet.set_column(i, i, 18, currency_fmt)
-            elif col_name == "Fecha":
-                worksheet.set_column(i, i, 12)
-            else:
-                worksheet.set_column(i, i, 10)
-                
-    buffer.seek(0)
-    
+    # 2. EXCEL (XLSX) del escenario
     with col_d2:
         st.download_button(
             label=f"📊 Descargar Excel (.xlsx)", 
-            data=buffer, 
+            data=lambda: generar_descarga("excel", escribir_excel, {"Proyeccion": proyeccion_target}, simbolo), 
             file_name=f"proyeccion_excel_{target_escenario}_{date.today()}.xlsx", 
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
+    
+    # 3. EXCEL con todos los escenarios (una hoja por escenario)
+    with col_d3:
+        st.download_button(
+            label=f"📚 Excel Todos los Escenarios", 
+            data=lambda: generar_descarga("excel_todos", escribir_excel, proyecciones_todas, simbolo), 
+            file_name=f"proyeccion_escenarios_{date.today()}.xlsx", 
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+
+    # 4. PARQUET con todos los escenarios (tipos conservados, para análisis)
+    if importlib.util.find_spec("pyarrow") is not None:
+        from motor.columnar import escribir_parquet_detalle
+        st.download_button(
+            label=f"🗃️ Parquet Todos los Escenarios", 
+            data=lambda: generar_descarga("parquet", escribir_parquet_detalle, proyecciones_todas), 
+            file_name=f"proyeccion_escenarios_{date.today()}.parquet", 
+            mime="application/vnd.apache.parquet"
+        )
+
+# TAB 5: Meta de ahorro (búsqueda inversa)
+medicion.etapa("meta")
+with tab5:
+    st.subheader(f"🎯 ¿Cuánto necesito para llegar a mi meta? - {target_escenario}")
+    st.caption("Calcula el valor de una variable para alcanzar un saldo objetivo, manteniendo las demás como están en la barra lateral (incluye comisión, bonificación BN Vital y abonos).")
+
+    variables_meta = {
+        "aporte": f"Aporte Mensual ({simbolo})",
+        "inicial": f"Saldo Inicial ({simbolo})",
+        "tasa": "Tasa Bruta Anual (%)",
+        "plazo": "Plazo (Años)",
+    }
+    with st.form("form_meta"):
+        col_m1, col_m2 = st.columns(2)
+        with col_m1:
+            etiqueta_meta = st.selectbox("Variable a calcular", list(variables_meta.values()))
+            variable_meta = next(k for k, v in variables_meta.items() if v == etiqueta_meta)
+            objetivo_meta = st.number_input(f"Saldo objetivo ({simbolo})", value=float(round(res_target["saldo_real"] * 2, -3)), min_value=0.0, step=1000.0, format="%.0f")
+        with col_m2:
+            meta_real = st.radio("El objetivo está en", ["Poder de compra hoy (real)", "Saldo nominal"]) == "Poder de compra hoy (real)"
+        calcular_meta = st.form_submit_button("Calcular")
+
+    if calcular_meta:
+        meta = resolver_meta(
+            variable_meta, objetivo_meta, escenarios_data[target_escenario], plazo_anos, aporte_mensual, saldo_inicial,
+            comision, inflacion, abonos_df, fecha_inicio, es_dolares, real=meta_real
+        )
+        if not meta["alcanzable"]:
+            st.warning(f"⚠️ La meta no se alcanza variando **{variables_meta[variable_meta]}** dentro de los límites del plan.")
+        else:
+            if variable_meta in ("aporte", "inicial"):
+                valor_txt = f"{simbolo}{meta['valor']:,.2f}"
+            elif variable_meta == "tasa":
+                valor_txt = f"{meta['valor']:.2f}%"
+            else:
+                valor_txt = f"{meta['valor']} años"
+            col_r1, col_r2, col_r3 = st.columns(3)
+            col_r1.metric(variables_meta[variable_meta], valor_txt)
+            col_r2.metric("Saldo Futuro", f"{simbolo}{meta['saldo_nominal']:,.0f}")
+            col_r3.metric("Poder de Compra Hoy", f"{simbolo}{meta['saldo_real']:,.0f}")
+        st.caption(f"Resuelto en {meta['iteraciones']} pasada{'s' if meta['iteraciones'] != 1 else ''} del motor ({meta['segundos'] * 1000:.0f} ms).")
+
+# TAB 6: Sensibilidad (barrido de parámetros)
+medicion.etapa("sensibilidad")
+with tab6:
+    st.subheader("🔥 Sensibilidad del Saldo Final")
+    st.caption("Evalúa todas las combinaciones de tasa bruta, comisión, inflación y plazo para tu aporte, saldo inicial y abonos.")
+
+    with st.form("form_barrido"):
+        col_s1, col_s2, col_s3, col_s4 = st.columns(4)
+        with col_s1:
+            rango_tasa = st.slider("Tasa Bruta (%)", 0.0, 30.0, (4.0, 18.0), step=0.5)
+            puntos_tasa = st.number_input("Puntos tasa", value=15, min_value=2, max_value=100)
+        with col_s2:
+            rango_comision = st.slider("Comisión (%)", 0.0, 50.0, (0.0, 20.0), step=0.5)
+            puntos_comision = st.number_input("Puntos comisión", value=11, min_value=2, max_value=50)
+        with col_s3:
+            rango_inflacion = st.slider("Inflación (%)", 0.0, 15.0, (0.0, 8.0), step=0.5)
+            puntos_inflacion = st.number_input("Puntos inflación", value=9, min_value=2, max_value=50)
+        with col_s4:
+            rango_plazo = st.slider("Plazo (Años)", 1, 50, (5, 50))
+            paso_plazo = st.number_input("Cada (años)", value=5, min_value=1, max_value=10)
+        enviar_barrido = st.form_submit_button("Calcular barrido")
+
+    # El barrido sólo se calcula al enviar el formulario (cada pestaña se
+    # ejecuta en todas las interacciones de la página)
+    ejes_barrido = (
+        tuple(np.linspace(*rango_tasa, int(puntos_tasa)).round(4)),
+        tuple(np.linspace(*rango_comision, int(puntos_comision)).round(4)),
+        tuple(np.linspace(*rango_inflacion, int(puntos_inflacion)).round(4)),
+        tuple(range(rango_plazo[0], rango_plazo[1] + 1, int(paso_plazo))),
+    )
+    barrido, barrido_vigente = resultado_formulario(
+        "barrido", enviar_barrido,
+        (ejes_barrido, aporte_mensual, saldo_inicial, huella_abonos(abonos_df), fecha_inicio, es_dolares),
+        lambda: calcular_barrido(*ejes_barrido, aporte_mensual, saldo_inicial, abonos_df, fecha_inicio, es_dolares)
+    )
+
+    if barrido is None:
+        st.info("Elige los rangos y presiona **Calcular barrido**.")
+    elif not barrido_vigente:
+        st.info("El plan cambió desde el último barrido: presiona **Calcular barrido** para actualizarlo.")
+    else:
+        etiquetas_ejes = {
+            "tasa_bruta_pct": "Tasa Bruta (%)",
+            "comision_pct": "Comisión (%)",
+            "inflacion_pct": "Inflación (%)",
+            "plazo_anos": "Plazo (Años)",
+        }
+        valores_actuales = {
+            "tasa_bruta_pct": escenarios_data[target_escenario],
+            "comision_pct": comision,
+            "inflacion_pct": inflacion,
+            "plazo_anos": plazo_anos,
+        }
+        col_e1, col_e2, col_e3 = st.columns(3)
+        etiqueta_x = col_e1.selectbox("Eje horizontal", list(etiquetas_ejes.values()), index=0)
+        etiqueta_y = col_e2.selectbox("Eje vertical", [e for e in etiquetas_ejes.values() if e != etiqueta_x], index=2)
+        barrido_real = col_e3.radio("Saldo", ["Real", "Nominal"], horizontal=True) == "Real"
+        eje_x = next(k for k, v in etiquetas_ejes.items() if v == etiqueta_x)
+        eje_y = next(k for k, v in etiquetas_ejes.items() if v == etiqueta_y)
+
+        # Los dos ejes restantes se fijan en un punto de la malla
+        fijos = {}
+        ejes_fijos = [eje for eje in EJES_BARRIDO if eje not in (eje_x, eje_y)]
+        for col_f, eje in zip(st.columns(len(ejes_fijos)), ejes_fijos):
+            opciones = [float(v) if eje != "plazo_anos" else int(v) for v in barrido[eje]]
+            cercano = opciones[int(np.abs(barrido[eje] - valores_actuales[eje]).argmin())]
+            fijos[eje] = col_f.select_slider(etiquetas_ejes[eje], options=opciones, value=cercano)
+
+        valores_y, valores_x, matriz = corte_barrido(barrido, eje_x, eje_y, fijos, real=barrido_real)
+        datos_mapa = pd.DataFrame({
+            etiqueta_x: np.tile(valores_x, len(valores_y)),
+            etiqueta_y: np.repeat(valores_y, len(valores_x)),
+            "Saldo": matriz.reshape(-1),
+        })
+        st.vega_lite_chart(datos_mapa, grafico_mapa_calor(etiqueta_x, etiqueta_y, "Saldo", f"Saldo ({simbolo})"), use_container_width=True)
+        st.caption(f"{barrido['saldo_real'].size:,} combinaciones evaluadas. {'Poder de compra de hoy' if barrido_real else 'Saldo nominal'} al final del plazo.")
+
+        st.download_button(
+            label="📄 Descargar barrido (CSV)",
+            data=lambda: generar_descarga("barrido_csv", lambda archivo: tabla_barrido(barrido).to_csv(archivo, index=False, encoding="utf-8")),
+            file_name=f"sensibilidad_{date.today()}.csv",
+            mime="text/csv"
+        )
+
+# TAB 7: Fase de retiro (desacumulación)
+medicion.etapa("retiro")
+with tab7:
+    saldo_retiro = float(res_target["saldo_nominal"])
+    st.subheader(f"🏖️ ¿Cuánto puedo retirar cada mes? - {target_escenario}")
+    st.caption(f"Parte del saldo acumulado al final del plazo ({simbolo}{saldo_retiro:,.0f}) con la misma comisión, bonificación BN Vital (la antigüedad sigue contando) e inflación de la barra lateral.")
+
+    modalidades_retiro = {
+        "Monto fijo": "fijo",
+        "Indexado a la inflación": "indexado",
+        "Retiro programado": "programado",
+    }
+    with st.form("form_retiro"):
+        col_r1, col_r2, col_r3 = st.columns(3)
+        with col_r1:
+            modalidad_retiro = modalidades_retiro[st.radio("Modalidad", list(modalidades_retiro))]
+            anos_retiro = st.slider("Años de retiro", 5, 40, 25)
+        with col_r2:
+            monto_retiro = st.number_input(f"Retiro mensual ({simbolo})", value=float(round(saldo_retiro * 0.005, -2 if es_dolares else -3)),
+                                           min_value=0.0, step=100.0 if es_dolares else 10_000.0, format="%.0f",
+                                           help="En la modalidad indexada es el primer retiro; el retiro programado lo calcula cada mes")
+            tasa_tecnica = st.number_input("Tasa técnica del retiro programado (%)", value=4.0, min_value=0.0, step=0.5, format="%.1f")
+        with col_r3:
+            media_retiro = st.number_input("Rendimiento esperado en el retiro (%)", value=float(tasa_conservador), min_value=0.0, step=0.25, format="%.2f")
+            volatilidad_retiro = st.number_input("Volatilidad anual en el retiro (%)", value=6.0, min_value=0.0, max_value=100.0, step=0.5, format="%.1f")
+            trayectorias_retiro = st.select_slider("Trayectorias del retiro", options=[500, 1_000, 2_000, 5_000], value=2_000)
+        enviar_retiro = st.form_submit_button("Calcular retiro")
+
+    def calcular_fase_retiro():
+        antiguedad_retiro = plazo_anos * 12
+        retiro = calcular_retiro(
+            saldo_retiro, anos_retiro, monto_retiro, modalidad_retiro, media_retiro, volatilidad_retiro, trayectorias_retiro,
+            comision, inflacion, es_dolares, antiguedad_retiro, tasa_tecnica,
+            paso_meses=paso_montecarlo(trayectorias_retiro, anos_retiro * 12, resolucion_grafico)
+        )
+        if modalidad_retiro == "programado":
+            return retiro, None
+        horizontes = tuple(range(5, anos_retiro + 1, 5)) if anos_retiro % 5 == 0 else tuple(range(5, anos_retiro, 5)) + (anos_retiro,)
+        return retiro, calcular_sostenible(
+            saldo_retiro, horizontes, modalidad_retiro, media_retiro, volatilidad_retiro, trayectorias_retiro,
+            comision, inflacion, es_dolares, antiguedad_retiro
+        )
+
+    # Las simulaciones del retiro sólo corren al enviar el formulario; el
+    # resultado guardado lleva el plan y los parámetros con que se calculó
+    fase_retiro, retiro_vigente = resultado_formulario(
+        "retiro", enviar_retiro and saldo_retiro > 0,
+        (saldo_retiro, modalidad_retiro, anos_retiro, monto_retiro, tasa_tecnica, media_retiro, volatilidad_retiro,
+         trayectorias_retiro, comision, inflacion, es_dolares, plazo_anos),
+        calcular_fase_retiro
+    )
+
+    if saldo_retiro <= 0:
+        st.info("El plan no acumula saldo para retirar.")
+    elif fase_retiro is None:
+        st.info("Elige los parámetros del retiro y presiona **Calcular retiro**.")
+    elif not retiro_vigente:
+        st.info("El plan o los parámetros cambiaron desde el último cálculo: presiona **Calcular retiro** para actualizarlo.")
+    else:
+        retiro, sostenible = fase_retiro
+        agotamiento = retiro["mes_agotamiento"][0]
+        col_m1, col_m2, col_m3 = st.columns(3)
+        if modalidad_retiro == "programado":
+            p50 = list(retiro["percentiles"]).index(50)
+            col_m1.metric("Retiro al año 1 (P50)", f"{simbolo}{retiro['bandas_retiro'][0, p50, 1]:,.0f}")
+            col_m2.metric("Retiro al final, real (P50)", f"{simbolo}{retiro['bandas_retiro_reales'][0, p50, -1]:,.0f}")
+        else:
+            col_m1.metric(f"Riesgo de agotar el fondo en {anos_retiro} años", f"{retiro['prob_ruina'][0]:.1%}")
+            agotados = agotamiento[agotamiento > 0]
+            col_m2.metric("Agotamiento mediano (si se agota)", f"Año {np.median(agotados) / 12:.1f}" if len(agotados) else "—")
+        col_m3.metric("Total retirado promedio (real)", f"{simbolo}{retiro['retiro_total_real'][0]:,.0f}",
+                      f"Nominal: {simbolo}{retiro['retiro_total'][0]:,.0f}", delta_color="off")
+
+        if modalidad_retiro == "programado":
+            # El mes 0 no tiene retiro
+            bandas_retiro, meses_retiro = retiro["bandas_retiro_reales"][0][:, 1:], retiro["meses"][1:]
+        else:
+            bandas_retiro, meses_retiro = retiro["bandas_reales"][0], retiro["meses"]
+        st.vega_lite_chart(*grafico_lineas(
+            tabla_grafico({f"P{p}": banda for p, banda in zip(retiro["percentiles"], bandas_retiro)},
+                          meses=meses_retiro, resolucion=resolucion_grafico),
+            ["#f87171", "#fbbf24", "#10b981"]
+        ), use_container_width=True)
+        st.caption(("Retiro mensual" if modalidad_retiro == "programado" else "Saldo") + " en poder de compra del inicio del retiro.")
+
+        if sostenible is not None:
+            st.markdown("#### Retiro mensual máximo sostenible")
+            tabla_maximos = tabla_sostenible(sostenible)
+            st.dataframe(
+                tabla_maximos,
+                column_config={columna: st.column_config.NumberColumn(format=f"{simbolo}%,.0f") for columna in tabla_maximos.columns},
+                use_container_width=True
+            )
+            montos_curva = np.linspace(0, sostenible["retiro_maximo"].max() * 1.5, 200)
+            riesgo = prob_ruina_de_monto(sostenible, montos_curva)
+            datos_riesgo = pd.DataFrame(riesgo.T, index=pd.Index(montos_curva, name=f"Retiro mensual ({simbolo})"),
+                                        columns=[f"{h} años" for h in sostenible["horizontes_anos"]])
+            st.vega_lite_chart(*grafico_lineas(datos_riesgo, formato_y=".0%"), use_container_width=True)
+            st.caption(f"Riesgo de agotar el fondo según el monto. {sostenible['trayectorias']:,} trayectorias, "
+                       f"{sostenible['pasadas']} pasadas del motor ({sostenible['segundos'] * 1000:.0f} ms).")
+
+# --- CIERRE DE LA MEDICIÓN ---
+resumen_medicion = medicion.cerrar()
+if os.environ.get("CALCULADORA_METRICAS"):
+    escribir_metricas(os.environ["CALCULADORA_METRICAS"])
+
+if mostrar_depuracion:
+    with st.sidebar.expander("🛠️ Tiempos de esta ejecución", expanded=True):
+        st.metric("Total", f"{resumen_medicion['total_ms']:,.1f} ms")
+        st.dataframe(
+            pd.DataFrame(resumen_medicion["tramos"]).set_index("tramo").fillna(0),
+            use_container_width=True
+        )
+        stats_cache = cache_resultados.estadisticas()
+        st.caption(
+            f"Caché: {stats_cache['entradas']} entradas, {stats_cache['bytes'] / 1024**2:.1f} MB, "
+            f"aciertos {stats_cache['tasa_aciertos']:.0%} ({stats_cache['aciertos']}/{stats_cache['aciertos'] + stats_cache['fallos']}), "
+            f"desalojos {stats_cache['desalojos']}"
+        )
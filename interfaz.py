@@ -0,0 +1,213 @@
+"""
+Piezas estáticas de la página: hoja de estilos, bloques HTML y gráficos.
+
+Todo lo que no depende de las entradas se arma una sola vez por proceso, al
+importar el módulo: la hoja de estilos (estaticos/estilos.css) y los
+bloques fijos se compactan a una línea sin comentarios. Streamlit vuelve a
+ejecutar calculadora.py en cada interacción, pero los módulos importados
+quedan en memoria.
+
+Los gráficos se entregan como especificaciones Vega-Lite (diccionarios)
+para st.vega_lite_chart; st.line_chart y st.altair_chart arman y validan un
+gráfico de Altair en cada ejecución, y Altair es la importación más pesada
+de la página.
+"""
+import re
+from pathlib import Path
+
+ESTATICOS = Path(__file__).resolve().parent / "estaticos"
+
+
+def compactar(html):
+    """
+    Quita comentarios CSS y la sangría de un bloque HTML/CSS y lo deja en
+    una línea (Markdown no lo confunde con código y el mensaje pesa menos).
+    """
+    sin_comentarios = re.sub(r"/\*.*?\*/", "", html, flags=re.S)
+    return " ".join(linea.strip() for linea in sin_comentarios.splitlines() if linea.strip())
+
+
+ENCABEZADO_HTML = """
+<div style="margin-bottom: 2rem;">
+    <h1 style="font-size: 3rem; font-weight: 800; margin-bottom: 0.5rem; line-height: 1.2;">
+        Simulador de Inversión Avanzado
+    </h1>
+    <p style="font-size: 1.1rem; color: #94a3b8; margin: 0;">
+        Proyecta el crecimiento de tu patrimonio con
+        <span style="color: #fbbf24; font-weight: 600;">aportes mensuales</span> y
+        <span style="color: #10b981; font-weight: 600;">extraordinarios</span>
+    </p>
+</div>
+"""
+
+# Estilos y títulos en un solo elemento
+CABECERA = compactar("<style>" + (ESTATICOS / "estilos.css").read_text(encoding="utf-8") + "</style>" + ENCABEZADO_HTML)
+
+RESULTADOS_HTML = compactar("""
+<div style="background: linear-gradient(135deg, rgba(251, 191, 36, 0.1), rgba(245, 158, 11, 0.05)); border-left: 4px solid #fbbf24; border-radius: 12px; padding: 16px 20px; margin: 2rem 0 1.5rem 0; box-shadow: 0 4px 12px rgba(0,0,0,0.3);">
+    <h2 style="margin: 0; font-size: 1.8rem; color: #fbbf24; font-weight: 700;">💰 Resultados de tu Inversión</h2>
+    <p style="margin: 8px 0 0 0; color: #94a3b8; font-size: 0.9rem;">Compara tres escenarios y visualiza el crecimiento de tu patrimonio</p>
+</div>
+""")
+
+LEYENDA_ESCENARIOS_HTML = compactar("""
+<div style="background: rgba(30, 41, 59, 0.6); border: 1px solid rgba(148, 163, 184, 0.2); border-radius: 8px; padding: 12px; margin-top: 12px; text-align: center;">
+    <span style="color: #6366f1; font-weight: 600;">━━</span> Conservador &nbsp;|&nbsp;
+    <span style="color: #fbbf24; font-weight: 600;">━━</span> Moderado &nbsp;|&nbsp;
+    <span style="color: #10b981; font-weight: 600;">━━</span> Optimista
+</div>
+""")
+
+NOTA_EXPORTACION_HTML = compactar("""
+<div style="background: rgba(30, 41, 59, 0.6); border-radius: 8px; padding: 12px; margin-top: 10px; font-size: 0.9rem; color: #cbd5e1;">
+    📥 <strong>Exportación:</strong> El archivo descargable incluye TODAS las columnas, incluyendo el desglose de la bonificación.
+</div>
+""")
+
+# --- PLANTILLAS (se completan con str.format en cada ejecución) ---
+ESTILO_TARJETA = {
+    True: {"border": "2px solid #fbbf24", "bg": "rgba(251, 191, 36, 0.12)",
+           "shadow": "0 8px 24px rgba(251, 191, 36, 0.3)", "opacity": "1", "icon": "⭐"},
+    False: {"border": "1px solid rgba(148, 163, 184, 0.15)", "bg": "rgba(51, 65, 85, 0.5)",
+            "shadow": "0 4px 12px rgba(0, 0, 0, 0.2)", "opacity": "0.88", "icon": "📊"},
+}
+
+PLANTILLA_TARJETA = compactar("""
+<div style="background: {bg}; border: {border}; border-radius: 12px; padding: 20px; box-shadow: {shadow}; margin-bottom: 20px; opacity: {opacity}; backdrop-filter: blur(10px); transition: all 0.3s ease;">
+    <h3 style="margin: 0 0 15px 0; font-size: 1.3rem; color: #fff; border-bottom: 1px solid rgba(255,255,255,0.1); padding-bottom: 10px;">
+        {icon} {nombre} <span style="font-size: 0.8rem; color: #cbd5e1; font-weight: normal;">({tasa}%)</span>
+    </h3>
+    <div style="margin-bottom: 15px;">
+        <div style="font-size: 0.85rem; color: #94a3b8; text-transform: uppercase; letter-spacing: 1px;">💰 Saldo Futuro</div>
+        <div style="font-size: 2rem; font-weight: 700; color: #fff;">{simbolo}{saldo_nominal:,.0f}</div>
+    </div>
+    <div style="background: rgba(16, 185, 129, 0.1); border: 1px solid rgba(16, 185, 129, 0.3); border-radius: 8px; padding: 12px; margin-bottom: 16px;">
+        <div style="font-size: 0.8rem; color: #86efac; text-transform: uppercase; letter-spacing: 1px;">🎯 Poder de Compra Hoy</div>
+        <div style="font-size: 1.4rem; font-weight: 700; color: #10b981;">{simbolo}{saldo_real:,.0f}</div>
+    </div>
+    <div style="background: rgba(0,0,0,0.3); border-radius: 8px; padding: 12px; font-size: 0.9rem;">
+        <div style="display: flex; justify-content: space-between; margin-bottom: 6px;">
+            <span style="color: #cbd5e1;">💵 Inversión:</span>
+            <span style="color: #fff; font-weight: 600;">{simbolo}{total_depositado:,.0f}</span>
+        </div>
+        <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
+            <span style="color: #cbd5e1;">📈 Ganancia:</span>
+            <span style="color: #60a5fa; font-weight: 600;">{simbolo}{ganancia:,.0f}</span>
+        </div>
+        <div style="height: 1px; background: rgba(255,255,255,0.1); margin: 10px 0;"></div>
+        <div style="display: flex; justify-content: space-between; align-items: center;">
+            <span style="color: #fbbf24; font-weight: 600; text-transform: uppercase; font-size: 0.85rem; letter-spacing: 1px;">⚡ ROI</span>
+            <span style="font-size: 1.3rem; font-weight: 800; color: #fbbf24;">{roi:.1f}%</span>
+        </div>
+    </div>
+</div>
+""")
+
+PLANTILLA_INFLACION = compactar("""
+<div style="background: linear-gradient(145deg, rgba(239, 68, 68, 0.1), rgba(220, 38, 38, 0.05)); border: 1px solid rgba(239, 68, 68, 0.3); border-radius: 12px; padding: 20px; margin-top: 16px;">
+    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 12px;">
+        <div style="font-size: 1.5rem;">⚠️</div>
+        <div>
+            <div style="color: #fbbf24; font-weight: 700;">Erosión por Inflación ({inflacion}%)</div>
+        </div>
+    </div>
+    <div style="color: #cbd5e1; font-size: 0.95rem;">
+        Pérdida estimada de poder adquisitivo: <strong style="color: #f87171;">{simbolo}{perdida:,.0f}</strong> ({porcentaje:.1f}%)
+        <br><em style="font-size: 0.85rem; opacity: 0.8;">La brecha entre ambas líneas es el "costo invisible" de la inflación.</em>
+    </div>
+</div>
+""")
+
+
+def tarjeta_html(nombre, tasa, res, simbolo, seleccionada):
+    """
+    Tarjeta de resultados de un escenario.
+    """
+    ganancia = res["saldo_nominal"] - res["total_depositado"]
+    roi = (ganancia / res["total_depositado"]) * 100 if res["total_depositado"] > 0 else 0
+    return PLANTILLA_TARJETA.format(
+        **ESTILO_TARJETA[seleccionada], nombre=nombre, tasa=tasa, simbolo=simbolo, saldo_nominal=res["saldo_nominal"],
+        saldo_real=res["saldo_real"], total_depositado=res["total_depositado"], ganancia=ganancia, roi=roi
+    )
+
+
+# --- GRÁFICOS (especificaciones Vega-Lite) ---
+def _campo(nombre):
+    # Vega-Lite lee "." y "[]" como acceso a campos anidados
+    return re.sub(r"([.\[\]\\])", r"\\\1", str(nombre))
+
+
+def grafico_lineas(datos, colores=None, area=False, formato_y=",.0f"):
+    """
+    Datos y especificación para st.vega_lite_chart equivalentes a
+    st.line_chart (o st.area_chart apilado) de `datos`: una columna por
+    serie y el índice en el eje horizontal, con zoom y el valor de cada
+    serie al pasar el cursor.
+    """
+    eje = datos.index.name or "index"
+    series = [str(c) for c in datos.columns]
+    tabla = datos.reset_index()
+    tabla.columns = [eje, *series]
+    color = {"field": "Serie", "type": "nominal", "sort": series, "legend": {"orient": "bottom", "title": None}}
+    if colores is not None:
+        color["scale"] = {"domain": series, "range": list(colores)}
+    x = {"field": _campo(eje), "type": "quantitative", "title": eje}
+    y = {"field": "Valor", "type": "quantitative", "title": None, "axis": {"format": formato_y}}
+    if area:
+        y["stack"] = "zero"
+    return tabla, {
+        "transform": [{"fold": [_campo(s) for s in series], "as": ["Serie", "Valor"]}],
+        "layer": [
+            {
+                "mark": {"type": "area" if area else "line"},
+                "params": [{"name": "zoom", "select": "interval", "bind": "scales"}],
+                "encoding": {"x": x, "y": y, "color": color},
+            },
+            {
+                "mark": {"type": "point", "filled": True, "size": 60},
+                "params": [{"name": "cercano", "select": {"type": "point", "nearest": True, "on": "pointerover",
+                                                            "fields": [_campo(eje)], "clear": "pointerout"}}],
+                "encoding": {
+                    "x": x, "y": y, "color": color,
+                    "opacity": {"condition": {"param": "cercano", "value": 1, "empty": False}, "value": 0},
+                    "tooltip": [
+                        {"field": _campo(eje), "type": "quantitative", "title": eje},
+                        {"field": "Serie", "type": "nominal"},
+                        {"field": "Valor", "type": "quantitative", "format": formato_y},
+                    ],
+                },
+            },
+        ],
+    }
+
+
+def grafico_histograma(campo, titulo_x, titulo_y, color, max_intervalos=40):
+    """
+    Especificación de un histograma de la columna `campo`.
+    """
+    return {
+        "mark": {"type": "bar", "color": color},
+        "encoding": {
+            "x": {"field": _campo(campo), "type": "quantitative", "bin": {"maxbins": max_intervalos}, "title": titulo_x},
+            "y": {"aggregate": "count", "type": "quantitative", "title": titulo_y},
+        },
+    }
+
+
+def grafico_mapa_calor(eje_x, eje_y, campo, titulo_color, formato_ejes=".4~f"):
+    """
+    Especificación de un mapa de calor (ejes ordinales, color continuo).
+    """
+    return {
+        "mark": {"type": "rect"},
+        "encoding": {
+            "x": {"field": _campo(eje_x), "type": "ordinal", "axis": {"format": formato_ejes}},
+            "y": {"field": _campo(eje_y), "type": "ordinal", "sort": "descending", "axis": {"format": formato_ejes}},
+            "color": {"field": _campo(campo), "type": "quantitative", "scale": {"scheme": "viridis"}, "title": titulo_color},
+            "tooltip": [
+                {"field": _campo(eje_x), "type": "quantitative", "title": eje_x},
+                {"field": _campo(eje_y), "type": "quantitative", "title": eje_y},
+                {"field": _campo(campo), "type": "quantitative", "format": ",.0f"},
+            ],
+        },
+    }
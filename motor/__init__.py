@@ -0,0 +1,42 @@
+"""
+Núcleo de cálculo de la calculadora financiera (planes voluntarios BN Vital).
+
+Se puede importar sin Streamlit; pandas sólo se carga al construir tablas
+o procesar abonos. La línea de comandos está en `python -m motor`.
+"""
+from .abonos import leer_archivo_abonos, parsear_fechas, parsear_montos, procesar_abonos
+from .bonificacion import (
+    cargar_matriz_bonificacion,
+    matriz_por_mes,
+    obtener_tasa_bonificacion,
+    tasas_bonificacion,
+)
+from .proyeccion import (
+    COLUMNAS_DETALLE,
+    COLUMNAS_POR_ESCENARIO,
+    columnas_detalle,
+    construir_df_detalle,
+    fechas_mensuales,
+    mes_de_reanudacion,
+    proyectar,
+    proyectar_escenarios,
+    seleccionar_escenario,
+    unir_escenarios,
+    vector_aportes,
+)
+from .cache import CacheResultados, huella_plan
+from .cartera import procesar_cartera, proyectar_cartera
+from .exacto import REDONDEOS, proyectar_escenarios_centimos
+from .escenarios import calcular_escenario_completo, calcular_escenarios, resumir_resultado
+from .historico import backtesting, leer_serie_historica, tabla_ventanas
+from .metas import VARIABLES_META, resolver_meta
+from .montecarlo import simular_montecarlo
+from .paralelo import dividir_rango, mapear, procesos_disponibles
+from .retiro import (
+    MODALIDADES,
+    prob_ruina_de_monto,
+    retiro_sostenible,
+    simular_retiro,
+    tabla_sostenible,
+)
+from .sensibilidad import EJES_BARRIDO, barrido_parametros, corte_barrido, tabla_barrido
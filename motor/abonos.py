@@ -0,0 +1,132 @@
+from pathlib import Path
+
+import numpy as np
+
+# Símbolos y separadores que se limpian de los montos escritos como texto
+# (ambas monedas, por si el usuario cambia de moneda con datos cargados)
+_PATRON_MONTO = r"[,₡$\s]"
+
+
+# --- PROCESAMIENTO DE ABONOS EXTRAORDINARIOS ---
+def parsear_fechas(columna):
+    """
+    Convierte la columna Fecha a datetime64 en bloque. Acepta date/datetime,
+    Timestamp y texto (día primero: DD/MM/AAAA, o ISO AAAA-MM-DD); lo que no
+    se pueda interpretar queda como NaT.
+    """
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(columna):
+        return pd.to_datetime(columna).dt.tz_localize(None) if columna.dt.tz is not None else columna
+
+    es_texto = columna.map(type) == str
+    fechas = pd.Series(pd.NaT, index=columna.index, dtype="datetime64[ns]")
+
+    objetos = columna[~es_texto & columna.notna()]
+    objetos = objetos[objetos.map(lambda v: hasattr(v, "year") and hasattr(v, "month"))]
+    if len(objetos):
+        fechas[objetos.index] = pd.to_datetime(objetos, errors="coerce")
+
+    textos = columna[es_texto].str.strip()
+    textos = textos[textos != ""]
+    if len(textos):
+        # Formatos frecuentes primero (rápidos); el resto se interpreta uno a uno
+        convertidas = pd.to_datetime(textos, format="%d/%m/%Y", errors="coerce")
+        pendientes = convertidas.isna()
+        if pendientes.any():
+            convertidas[pendientes] = pd.to_datetime(textos[pendientes], format="ISO8601", errors="coerce")
+            pendientes = convertidas.isna()
+        if pendientes.any():
+            convertidas[pendientes] = pd.to_datetime(textos[pendientes], format="mixed", dayfirst=True, errors="coerce")
+        fechas[convertidas.index] = convertidas
+    return fechas
+
+
+def parsear_montos(columna):
+    """
+    Convierte la columna Monto a float en bloque, limpiando símbolos de
+    moneda y separadores de miles en los valores de texto.
+    """
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(columna):
+        return columna.astype(float)
+    es_texto = columna.map(type) == str
+    montos = pd.to_numeric(columna.where(~es_texto), errors="coerce").astype(float)
+    if es_texto.any():
+        limpios = columna[es_texto].str.replace(_PATRON_MONTO, "", regex=True)
+        montos[es_texto] = pd.to_numeric(limpios, errors="coerce")
+    return montos
+
+
+def procesar_abonos(abonos_extra_df, start_date, anos):
+    """
+    Convierte la tabla de abonos en un mapa {mes: monto} relativo a la fecha
+    de inicio, junto con la lista de filas ignoradas.
+
+    Fechas y montos se convierten columna por columna y los montos se
+    agregan por mes con bincount. Las filas sin fecha o monto válido (o con
+    monto <= 0) se descartan en silencio; las que caen antes del inicio o
+    fuera del plazo se informan por número de fila.
+    """
+    meses = int(anos * 12)
+    abonos_map = {}
+    abonos_ignorados = []
+
+    if abonos_extra_df is None or abonos_extra_df.empty:
+        return abonos_map, abonos_ignorados
+
+    if "Fecha" not in abonos_extra_df or "Monto" not in abonos_extra_df:
+        return abonos_map, abonos_ignorados
+
+    fechas = parsear_fechas(abonos_extra_df["Fecha"])
+    montos = parsear_montos(abonos_extra_df["Monto"])
+    validas = (fechas.notna() & montos.notna() & (montos > 0)).to_numpy()
+
+    mes_abono = fechas.to_numpy().astype("datetime64[M]").astype(np.int64)
+    mes_inicio = np.datetime64(start_date, "M").astype(np.int64)
+    diff_meses = np.where(validas, mes_abono - mes_inicio, 0)
+
+    en_plazo = validas & (diff_meses >= 0) & (diff_meses < meses)
+    if en_plazo.any():
+        totales = np.bincount(diff_meses[en_plazo], weights=montos.to_numpy()[en_plazo], minlength=meses)
+        abonos_map = {int(mes): float(totales[mes]) for mes in np.flatnonzero(totales)}
+
+    # Diagnóstico por fila (en el orden de la tabla)
+    fuera = np.flatnonzero(validas & ~en_plazo)
+    if len(fuera):
+        etiquetas = abonos_extra_df.index
+        for pos in fuera:
+            etiqueta = etiquetas[pos]
+            fila = etiqueta + 1 if isinstance(etiqueta, (int, np.integer)) else pos + 1
+            if diff_meses[pos] < 0:
+                abonos_ignorados.append(f"Fila {fila}: Fecha {fechas.iloc[pos].strftime('%d/%m/%Y')} es anterior al inicio")
+            else:
+                abonos_ignorados.append(f"Fila {fila}: Fecha fuera del plazo ({anos} años)")
+
+    return abonos_map, abonos_ignorados
+
+
+def leer_archivo_abonos(archivo, nombre=None):
+    """
+    Lee un calendario de abonos desde CSV o Excel (ruta o archivo subido).
+    Usa las columnas Fecha y Monto si existen (sin importar mayúsculas);
+    si no, toma las dos primeras columnas en ese orden.
+    """
+    import pandas as pd
+
+    nombre = nombre or getattr(archivo, "name", None) or str(archivo)
+    if Path(nombre).suffix.lower() in (".xlsx", ".xls"):
+        df = pd.read_excel(archivo, dtype=object)
+    else:
+        df = pd.read_csv(archivo, dtype=str, sep=None, engine="python")
+
+    columnas = {str(c).strip().lower(): c for c in df.columns}
+    if "fecha" in columnas and "monto" in columnas:
+        df = df[[columnas["fecha"], columnas["monto"]]]
+    elif len(df.columns) >= 2:
+        df = df.iloc[:, :2]
+    else:
+        raise ValueError("El archivo de abonos debe tener columnas Fecha y Monto")
+    df.columns = ["Fecha", "Monto"]
+    return df.reset_index(drop=True)
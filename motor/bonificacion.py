@@ -0,0 +1,77 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+# --- DATOS DE NEGOCIO: MATRIZ DE BONIFICACIÓN BN VITAL (BIMONETARIA) ---
+# Las matrices viven en archivos versionados (tablas/bonificacion_<versión>.json).
+# Para actualizar las tasas basta con agregar un archivo con una versión mayor.
+DIRECTORIO_TABLAS = Path(__file__).parent / "tablas"
+
+
+def _ruta_vigente():
+    rutas = sorted(DIRECTORIO_TABLAS.glob("bonificacion_*.json"))
+    if not rutas:
+        raise FileNotFoundError(f"No hay tablas de bonificación en {DIRECTORIO_TABLAS}")
+    return rutas[-1]
+
+
+@lru_cache(maxsize=None)
+def cargar_matriz_bonificacion(ruta=None):
+    """
+    Carga una matriz de bonificación desde JSON (por defecto la versión más
+    reciente). Devuelve un dict con los umbrales de antigüedad (columnas) y,
+    por moneda, los umbrales de saldo (filas) y la tabla 2-D de porcentajes.
+    """
+    ruta = Path(ruta) if ruta else _ruta_vigente()
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+
+    antiguedad = np.asarray(datos["antiguedad_meses"], dtype=float)
+    monedas = {}
+    for moneda, tabla in datos["monedas"].items():
+        saldos = np.asarray(tabla["saldos"], dtype=float)
+        porcentajes = np.asarray(tabla["porcentajes"], dtype=float)
+        if porcentajes.shape != (len(saldos) + 1, len(antiguedad) + 1):
+            raise ValueError(f"Tabla {moneda} de {ruta.name}: dimensiones {porcentajes.shape} no coinciden con los umbrales")
+        monedas[moneda] = {"saldos": saldos, "porcentajes": porcentajes}
+
+    return {"version": str(datos["version"]), "antiguedad_meses": antiguedad, "monedas": monedas}
+
+
+def tasas_bonificacion(meses_antiguedad, saldo_acumulado, es_dolares=False, matriz=None):
+    """
+    Versión vectorizada de obtener_tasa_bonificacion: acepta escalares o
+    arreglos (que se combinan con broadcasting) de meses y saldos.
+    """
+    if matriz is None:
+        matriz = cargar_matriz_bonificacion()
+    tabla = matriz["monedas"]["USD" if es_dolares else "CRC"]
+
+    # Columna: tramo de antigüedad (< 24, < 48, < 72, < 96, 96 o más)
+    col_idx = np.searchsorted(matriz["antiguedad_meses"], meses_antiguedad, side="right")
+    # Fila: tramo de saldo según la moneda
+    fila_idx = np.searchsorted(tabla["saldos"], saldo_acumulado, side="right")
+    return tabla["porcentajes"][fila_idx, col_idx]
+
+
+def matriz_por_mes(meses, es_dolares=False, matriz=None):
+    """
+    Prepara la búsqueda de bonificación para un plazo: devuelve los umbrales
+    de saldo de la moneda y la tabla (tramo de saldo x mes 0..meses) con la
+    columna de antigüedad ya resuelta para cada mes.
+    """
+    if matriz is None:
+        matriz = cargar_matriz_bonificacion()
+    tabla = matriz["monedas"]["USD" if es_dolares else "CRC"]
+    col_idx = np.searchsorted(matriz["antiguedad_meses"], np.arange(meses + 1), side="right")
+    return tabla["saldos"], tabla["porcentajes"][:, col_idx]
+
+
+def obtener_tasa_bonificacion(meses_antiguedad, saldo_acumulado, es_dolares=False):
+    """
+    Calcula el % de bonificación basándose en la antigüedad y el saldo.
+    Soporta lógica diferenciada para Colones y Dólares.
+    """
+    return float(tasas_bonificacion(meses_antiguedad, saldo_acumulado, es_dolares))
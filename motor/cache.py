@@ -0,0 +1,149 @@
+"""
+Caché acotado de resultados del motor.
+
+Las claves son huellas canónicas de las entradas (mapa mensual de abonos
+normalizado, tasas, plazo, moneda...), de modo que dos tablas de abonos
+equivalentes pero en distinto orden comparten la misma entrada. El caché
+aplica LRU, vencimiento por TTL y un tope de memoria, y es seguro entre
+hilos para compartirlo entre sesiones del mismo servidor.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .bonificacion import cargar_matriz_bonificacion
+from .cronogramas import huella, normalizar
+from .instrumentacion import anotar_cache
+
+
+def huella_plan(anos, aporte, inicial, comision_pct, inflacion_pct, abonos_map, start_date, es_dolares):
+    """
+    Clave canónica de un plan: mismos valores numéricos y mismo mapa mensual
+    de abonos dan la misma huella, sin importar tipos ni orden de filas.
+    Aporte, comisión e inflación pueden ser cronogramas (ver
+    motor.cronogramas). Incluye la versión de la matriz de bonificación
+    vigente.
+    """
+    meses = int(anos * 12)
+    abonos = tuple(sorted((int(mes), float(monto)) for mes, monto in abonos_map.items() if monto))
+    return (
+        meses, huella(normalizar(aporte, meses)), float(inicial),
+        huella(normalizar(comision_pct, meses)), huella(normalizar(inflacion_pct, meses)),
+        abonos, str(start_date), bool(es_dolares), cargar_matriz_bonificacion()["version"],
+    )
+
+
+def tamano_aproximado(valor):
+    """
+    Bytes aproximados de un resultado: arreglos NumPy por nbytes, el resto
+    con un costo fijo por elemento.
+    """
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sum(tamano_aproximado(v) for v in valor.values()) + 64 * len(valor)
+    if isinstance(valor, (list, tuple)):
+        return sum(tamano_aproximado(v) for v in valor) + 8 * len(valor)
+    if isinstance(valor, (str, bytes)):
+        return len(valor)
+    return 32
+
+
+def _solo_lectura(valor):
+    # Los resultados se comparten entre sesiones: se bloquea su escritura
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, dict):
+        for v in valor.values():
+            _solo_lectura(v)
+    elif isinstance(valor, (list, tuple)):
+        for v in valor:
+            _solo_lectura(v)
+
+
+class CacheResultados:
+    """
+    Caché LRU con TTL y tope de memoria.
+
+    max_entradas y max_bytes acotan el tamaño (se desalojan primero las
+    entradas menos usadas); ttl_segundos vence las entradas antiguas
+    (None = sin vencimiento).
+    """
+
+    def __init__(self, max_entradas=256, max_bytes=64 * 1024**2, ttl_segundos=3600):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl_segundos = ttl_segundos
+        self._entradas = OrderedDict()  # clave -> (valor, bytes, instante)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.vencimientos = 0
+
+    def _quitar(self, clave):
+        _, tamano, _ = self._entradas.pop(clave)
+        self._bytes -= tamano
+
+    def obtener(self, clave, defecto=None):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and self.ttl_segundos is not None and time.monotonic() - entrada[2] > self.ttl_segundos:
+                self._quitar(clave)
+                self.vencimientos += 1
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+            else:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+        anotar_cache(entrada is not None)
+        return defecto if entrada is None else entrada[0]
+
+    def guardar(self, clave, valor):
+        tamano = tamano_aproximado(valor)
+        if tamano > self.max_bytes:
+            return valor
+        _solo_lectura(valor)
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = (valor, tamano, time.monotonic())
+            self._bytes += tamano
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                self._quitar(next(iter(self._entradas)))
+                self.desalojos += 1
+        return valor
+
+    def obtener_o_calcular(self, clave, funcion):
+        """
+        Devuelve el valor cacheado de `clave` o lo calcula con funcion() y lo
+        guarda. Dos sesiones que piden la misma clave a la vez pueden
+        calcularla ambas; el resultado es el mismo.
+        """
+        centinela = object()
+        valor = self.obtener(clave, centinela)
+        if valor is centinela:
+            valor = self.guardar(clave, funcion())
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "desalojos": self.desalojos,
+                "vencimientos": self.vencimientos,
+            }
@@ -0,0 +1,205 @@
+"""
+Proyección masiva de la cartera de clientes.
+
+Lee los planes por bloques desde CSV o Parquet, los proyecta vectorizados
+entre planes (cada uno con su saldo inicial, aporte, plazo y moneda) y va
+escribiendo el resumen de cada bloque, de modo que la memoria no depende
+del tamaño de la cartera.
+"""
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .bonificacion import matriz_por_mes
+from .cerrada import saldos_forma_cerrada
+from .paralelo import dividir_rango, mapear, procesos_disponibles
+from .proyeccion import avanzar_mes
+
+TAMANO_BLOQUE = 20_000
+
+# "mensual": recurrencia mes a mes; "cerrada": saltos por tramo (ver motor.cerrada)
+METODOS = ("mensual", "cerrada")
+
+COLUMNAS_RESUMEN = ["id", "saldo_nominal", "saldo_real", "total_depositado", "ganancia", "roi_pct"]
+
+
+def _proyectar_tarea(tarea):
+    return proyectar_cartera(*tarea)
+
+
+def proyectar_cartera(inicial, aporte, meses, es_dolares, tasa_bruta_pct, comision_pct, inflacion_pct, metodo="mensual",
+                      n_procesos=1, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Proyecta un bloque de planes a la vez. Todos los argumentos son
+    escalares o arreglos de largo n_planes; `meses` es el plazo de cada plan
+    en meses. Aplica las mismas reglas que proyectar_escenarios (comisión y
+    matriz de bonificación BN Vital), sin abonos extraordinarios. Con
+    metodo="cerrada" cada plan avanza por tramos de bonificación constante
+    (mismo resultado salvo redondeo, con muchas menos iteraciones).
+
+    Con n_procesos > 1 (None usa todos los núcleos) los planes se parten en
+    bloques de tamano_bloque filas que se reparten en un pool (ver mapear);
+    cada plan se proyecta sin depender de los demás, así que el resultado
+    es el mismo que en un solo proceso.
+
+    Devuelve un dict con los indicadores finales de cada plan.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo} (use {', '.join(METODOS)})")
+
+    meses = np.asarray(meses, dtype=np.int64)
+    n_planes = len(meses)
+    if n_procesos != 1 and n_planes > tamano_bloque:
+        columnas = [np.broadcast_to(np.asarray(valor), n_planes)
+                    for valor in (inicial, aporte, meses, es_dolares, tasa_bruta_pct, comision_pct, inflacion_pct)]
+        tareas = [(*(columna[inicio:fin] for columna in columnas), metodo)
+                  for inicio, fin in dividir_rango(n_planes, tamano_bloque)]
+        partes = mapear(_proyectar_tarea, tareas, n_procesos)
+        return {clave: np.concatenate([parte[clave] for parte in partes]) for clave in partes[0]}
+
+    inicial = np.broadcast_to(np.asarray(inicial, dtype=float), n_planes)
+    aporte = np.broadcast_to(np.asarray(aporte, dtype=float), n_planes)
+    es_dolares = np.broadcast_to(np.asarray(es_dolares, dtype=bool), n_planes)
+    tasa_mensual_bruta = np.broadcast_to((1 + np.asarray(tasa_bruta_pct, dtype=float) / 100)**(1/12) - 1, n_planes)
+    factor_comision = np.broadcast_to(np.asarray(comision_pct, dtype=float) / 100, n_planes)
+    inflacion_mensual = (1 + np.asarray(inflacion_pct, dtype=float) / 100)**(1/12) - 1
+
+    max_meses = int(meses.max()) if n_planes else 0
+    umbrales_crc, porcentajes_crc = matriz_por_mes(max_meses, es_dolares=False)
+    umbrales_usd, porcentajes_usd = matriz_por_mes(max_meses, es_dolares=True)
+
+    saldo = inicial.copy()
+    if metodo == "cerrada":
+        for dolares, (umbrales, porcentajes) in ((False, (umbrales_crc, porcentajes_crc)), (True, (umbrales_usd, porcentajes_usd))):
+            grupo = es_dolares == dolares
+            if grupo.any():
+                saldo[grupo], _, _ = saldos_forma_cerrada(
+                    tasa_mensual_bruta[grupo], factor_comision[grupo], inicial[grupo], aporte[grupo],
+                    meses[grupo], umbrales, porcentajes[:, :int(meses[grupo].max()) + 1]
+                )
+    else:
+        for i in range(1, max_meses + 1):
+            pct = np.where(
+                es_dolares,
+                porcentajes_usd[np.searchsorted(umbrales_usd, saldo, side="right"), i],
+                porcentajes_crc[np.searchsorted(umbrales_crc, saldo, side="right"), i],
+            )
+            nuevo_saldo = avanzar_mes(saldo, tasa_mensual_bruta, factor_comision, pct, aporte)
+            # Los planes cuyo plazo ya terminó conservan su saldo final
+            saldo = np.where(i <= meses, nuevo_saldo, saldo)
+
+    total_depositado = inicial + aporte * meses
+    ganancia = saldo - total_depositado
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(total_depositado > 0, ganancia / total_depositado * 100, 0.0)
+
+    return {
+        "saldo_nominal": saldo,
+        "saldo_real": saldo / (1 + inflacion_mensual)**meses,
+        "total_depositado": total_depositado,
+        "ganancia": ganancia,
+        "roi_pct": roi,
+    }
+
+
+def leer_bloques(ruta, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Itera la cartera en DataFrames de a lo sumo tamano_bloque planes.
+    Parquet requiere pyarrow.
+    """
+    import pandas as pd
+
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Leer Parquet requiere pyarrow (pip install pyarrow)") from e
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(ruta, chunksize=tamano_bloque)
+
+
+def resumir_bloque(df, tasa_bruta_pct, comision_pct, inflacion_pct, metodo="mensual", n_procesos=1,
+                   tamano_bloque=TAMANO_BLOQUE):
+    """
+    Valida y proyecta un bloque de planes. Las columnas tasa_bruta_pct,
+    comision_pct e inflacion_pct, si existen, reemplazan los valores
+    generales para ese plan. n_procesos y tamano_bloque se pasan a
+    proyectar_cartera. Devuelve (DataFrame de resumen, planes inválidos).
+    """
+    import pandas as pd
+
+    def columna(nombre, defecto):
+        if nombre in df:
+            return pd.to_numeric(df[nombre], errors="coerce").fillna(defecto).to_numpy(dtype=float)
+        return np.full(len(df), float(defecto))
+
+    inicial = columna("saldo_inicial", 0)
+    aporte = columna("aporte_mensual", 0)
+    plazo = columna("plazo_anos", 0)
+    comision = columna("comision_pct", comision_pct)
+    moneda = df["moneda"].astype(str).str.upper() if "moneda" in df else pd.Series("CRC", index=df.index)
+
+    # Mismas validaciones que la barra lateral de la app
+    validos = (
+        (plazo >= 1) & (plazo <= 50) & (plazo == np.floor(plazo))
+        & (inicial >= 0) & (aporte >= 0) & ((inicial > 0) | (aporte > 0))
+        & (comision < 100) & moneda.isin(["CRC", "USD"]).to_numpy()
+    )
+
+    res = proyectar_cartera(
+        inicial[validos], aporte[validos], (plazo[validos] * 12).astype(np.int64),
+        (moneda == "USD").to_numpy()[validos],
+        columna("tasa_bruta_pct", tasa_bruta_pct)[validos], comision[validos],
+        columna("inflacion_pct", inflacion_pct)[validos], metodo, n_procesos, tamano_bloque,
+    )
+    ids = df["id"].to_numpy()[validos] if "id" in df else df.index.to_numpy()[validos]
+    resumen = pd.DataFrame({"id": ids, **res}, columns=COLUMNAS_RESUMEN)
+    return resumen, int((~validos).sum())
+
+
+def procesar_cartera(ruta_entrada, ruta_salida, tasa_bruta_pct=10.0, comision_pct=10.0, inflacion_pct=3.0,
+                     tamano_bloque=TAMANO_BLOQUE, metodo="mensual", n_procesos=1):
+    """
+    Proyecta toda la cartera de ruta_entrada (CSV o Parquet) y escribe el
+    resumen por plan en ruta_salida (CSV, o Parquet con pyarrow) bloque a
+    bloque. Con n_procesos > 1 (None usa todos los núcleos) se lee un
+    bloque de tamano_bloque planes por proceso y el pool los proyecta a la
+    vez. Devuelve estadísticas de la corrida, incluidos planes/segundo.
+    """
+    ruta_salida = Path(ruta_salida)
+    a_parquet = ruta_salida.suffix.lower() == ".parquet"
+    escritor = None
+    planes = invalidos = 0
+    inicio = time.perf_counter()
+    bloques_por_lectura = procesos_disponibles() if n_procesos is None else max(n_procesos, 1)
+
+    try:
+        for n, df in enumerate(leer_bloques(ruta_entrada, tamano_bloque * bloques_por_lectura)):
+            resumen, n_invalidos = resumir_bloque(df, tasa_bruta_pct, comision_pct, inflacion_pct, metodo,
+                                                  n_procesos, tamano_bloque)
+            planes += len(resumen)
+            invalidos += n_invalidos
+            if a_parquet:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                tabla = pa.Table.from_pandas(resumen, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(ruta_salida, tabla.schema)
+                escritor.write_table(tabla)
+            else:
+                resumen.to_csv(ruta_salida, mode="w" if n == 0 else "a", header=(n == 0), index=False)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    segundos = time.perf_counter() - inicio
+    return {
+        "planes": planes,
+        "planes_invalidos": invalidos,
+        "segundos": segundos,
+        "planes_por_segundo": planes / segundos if segundos > 0 else float("inf"),
+    }
@@ -0,0 +1,130 @@
+"""
+Motor en forma cerrada: avanza el saldo por tramos en lugar de mes a mes.
+
+Mientras no cambian el tramo de bonificación (antigüedad y saldo) ni el
+aporte, la recurrencia mensual es lineal con tasa efectiva y aporte
+constantes:
+
+    saldo[k] = saldo[0] * g**k + aporte * (g**k - 1) / (g - 1)
+    g = 1 + tasa_mensual * (1 - comision * (1 - bonificacion))
+
+así que cada tramo se resuelve de un salto. Los cortes de antigüedad, los
+meses con abono y los meses a registrar se conocen de antemano; el mes en
+que el saldo cruza el siguiente umbral de la matriz se despeja de la misma
+fórmula. El costo es O(tramos) por plan en vez de O(meses), vectorizado
+entre planes (cada uno avanza hasta su propio siguiente corte).
+
+Sólo aplica con tasa constante: Monte Carlo sortea una tasa distinta cada
+mes y sigue usando la recurrencia mensual.
+"""
+import numpy as np
+
+# Margen (en meses) al despejar el cruce de un umbral: un salto un poco más
+# corto sólo agrega un tramo; uno más largo usaría una bonificación errónea.
+_MARGEN_CRUCE = 1e-6
+
+
+def _fronteras(meses, porcentajes_mes, extras, meses_registro):
+    """
+    Para cada mes i, el primer mes > i donde empieza un tramo nuevo: cambia
+    la columna de antigüedad, hay un abono (que ocupa un tramo de un mes)
+    o el mes anterior se registra.
+    """
+    inicio_tramo = np.zeros(meses + 2, dtype=bool)
+    inicio_tramo[1:meses + 1] = np.any(porcentajes_mes[:, 1:] != porcentajes_mes[:, :-1], axis=0)
+    meses_abono = np.flatnonzero(extras[:meses + 1])
+    inicio_tramo[meses_abono] = True
+    inicio_tramo[meses_abono + 1] = True
+    inicio_tramo[np.asarray(meses_registro, dtype=np.int64) + 1] = True
+    inicio_tramo[meses + 1] = True
+
+    cortes = np.flatnonzero(inicio_tramo)
+    return cortes[np.searchsorted(cortes, np.arange(meses + 1), side="right")]
+
+
+def _meses_en_fila(saldo, tasa_efectiva, aporte, inferior, superior):
+    """
+    Cuántos meses seguidos (al menos 1) el saldo inicial del mes sigue en
+    [inferior, superior), es decir, en la misma fila de la matriz.
+    """
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        sin_tasa = tasa_efectiva == 0
+        punto_fijo = -aporte / tasa_efectiva
+        log_g = np.log1p(tasa_efectiva)
+        cruces = []
+        for umbral in (superior, inferior):
+            k = np.where(
+                sin_tasa,
+                (umbral - saldo) / aporte,
+                np.log((umbral - punto_fijo) / (saldo - punto_fijo)) / log_g,
+            )
+            cruces.append(np.where(np.isfinite(k) & (k > 0), k, np.inf))
+        k = np.minimum(*cruces)
+    return np.maximum(np.ceil(np.minimum(k, 1e9) - _MARGEN_CRUCE), 1).astype(np.int64)
+
+
+def _avanzar(saldo, tasa_efectiva, aporte, n):
+    """
+    Saldo tras n meses con tasa efectiva y aporte constantes.
+    """
+    crecimiento = np.expm1(n * np.log1p(tasa_efectiva))  # g**n - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        suma_aportes = np.where(tasa_efectiva == 0, aporte * n, aporte * crecimiento / tasa_efectiva)
+    return saldo + saldo * crecimiento + suma_aportes
+
+
+def saldos_forma_cerrada(tasa_mensual_bruta, factor_comision, inicial, aporte, meses, umbrales_saldo,
+                         porcentajes_mes, extras=None, meses_registro=()):
+    """
+    Saldo final de cada plan (arreglos de largo n_planes o escalares) con
+    las mismas reglas que proyectar_escenarios: `meses` es el plazo de cada
+    plan, porcentajes_mes la tabla de matriz_por_mes hasta el plazo más
+    largo y `extras` los abonos por mes (compartidos por todos los planes).
+
+    Devuelve (saldo final, saldos en los meses de meses_registro (planes x
+    puntos, NaN si el plan es más corto), número de saltos).
+    """
+    meses = np.atleast_1d(np.asarray(meses, dtype=np.int64))
+    n_planes = len(meses)
+    max_meses = int(meses.max()) if n_planes else 0
+    tasa_mensual_bruta = np.broadcast_to(np.asarray(tasa_mensual_bruta, dtype=float), n_planes)
+    factor_comision = np.broadcast_to(np.asarray(factor_comision, dtype=float), n_planes)
+    aporte = np.broadcast_to(np.asarray(aporte, dtype=float), n_planes)
+    extras = np.zeros(max_meses + 1) if extras is None else np.asarray(extras, dtype=float)[:max_meses + 1]
+    meses_registro = np.asarray(meses_registro, dtype=np.int64)
+
+    siguiente_corte = _fronteras(max_meses, porcentajes_mes, extras, meses_registro[meses_registro <= max_meses])
+    posicion = np.full(max_meses + 1, -1)
+    registrables = meses_registro <= max_meses
+    posicion[meses_registro[registrables]] = np.flatnonzero(registrables)
+    registro = np.full((n_planes, len(meses_registro)), np.nan)
+    # Fila de la matriz: límites [inferior, superior) de cada tramo de saldo
+    limites = np.concatenate(([-np.inf], umbrales_saldo, [np.inf]))
+
+    saldo = np.broadcast_to(np.asarray(inicial, dtype=float), n_planes).copy()
+    if posicion[0] >= 0:
+        registro[:, posicion[0]] = saldo
+    mes = np.zeros(n_planes, dtype=np.int64)
+    saltos = 0
+    while True:
+        activos = mes < meses
+        if not activos.any():
+            break
+        i = np.minimum(mes + 1, max_meses)
+        fila = np.searchsorted(umbrales_saldo, saldo, side="right")
+        pct = porcentajes_mes[fila, i]
+        tasa_efectiva = tasa_mensual_bruta * (1 - factor_comision * (1 - pct / 100))
+        aporte_mes = aporte + extras[i]
+
+        n = np.minimum(siguiente_corte[i] - i, meses - mes)
+        n = np.minimum(n, _meses_en_fila(saldo, tasa_efectiva, aporte_mes, limites[fila], limites[fila + 1]))
+        n = np.where(activos, n, 0)
+        saldo = _avanzar(saldo, tasa_efectiva, aporte_mes, n)
+        mes += n
+        saltos += 1
+
+        col = posicion[mes]
+        anotar = activos & (col >= 0)
+        registro[anotar, col[anotar]] = saldo[anotar]
+
+    return saldo, registro, saltos
@@ -0,0 +1,293 @@
+"""
+Línea de comandos para proyectar planes sin levantar Streamlit.
+
+Uso:
+    python -m motor plan.json
+    python -m motor planes.csv --salida resumen.csv
+    python -m motor plan.json --abonos abonos.csv --detalle detalle.csv
+    python -m motor cartera.csv --cartera --tasa 10 --salida resumen.csv
+    python -m motor cartera.csv --cartera --metodo cerrada --salida resumen.csv
+    python -m motor cartera.csv --cartera --procesos 4 --salida resumen.csv
+    python -m motor planes.csv --salida resumen.parquet --detalle detalle.arrow
+    python -m motor plan.json --exacto --redondeo mitad_par --detalle detalle.csv
+
+El plan JSON usa las mismas variables de la barra lateral de la app:
+
+    {
+        "moneda": "CRC",
+        "fecha_inicio": "2025-01-15",
+        "saldo_inicial": 0,
+        "aporte_mensual": 200,
+        "plazo_anos": 30,
+        "inflacion_pct": 3.0,
+        "comision_pct": 10.0,
+        "escenarios": {"Conservador": 9.0, "Moderado": 10.0, "Optimista": 17.0},
+        "abonos": [{"Fecha": "05/03/2026", "Monto": 100000}]
+    }
+
+Las tasas de los escenarios, el aporte, la inflación y la comisión
+aceptan también un cronograma (ver motor.cronogramas), por ejemplo:
+
+    "aporte_mensual": {"indexado": {"base": 200, "crecimiento_anual_pct": 4}},
+    "inflacion_pct": {"lineal": {"0": 4.0, "120": 3.0}},
+    "escenarios": {"Ciclo de vida": {"0": 12.0, "240": 9.0, "300": 6.0}}
+
+En el resumen, la tasa de un escenario con cronograma es la tasa anual
+constante equivalente.
+
+En CSV cada fila es un plan, con una columna por variable y una columna
+"tasa_<Escenario>" por escenario; una celda puede traer un cronograma en
+JSON. Los abonos de --abonos (CSV o Excel con
+columnas Fecha y Monto) se aplican a todos los planes.
+
+--salida y --detalle aceptan además .parquet y .arrow (requieren pyarrow):
+conservan los tipos de cada columna y se leen mucho más rápido que CSV
+(ver motor.columnar).
+
+Con --exacto los planes se proyectan en céntimos enteros con redondeo en
+cada paso (ver motor.exacto), para conciliar al céntimo contra los estados
+de cuenta.
+
+Con --cartera el archivo (CSV o Parquet) se trata como la cartera de
+clientes: se procesa por bloques con una sola tasa bruta y el resumen por
+plan se escribe en --salida a medida que avanza (ver motor.cartera).
+Con --procesos N los bloques se reparten en N procesos.
+"""
+import argparse
+import csv
+import json
+import sys
+from contextlib import nullcontext
+from datetime import date
+from pathlib import Path
+
+from .abonos import leer_archivo_abonos
+from .cartera import METODOS, procesar_cartera
+from .cronogramas import expandir, leer, normalizar, tasa_equivalente
+from .escenarios import calcular_escenarios, resumir_resultado
+from .exacto import REDONDEOS
+from .exportar import escribir_csv
+
+EXTENSIONES_COLUMNARES = (".parquet", ".arrow", ".feather")
+
+# Mismos valores por defecto que la barra lateral de la app
+PLAN_POR_DEFECTO = {
+    "moneda": "CRC",
+    "fecha_inicio": None,
+    "saldo_inicial": 0,
+    "aporte_mensual": 200,
+    "plazo_anos": 30,
+    "inflacion_pct": 3.0,
+    "comision_pct": 10.0,
+    "escenarios": {"Conservador": 9.0, "Moderado": 10.0, "Optimista": 17.0},
+    "abonos": [],
+}
+
+CAMPOS_RESUMEN = ["plan", "escenario", "tasa_bruta_pct", "saldo_nominal", "saldo_real", "total_depositado", "ganancia", "roi_pct"]
+
+
+def _numero(valor, nombre, tipo=float):
+    try:
+        return tipo(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"{nombre}: se espera un número ({valor!r})") from None
+
+
+def normalizar_plan(datos):
+    """
+    Completa un plan con los valores por defecto y valida sus variables.
+    Lanza ValueError con un mensaje legible si algo no es válido (también
+    si un campo trae un tipo inesperado, p. ej. escenarios como lista).
+    """
+    plan = {**PLAN_POR_DEFECTO, **{k: v for k, v in datos.items() if v not in (None, "")}}
+
+    moneda = str(plan["moneda"]).upper()
+    if moneda not in ("CRC", "USD"):
+        raise ValueError(f"Moneda no soportada: {plan['moneda']} (use CRC o USD)")
+
+    fecha = plan["fecha_inicio"]
+    if isinstance(fecha, str):
+        try:
+            fecha_inicio = date.fromisoformat(fecha)
+        except ValueError:
+            raise ValueError(f"fecha_inicio: se espera una fecha AAAA-MM-DD ({fecha!r})") from None
+    elif fecha is None or isinstance(fecha, date):
+        fecha_inicio = fecha or date.today()
+    else:
+        raise ValueError(f"fecha_inicio: se espera una fecha AAAA-MM-DD ({fecha!r})")
+
+    if not isinstance(plan["escenarios"], dict) or not plan["escenarios"]:
+        raise ValueError('escenarios: se espera un objeto {"nombre": tasa_bruta_pct, ...} con al menos un escenario')
+    if not isinstance(plan["abonos"], list):
+        raise ValueError('abonos: se espera una lista [{"Fecha": ..., "Monto": ...}, ...]')
+
+    saldo_inicial = _numero(plan["saldo_inicial"], "saldo_inicial")
+    aporte_mensual = leer(plan["aporte_mensual"], "aporte_mensual")
+    plazo_anos = _numero(plan["plazo_anos"], "plazo_anos", int)
+    comision_pct = leer(plan["comision_pct"], "comision_pct")
+    inflacion_pct = leer(plan["inflacion_pct"], "inflacion_pct")
+    escenarios = {nombre: leer(tasa, f"escenario {nombre}") for nombre, tasa in plan["escenarios"].items()}
+    if not 1 <= plazo_anos <= 50:
+        raise ValueError("El plazo debe estar entre 1 y 50 años")
+    meses = plazo_anos * 12
+    for valor in (aporte_mensual, comision_pct, inflacion_pct, *escenarios.values()):
+        expandir(valor, meses)
+    if saldo_inicial < 0:
+        raise ValueError("El saldo inicial no puede ser negativo")
+    if (expandir(aporte_mensual, meses) < 0).any():
+        raise ValueError("El aporte mensual no puede ser negativo")
+    if saldo_inicial == 0 and not expandir(aporte_mensual, meses)[1:].any():
+        raise ValueError("Ingresa un Saldo Inicial o Aporte Mensual")
+    if (expandir(comision_pct, meses) >= 100).any():
+        raise ValueError("La comisión no puede ser 100% o mayor")
+
+    return {
+        "moneda": moneda,
+        "fecha_inicio": fecha_inicio,
+        "saldo_inicial": saldo_inicial,
+        "aporte_mensual": aporte_mensual,
+        "plazo_anos": plazo_anos,
+        "inflacion_pct": inflacion_pct,
+        "comision_pct": comision_pct,
+        "escenarios": escenarios,
+        "abonos": list(plan["abonos"]),
+    }
+
+
+def leer_planes(ruta):
+    """
+    Lee uno o varios planes desde JSON (objeto o lista de objetos) o CSV.
+    """
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".json":
+        with open(ruta, encoding="utf-8") as f:
+            datos = json.load(f)
+        return datos if isinstance(datos, list) else [datos]
+
+    planes = []
+    with open(ruta, newline="", encoding="utf-8-sig") as f:
+        for fila in csv.DictReader(f):
+            escenarios = {k[len("tasa_"):]: v for k, v in fila.items() if k.startswith("tasa_") and v}
+            plan = {k: v for k, v in fila.items() if not k.startswith("tasa_")}
+            if escenarios:
+                plan["escenarios"] = escenarios
+            planes.append(plan)
+    return planes
+
+
+def ejecutar_plan(plan, con_detalle=False, exacto=False, redondeo="mitad_arriba"):
+    """
+    Proyecta todos los escenarios de un plan normalizado. Devuelve el
+    resumen por escenario, los abonos ignorados y, si se pide, la
+    proyección de cada escenario para exportar su tabla detallada.
+    """
+    abonos_df = None
+    if plan["abonos"]:
+        import pandas as pd
+        abonos_df = pd.DataFrame(plan["abonos"], columns=["Fecha", "Monto"])
+
+    nombres = list(plan["escenarios"])
+    resultados = calcular_escenarios(
+        tuple(plan["escenarios"].values()), plan["plazo_anos"], plan["aporte_mensual"], plan["saldo_inicial"],
+        plan["comision_pct"], plan["inflacion_pct"], abonos_df, plan["fecha_inicio"], plan["moneda"] == "USD",
+        exacto=exacto, redondeo=redondeo
+    )
+    return {
+        "resumen": {nombre: resumir_resultado(res) for nombre, res in zip(nombres, resultados)},
+        "abonos_ignorados": resultados[0]["abonos_ignorados"] if resultados else [],
+        "detalle": {nombre: res["proyeccion"] for nombre, res in zip(nombres, resultados)} if con_detalle else None,
+    }
+
+
+def filas_resumen(id_plan, plan, salida):
+    for nombre, resumen in salida["resumen"].items():
+        meses = plan["plazo_anos"] * 12
+        tasa = tasa_equivalente(normalizar(plan["escenarios"][nombre], meses), meses)
+        yield {"plan": id_plan, "escenario": nombre, "tasa_bruta_pct": tasa, **resumen}
+
+
+def escribir_detalle(destino, id_plan, detalle, encabezado):
+    for n, (nombre, proyeccion) in enumerate(detalle.items()):
+        escribir_csv(destino, proyeccion, {"Plan": id_plan, "Escenario": nombre}, encabezado=encabezado and n == 0)
+
+
+def es_columnar(ruta):
+    return Path(ruta).suffix.lower() in EXTENSIONES_COLUMNARES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m motor", description="Proyección de planes voluntarios BN Vital sin Streamlit.")
+    parser.add_argument("planes", help="Archivo de plan(es) en JSON o CSV")
+    parser.add_argument("--abonos", help="CSV o Excel de abonos extraordinarios (Fecha, Monto) para todos los planes")
+    parser.add_argument("--salida", help="Archivo de resumen (.json, .csv, .parquet o .arrow). Por defecto JSON a la salida estándar")
+    parser.add_argument("--detalle", help="Tabla mensual detallada de cada plan y escenario (.csv, .parquet o .arrow)")
+    parser.add_argument("--cartera", action="store_true", help="Procesar el archivo como cartera de clientes, por bloques")
+    parser.add_argument("--tasa", type=float, default=10.0, help="Tasa bruta anual (%%) de la cartera. Por defecto 10")
+    parser.add_argument("--comision", type=float, default=10.0, help="Comisión sobre rendimientos (%%) de la cartera. Por defecto 10")
+    parser.add_argument("--inflacion", type=float, default=3.0, help="Inflación anual (%%) de la cartera. Por defecto 3")
+    parser.add_argument("--metodo", choices=METODOS, default="mensual",
+                        help="Motor de la cartera: mes a mes o en forma cerrada por tramos. Por defecto mensual")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Procesos para proyectar la cartera (0 = todos los núcleos). Por defecto 1")
+    parser.add_argument("--exacto", action="store_true", help="Calcular en céntimos enteros con redondeo en cada paso")
+    parser.add_argument("--redondeo", choices=REDONDEOS, default="mitad_arriba",
+                        help="Redondeo del modo exacto. Por defecto mitad_arriba")
+    args = parser.parse_args(argv)
+
+    if args.cartera:
+        if not args.salida:
+            parser.error("--cartera requiere --salida")
+        stats = procesar_cartera(args.planes, args.salida, args.tasa, args.comision, args.inflacion, metodo=args.metodo,
+                                 n_procesos=args.procesos or None)
+        print(f"{stats['planes']:,} planes en {stats['segundos']:.2f} s "
+              f"({stats['planes_por_segundo']:,.0f} planes/s, {stats['planes_invalidos']:,} inválidos)", file=sys.stderr)
+        return 0
+
+    abonos = leer_archivo_abonos(args.abonos).to_dict("records") if args.abonos else None
+    filas = []
+    resultados = []
+    detalle_columnar = {} if args.detalle and es_columnar(args.detalle) else None
+    with (open(args.detalle, "wb") if args.detalle and detalle_columnar is None else nullcontext()) as archivo_detalle:
+        for n, datos in enumerate(leer_planes(args.planes), start=1):
+            if not isinstance(datos, dict):
+                print(f"Plan {n}: el plan debe ser un objeto JSON ({datos!r})", file=sys.stderr)
+                continue
+            id_plan = datos.get("id") or n
+            if abonos is not None:
+                datos = {**datos, "abonos": abonos}
+            # Un plan con errores se informa y se sigue con los demás
+            try:
+                plan = normalizar_plan({k: v for k, v in datos.items() if k != "id"})
+                salida = ejecutar_plan(plan, con_detalle=bool(args.detalle), exacto=args.exacto, redondeo=args.redondeo)
+            except (ValueError, TypeError, OverflowError) as e:
+                print(f"Plan {id_plan}: {e}", file=sys.stderr)
+                continue
+            for adv in salida["abonos_ignorados"]:
+                print(f"Plan {id_plan}: abono no procesado - {adv}", file=sys.stderr)
+            filas.extend(filas_resumen(id_plan, plan, salida))
+            resultados.append({"plan": id_plan, "resumen": salida["resumen"], "abonos_ignorados": salida["abonos_ignorados"]})
+            if archivo_detalle:
+                escribir_detalle(archivo_detalle, id_plan, salida["detalle"], encabezado=archivo_detalle.tell() == 0)
+            elif detalle_columnar is not None:
+                detalle_columnar.update({(id_plan, nombre): p for nombre, p in salida["detalle"].items()})
+
+    if detalle_columnar:
+        from .columnar import escribir_detalle_columnar
+        escribir_detalle_columnar(args.detalle, detalle_columnar, columnas=("Plan", "Escenario"))
+
+    if args.salida and es_columnar(args.salida):
+        from .columnar import escribir_resumen_columnar
+        escribir_resumen_columnar(args.salida, filas)
+    elif args.salida and Path(args.salida).suffix.lower() == ".csv":
+        with open(args.salida, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.DictWriter(f, fieldnames=CAMPOS_RESUMEN)
+            escritor.writeheader()
+            escritor.writerows(filas)
+    else:
+        texto = json.dumps(resultados, ensure_ascii=False, indent=2)
+        if args.salida:
+            Path(args.salida).write_text(texto + "\n", encoding="utf-8")
+        else:
+            print(texto)
+
+    return 0 if len(resultados) else 1
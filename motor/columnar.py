@@ -0,0 +1,158 @@
+"""
+Salida columnar (Parquet y Arrow IPC) de las proyecciones.
+
+Las columnas conservan su tipo (Mes entero, Fecha como fecha, montos
+float64) y se construyen directamente desde los arreglos NumPy del motor
+sin copiarlos. Los archivos Arrow IPC se leen con memoria mapeada, sin
+cargarlos completos en RAM. Requiere pyarrow (dependencia opcional).
+"""
+import numpy as np
+
+from .proyeccion import COLUMNAS_DETALLE, columnas_detalle
+
+# Columna de la tabla -> clave de columnas_detalle
+_CLAVES_DETALLE = {
+    "Mes": "mes",
+    "Fecha": "fecha",
+    "Antigüedad (Meses)": "mes",
+    "Saldo Inicial": "saldo_inicial",
+    "Aporte Total": "aporte_total",
+    "Rendimiento Bruto": "rendimiento_bruto",
+    "Comisión Bruta": "comision_bruta",
+    "% Bonificación": "pct_bonificacion",
+    "Monto Bonificación": "monto_bonificacion",
+    "Comisión Real": "comision_real",
+    "Rendimiento Neto": "rendimiento_neto",
+    "Saldo Final": "saldo_final",
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("La salida Parquet/Arrow requiere pyarrow (pip install pyarrow)") from e
+    return pa
+
+
+def esquema_detalle(columnas_extra=()):
+    pa = _pyarrow()
+    campos = []
+    for col in COLUMNAS_DETALLE:
+        if col in ("Mes", "Antigüedad (Meses)"):
+            campos.append(pa.field(col, pa.int32()))
+        elif col == "Fecha":
+            campos.append(pa.field(col, pa.date32()))
+        else:
+            campos.append(pa.field(col, pa.float64()))
+    campos.extend(pa.field(nombre, pa.dictionary(pa.int32(), pa.string())) for nombre in columnas_extra)
+    return pa.schema(campos)
+
+
+def tabla_detalle(proyeccion, columnas_extra=None, desde=0, hasta=None, categorias=None):
+    """
+    Tabla Arrow de la tabla detallada de una proyección. Los montos se
+    envuelven sin copia; columnas_extra ({nombre: valor}) agrega columnas
+    constantes codificadas como diccionario (p. ej. el escenario).
+    categorias ({nombre: [valores posibles]}) fija el diccionario de esas
+    columnas, necesario para escribir varias tablas en un mismo archivo IPC.
+    """
+    pa = _pyarrow()
+    columnas_extra = columnas_extra or {}
+    datos = columnas_detalle(proyeccion, desde, hasta)
+    n_filas = len(datos["mes"])
+
+    arreglos = []
+    for col in COLUMNAS_DETALLE:
+        valores = datos[_CLAVES_DETALLE[col]]
+        if col in ("Mes", "Antigüedad (Meses)"):
+            arreglos.append(pa.array(valores.astype(np.int32)))
+        elif col == "Fecha":
+            arreglos.append(pa.array(valores.astype("datetime64[D]"), type=pa.date32()))
+        else:
+            arreglos.append(pa.array(np.ascontiguousarray(valores, dtype=np.float64)))
+    categorias = categorias or {}
+    for nombre, valor in columnas_extra.items():
+        diccionario = [str(v) for v in categorias.get(nombre, [valor])]
+        indices = np.full(n_filas, diccionario.index(str(valor)), dtype=np.int32)
+        arreglos.append(pa.DictionaryArray.from_arrays(pa.array(indices), pa.array(diccionario)))
+    return pa.Table.from_arrays(arreglos, schema=esquema_detalle(columnas_extra))
+
+
+def _tablas_detalle(proyecciones, columnas):
+    # Las claves de `proyecciones` son el valor (o tupla de valores) de
+    # `columnas`; todas las tablas comparten el mismo diccionario por columna
+    columnas = [columnas] if isinstance(columnas, str) else list(columnas)
+    claves = [clave if isinstance(clave, tuple) else (clave,) for clave in proyecciones]
+    categorias = {col: list(dict.fromkeys(str(clave[i]) for clave in claves)) for i, col in enumerate(columnas)}
+    for clave, proyeccion in zip(claves, proyecciones.values()):
+        yield tabla_detalle(proyeccion, dict(zip(columnas, clave)), categorias=categorias)
+
+
+def escribir_parquet_detalle(ruta, proyecciones, columnas=("Escenario",)):
+    """
+    Escribe en Parquet la tabla detallada de varias proyecciones, un grupo
+    de filas por proyección. Las claves de `proyecciones` dan el valor de
+    `columnas` para cada una: {"Moderado": p} con columnas=("Escenario",),
+    o {(1, "Moderado"): p} con columnas=("Plan", "Escenario").
+    """
+    _pyarrow()
+    import pyarrow.parquet as pq
+
+    columnas = [columnas] if isinstance(columnas, str) else list(columnas)
+    destino = ruta if hasattr(ruta, "write") else str(ruta)
+    with pq.ParquetWriter(destino, esquema_detalle(columnas), compression="zstd") as escritor:
+        for tabla in _tablas_detalle(proyecciones, columnas):
+            escritor.write_table(tabla)
+
+
+def escribir_arrow_detalle(ruta, proyecciones, columnas=("Escenario",)):
+    """
+    Igual que escribir_parquet_detalle pero en formato Arrow IPC (Feather
+    v2) sin compresión, apto para leerse con memoria mapeada.
+    """
+    pa = _pyarrow()
+    columnas = [columnas] if isinstance(columnas, str) else list(columnas)
+    with pa.OSFile(str(ruta), "wb") as archivo, pa.ipc.new_file(archivo, esquema_detalle(columnas)) as escritor:
+        for tabla in _tablas_detalle(proyecciones, columnas):
+            escritor.write_table(tabla)
+
+
+def escribir_detalle_columnar(ruta, proyecciones, columnas=("Escenario",)):
+    """
+    Escribe Parquet si la ruta termina en .parquet; si no, Arrow IPC.
+    """
+    if str(ruta).lower().endswith(".parquet"):
+        escribir_parquet_detalle(ruta, proyecciones, columnas)
+    else:
+        escribir_arrow_detalle(ruta, proyecciones, columnas)
+
+
+def escribir_resumen_columnar(ruta, filas):
+    """
+    Escribe filas de resumen (lista de dicts con los mismos campos) en
+    Parquet o Arrow IPC según la extensión de la ruta.
+    """
+    pa = _pyarrow()
+    tabla = pa.Table.from_pylist(list(filas))
+    if str(ruta).lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        pq.write_table(tabla, str(ruta), compression="zstd")
+    else:
+        with pa.OSFile(str(ruta), "wb") as archivo, pa.ipc.new_file(archivo, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+
+
+def leer_columnar(ruta, columnas=None):
+    """
+    Lee un archivo .parquet o .arrow/.feather como tabla Arrow. Arrow IPC se
+    abre con memoria mapeada (sin copiar los datos); Parquet se decodifica
+    desde un mapa de memoria. Con `columnas` sólo se leen esas columnas.
+    """
+    pa = _pyarrow()
+    ruta = str(ruta)
+    if ruta.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_table(ruta, columns=columnas, memory_map=True)
+    tabla = pa.ipc.open_file(pa.memory_map(ruta, "r")).read_all()
+    return tabla.select(columnas) if columnas else tabla
@@ -0,0 +1,164 @@
+"""
+Cronogramas: tasa, inflación, aporte y comisión que cambian a lo largo del
+plazo (tasa que baja al acercarse el retiro, aporte indexado al salario,
+curva de inflación, comisión escalonada).
+
+Donde el motor acepta un número constante también acepta un cronograma:
+
+    10.0                                     constante
+    [10.0, 10.0, 9.9, ...]                   un valor por mes (0..meses o 1..meses)
+    {0: 12.0, 240: 9.0, 480: 6.0}            por tramos: cada valor rige desde ese mes
+    {"lineal": {0: 12.0, 600: 6.0}}          interpolación lineal entre puntos
+    {"indexado": {"base": 200_000, "crecimiento_anual_pct": 4}}
+                                             crece cada 12 meses (o "cada_meses")
+
+Las claves de mes pueden venir como texto (JSON). Cada cronograma se
+expande una vez a un arreglo de largo meses + 1 (la posición 0 es la fila
+inicial) con searchsorted, interp o potencias acumuladas, sin recorrer los
+meses en Python; un cronograma que resulta constante vuelve a ser un
+número, así que el caso habitual no cambia de costo ni de huella.
+"""
+import json
+
+import numpy as np
+
+
+def _puntos(tramos):
+    if not tramos:
+        raise ValueError("El cronograma por tramos no tiene puntos")
+    meses = np.array([int(mes) for mes in tramos])
+    valores = np.array([float(valor) for valor in tramos.values()])
+    orden = np.argsort(meses, kind="stable")
+    return meses[orden], valores[orden]
+
+
+def expandir(valor, meses):
+    """
+    Valores de los meses 0..meses del cronograma `valor` (arreglo float de
+    largo meses + 1). Lanza ValueError si la forma no es válida.
+    """
+    mes = np.arange(meses + 1)
+    if isinstance(valor, dict):
+        if "lineal" in valor:
+            puntos, valores = _puntos(valor["lineal"])
+            return np.interp(mes, puntos, valores)
+        if "indexado" in valor:
+            indexado = valor["indexado"]
+            crecimiento = 1 + float(indexado.get("crecimiento_anual_pct", 0)) / 100
+            cada_meses = int(indexado.get("cada_meses", 12))
+            if cada_meses < 1:
+                raise ValueError("cada_meses debe ser al menos 1")
+            # El primer ajuste llega después de cada_meses aportes
+            return float(indexado["base"]) * crecimiento**(np.maximum(mes - 1, 0) // cada_meses)
+        puntos, valores = _puntos(valor)
+        return valores[np.maximum(np.searchsorted(puntos, mes, side="right") - 1, 0)]
+
+    arreglo = np.asarray(valor, dtype=float)
+    if arreglo.ndim == 0:
+        return np.full(meses + 1, float(arreglo))
+    if arreglo.ndim != 1:
+        raise ValueError("El cronograma mensual debe ser una lista de valores")
+    if len(arreglo) == meses:
+        # Sólo los meses 1..meses: la fila inicial repite el primero
+        arreglo = np.concatenate([arreglo[:1], arreglo])
+    if len(arreglo) < meses + 1:
+        raise ValueError(f"El cronograma tiene {len(arreglo)} valores; el plazo necesita {meses}")
+    return arreglo[:meses + 1]
+
+
+def normalizar(valor, meses):
+    """
+    Un número si el cronograma es constante en los meses 1..meses; si no,
+    el arreglo expandido de largo meses + 1.
+    """
+    if not isinstance(valor, dict) and np.ndim(valor) == 0:
+        return float(valor)
+    arreglo = expandir(valor, meses)
+    if meses == 0 or (arreglo[1:] == arreglo[1]).all():
+        return float(arreglo[-1])
+    return arreglo
+
+
+def es_constante(valor):
+    return np.ndim(valor) == 0
+
+
+def tasas_por_escenario(tasas_brutas_pct, meses):
+    """
+    Tasas brutas anuales (%) de varios escenarios: vector (escenarios) si
+    todas son constantes, o matriz escenario x mes si alguna tiene
+    cronograma (las constantes se repiten en toda su fila).
+    """
+    if not isinstance(tasas_brutas_pct, (list, tuple, np.ndarray)) or getattr(tasas_brutas_pct, "ndim", 1) == 0:
+        tasas_brutas_pct = [tasas_brutas_pct]
+    tasas = [normalizar(t, meses) for t in tasas_brutas_pct]
+    if all(es_constante(t) for t in tasas):
+        return np.array(tasas, dtype=float)
+    return np.array([np.broadcast_to(t, meses + 1) for t in tasas])
+
+
+def huella(valor):
+    """
+    Parte hashable de una clave de caché: el número, o los bytes del
+    cronograma ya normalizado.
+    """
+    if es_constante(valor):
+        return float(valor)
+    return np.ascontiguousarray(valor, dtype=float).tobytes()
+
+
+def tasa_mensual(tasa_anual_pct):
+    """
+    Tasa mensual equivalente de una tasa anual (%), número o arreglo.
+    """
+    return (1 + np.asarray(tasa_anual_pct, dtype=float) / 100)**(1/12) - 1
+
+
+def factor_inflacion(inflacion_pct, meses):
+    """
+    Inflación acumulada de los meses 0..meses. Con una curva es el producto
+    acumulado de los factores mensuales (cada mes usa su propia tasa).
+    """
+    if es_constante(inflacion_pct):
+        # pow de Python mes a mes: la potencia vectorizada de NumPy puede
+        # diferir en el último bit y el saldo real debe cuadrar al céntimo
+        base = 1 + float(tasa_mensual(inflacion_pct))
+        return np.array([base**mes for mes in range(meses + 1)])
+    factores = 1 + tasa_mensual(inflacion_pct)
+    factores[0] = 1.0
+    return np.cumprod(factores)
+
+
+def tasa_equivalente(tasa_anual_pct, meses):
+    """
+    Tasa anual (%) constante que da el mismo crecimiento bruto que el
+    cronograma en los meses 1..meses (para resúmenes de una cifra).
+    """
+    if es_constante(tasa_anual_pct):
+        return float(tasa_anual_pct)
+    logaritmos = np.log1p(tasa_mensual(tasa_anual_pct)[1:meses + 1])
+    return float(np.expm1(12 * logaritmos.mean()) * 100)
+
+
+def leer(valor, nombre):
+    """
+    Valida un cronograma leído de JSON o CSV y lo deja en forma canónica
+    (números como float, meses como int), apto para huellas y JSON.
+    """
+    try:
+        if isinstance(valor, str) and valor.strip()[:1] in ("[", "{"):
+            # Celda de CSV con el cronograma en JSON
+            valor = json.loads(valor)
+        if isinstance(valor, dict):
+            if "lineal" in valor:
+                return {"lineal": {int(m): float(v) for m, v in valor["lineal"].items()}}
+            if "indexado" in valor:
+                if "base" not in valor["indexado"]:
+                    raise ValueError
+                return {"indexado": {k: float(v) for k, v in valor["indexado"].items()}}
+            return {int(m): float(v) for m, v in valor.items()}
+        if isinstance(valor, (list, tuple)):
+            return [float(v) for v in valor]
+        return float(valor)
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError(f"{nombre}: cronograma no válido ({valor!r})") from None
@@ -0,0 +1,96 @@
+from datetime import date
+
+from .abonos import procesar_abonos
+from .cache import huella_plan
+from .cronogramas import huella, tasas_por_escenario
+from .exacto import proyectar_escenarios_centimos
+from .proyeccion import proyectar_escenarios, seleccionar_escenario, unir_escenarios
+
+
+# --- FUNCIÓN DE CÁLCULO (BIMONETARIA) ---
+def calcular_escenarios(tasas_brutas_pct, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_extra_df, start_date, es_dolares, cache=None, previo=None,
+                        exacto=False, redondeo="mitad_arriba"):
+    """
+    Calcula todos los escenarios de tasa en una sola pasada del motor,
+    compartiendo abonos, fechas y factores de inflación. Cada resultado
+    guarda la proyección compacta; la tabla detallada se arma bajo demanda
+    con construir_df_detalle(res["proyeccion"], desde, hasta).
+
+    Con un CacheResultados en `cache`, la proyección se reutiliza para
+    cualquier entrada con la misma huella (ver huella_plan); los abonos
+    ignorados se recalculan siempre porque dependen de las filas.
+
+    `previo` son los resultados de una llamada anterior: si el plan sólo
+    cambió desde cierto mes (abonos, aporte, plazo), el motor reanuda desde
+    ahí en lugar de recalcular desde el mes 0.
+
+    Con exacto=True el cálculo se hace en céntimos enteros con el
+    `redondeo` indicado en cada paso (ver motor.exacto); no reanuda desde
+    `previo`.
+
+    Cada tasa, el aporte, la comisión y la inflación pueden ser un número o
+    un cronograma (ver motor.cronogramas).
+    """
+    if start_date is None: 
+        start_date = date.today()
+    
+    abonos_map, abonos_ignorados = procesar_abonos(abonos_extra_df, start_date, anos)
+
+    # --- Proyección (motor vectorizado por lote) ---
+    def proyectar_lote():
+        if exacto:
+            return proyectar_escenarios_centimos(
+                tasas_brutas_pct, anos, aporte, inicial, comision_pct, inflacion_pct,
+                abonos_map, start_date, es_dolares, redondeo
+            )
+        return proyectar_escenarios(
+            tasas_brutas_pct, anos, aporte, inicial, comision_pct, inflacion_pct,
+            abonos_map, start_date, es_dolares,
+            previo=unir_escenarios([r["proyeccion"] for r in previo]) if previo else None
+        )
+
+    if cache is None:
+        lote = proyectar_lote()
+    else:
+        clave = ("escenarios", redondeo if exacto else None,
+                 tuple(huella(t) for t in tasas_por_escenario(tasas_brutas_pct, int(anos * 12))),
+                 huella_plan(anos, aporte, inicial, comision_pct, inflacion_pct, abonos_map, start_date, es_dolares))
+        lote = cache.obtener_o_calcular(clave, proyectar_lote)
+    
+    resultados = []
+    for k in range(len(lote["tasa_bruta_pct"])):
+        proyeccion = seleccionar_escenario(lote, k)
+        resultados.append({
+            "serie_nominal": proyeccion["saldo_final"],
+            "serie_aportes": proyeccion["aportes_acumulados"],
+            "serie_real": proyeccion["saldo_real"],
+            "saldo_nominal": proyeccion["saldo_final"][-1],
+            "saldo_real": proyeccion["saldo_real"][-1],
+            "total_depositado": proyeccion["aportes_acumulados"][-1],
+            "abonos_ignorados": abonos_ignorados,
+            "proyeccion": proyeccion
+        })
+    return resultados
+
+
+def calcular_escenario_completo(tasa_bruta_pct, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_extra_df, start_date, es_dolares,
+                                exacto=False, redondeo="mitad_arriba"):
+    return calcular_escenarios(
+        (tasa_bruta_pct,), anos, aporte, inicial, comision_pct, inflacion_pct,
+        abonos_extra_df, start_date, es_dolares, exacto=exacto, redondeo=redondeo
+    )[0]
+
+
+def resumir_resultado(res):
+    """
+    Indicadores finales de un escenario (los mismos de las tarjetas de la app).
+    """
+    ganancia = res["saldo_nominal"] - res["total_depositado"]
+    roi = (ganancia / res["total_depositado"]) * 100 if res["total_depositado"] > 0 else 0
+    return {
+        "saldo_nominal": float(res["saldo_nominal"]),
+        "saldo_real": float(res["saldo_real"]),
+        "total_depositado": float(res["total_depositado"]),
+        "ganancia": float(ganancia),
+        "roi_pct": float(roi),
+    }
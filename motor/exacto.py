@@ -0,0 +1,198 @@
+"""
+Modo exacto: la misma proyección en céntimos enteros (int64), con un
+redondeo definido en cada paso, para conciliar contra los estados de
+cuenta de la operadora al céntimo.
+
+Cada mes, sobre el saldo inicial en céntimos:
+
+    rendimiento bruto = saldo x tasa mensual          -> redondeo a céntimos
+    comisión bruta    = rendimiento bruto x comisión  -> redondeo a céntimos
+    bonificación      = comisión bruta x % de tabla   -> redondeo a céntimos
+    comisión real     = comisión bruta - bonificación
+    saldo final       = saldo + rendimiento bruto - comisión real + aporte
+
+La tasa mensual se fija con DECIMALES_TASA decimales y la comisión con
+DECIMALES_COMISION decimales del porcentaje; aportes y saldo inicial se
+redondean a céntimos al entrar. Los productos se hacen en aritmética
+entera exacta (la tasa se parte en dos mitades para no desbordar int64),
+así que el resultado es el mismo que con decimal.Decimal paso a paso, pero
+vectorizado entre escenarios. Con cronogramas (motor.cronogramas) cada mes
+usa su propia tasa y comisión, fijadas con los mismos decimales.
+"""
+from datetime import date
+
+import numpy as np
+
+from .bonificacion import matriz_por_mes
+from .cronogramas import factor_inflacion, normalizar, tasa_mensual, tasas_por_escenario
+from .instrumentacion import anotar
+from .proyeccion import vector_aportes
+
+REDONDEOS = ("mitad_arriba", "mitad_par")
+
+DECIMALES_TASA = 10
+DECIMALES_COMISION = 4
+
+ESCALA_TASA = 10**DECIMALES_TASA
+# Comisión como fracción: porcentaje con DECIMALES_COMISION decimales / 100
+ESCALA_COMISION = 10**(DECIMALES_COMISION + 2)
+# Los porcentajes de la matriz tienen a lo sumo 2 decimales
+ESCALA_BONIFICACION = 10**4
+
+# Mitades de la tasa: tasa = alta * _BASE_TASA + baja
+_BASE_TASA = 10**5
+
+# Saldo máximo (en céntimos) con el que los productos caben en int64
+LIMITE_CENTIMOS = 9 * 10**13
+
+
+def a_centimos(montos):
+    """
+    Montos en unidades de moneda (float) a céntimos enteros, redondeando
+    al céntimo más cercano.
+    """
+    return np.rint(np.asarray(montos, dtype=float) * 100).astype(np.int64)
+
+
+def _redondear(cociente, resto, divisor, redondeo):
+    """
+    Ajusta el cociente entero (truncado) de una división no negativa según
+    su resto: "mitad_arriba" sube desde la mitad, "mitad_par" sube en la
+    mitad sólo si el cociente es impar (redondeo bancario).
+    """
+    doble = 2 * resto
+    if redondeo == "mitad_arriba":
+        return cociente + (doble >= divisor)
+    return cociente + ((doble > divisor) | ((doble == divisor) & (cociente % 2 == 1)))
+
+
+def _dividir_positivo(numerador, divisor, redondeo):
+    if redondeo == "mitad_arriba":
+        return (numerador + divisor // 2) // divisor
+    cociente, resto = np.divmod(numerador, divisor)
+    return _redondear(cociente, resto, divisor, redondeo)
+
+
+def dividir(numerador, divisor, redondeo="mitad_arriba", positivo=False):
+    """
+    numerador / divisor redondeado a entero. El signo se aplica al final,
+    así que la mitad se aleja (o no) del cero igual para ambos signos; con
+    positivo=True se omite ese manejo (el numerador no es negativo).
+    """
+    if positivo:
+        return _dividir_positivo(numerador, divisor, redondeo)
+    return np.sign(numerador) * _dividir_positivo(np.abs(numerador), divisor, redondeo)
+
+
+def _partir_tasa(tasa_entera):
+    """
+    Signo y mitades (alta, baja) de la tasa entera: |tasa| = alta * _BASE_TASA + baja.
+    """
+    alta, baja = np.divmod(np.abs(tasa_entera), _BASE_TASA)
+    return np.sign(tasa_entera), alta, baja
+
+
+def multiplicar_tasa(centimos, tasa, redondeo="mitad_arriba", positivo=False):
+    """
+    centimos x tasa entera / ESCALA_TASA redondeado a céntimos, sin
+    desbordar int64 mientras |centimos| <= LIMITE_CENTIMOS. `tasa` es el
+    resultado de _partir_tasa; con positivo=True ni los céntimos ni la tasa
+    son negativos.
+    """
+    signo_tasa, alta, baja = tasa
+    magnitud = centimos if positivo else np.abs(centimos)
+    # magnitud x tasa = magnitud * alta * _BASE_TASA + magnitud * baja
+    cociente_alto, resto_alto = np.divmod(magnitud * alta, ESCALA_TASA // _BASE_TASA)
+    resto = resto_alto * _BASE_TASA + magnitud * baja
+    if redondeo == "mitad_arriba":
+        redondeado = cociente_alto + (resto + ESCALA_TASA // 2) // ESCALA_TASA
+    else:
+        cociente_bajo, resto = np.divmod(resto, ESCALA_TASA)
+        redondeado = _redondear(cociente_alto + cociente_bajo, resto, ESCALA_TASA, redondeo)
+    return redondeado if positivo else np.sign(centimos) * signo_tasa * redondeado
+
+
+def proyectar_escenarios_centimos(tasas_brutas_pct, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_map,
+                                  start_date, es_dolares, redondeo="mitad_arriba"):
+    """
+    Equivalente exacto de proyectar_escenarios: mismas claves (los saldos
+    en moneda son los céntimos / 100) más los montos de cada mes en
+    céntimos enteros ("saldo_centimos", "aporte_centimos",
+    "rendimiento_centimos", "comision_bruta_centimos" y
+    "bonificacion_centimos"), que columnas_detalle usa para la tabla.
+    """
+    if redondeo not in REDONDEOS:
+        raise ValueError(f"Redondeo desconocido: {redondeo} (use {', '.join(REDONDEOS)})")
+    meses = int(anos * 12)
+    if start_date is None:
+        start_date = date.today()
+
+    tasas_brutas_pct = tasas_por_escenario(tasas_brutas_pct, meses)
+    comision_pct = normalizar(comision_pct, meses)
+    n_escenarios = len(tasas_brutas_pct)
+    tasa_mensual_bruta = np.round(tasa_mensual(tasas_brutas_pct), DECIMALES_TASA)
+    tasa_entera = np.rint(tasa_mensual_bruta * ESCALA_TASA).astype(np.int64)
+    comision_entera = np.rint(np.asarray(comision_pct) * 10**DECIMALES_COMISION).astype(np.int64)
+
+    aportes = a_centimos(vector_aportes(meses, normalizar(aporte, meses), inicial, abonos_map))
+
+    umbrales_saldo, porcentajes_mes = matriz_por_mes(meses, es_dolares)
+    umbrales_centimos = a_centimos(umbrales_saldo)
+    bonificacion_entera = np.rint(porcentajes_mes * (ESCALA_BONIFICACION // 100)).astype(np.int64)
+
+    saldos = np.empty((n_escenarios, meses + 1), dtype=np.int64)
+    rendimientos = np.zeros((n_escenarios, meses + 1), dtype=np.int64)
+    comisiones = np.zeros((n_escenarios, meses + 1), dtype=np.int64)
+    bonificaciones = np.zeros((n_escenarios, meses + 1), dtype=np.int64)
+    pct_bonificacion = np.zeros((n_escenarios, meses + 1))
+
+    # Con tasas, aportes y comisión no negativos (lo habitual) el saldo no
+    # baja de cero y se evita el manejo de signos en cada mes
+    positivo = bool((tasa_entera >= 0).all() and (aportes >= 0).all()
+                    and (comision_entera >= 0).all() and (comision_entera <= ESCALA_COMISION).all())
+    # Tasa partida y comisión entera de cada mes (ver proyectar_escenarios)
+    if tasa_entera.ndim == 1:
+        tasas_mes = [_partir_tasa(tasa_entera)] * (meses + 1)
+    else:
+        tasas_mes = list(zip(*(np.ascontiguousarray(parte.T) for parte in _partir_tasa(tasa_entera))))
+    comisiones_mes = np.broadcast_to(comision_entera, meses + 1).tolist()
+
+    saldo = np.full(n_escenarios, aportes[0], dtype=np.int64)
+    saldos[:, 0] = saldo
+    anotar("meses_calculados", meses * n_escenarios)
+    for i in range(1, meses + 1):
+        fila = np.searchsorted(umbrales_centimos, saldo, side="right")
+        rendimiento = multiplicar_tasa(saldo, tasas_mes[i], redondeo, positivo)
+        comision = dividir(rendimiento * comisiones_mes[i], ESCALA_COMISION, redondeo, positivo)
+        bonificacion = dividir(comision * bonificacion_entera[fila, i], ESCALA_BONIFICACION, redondeo, positivo)
+        saldo = saldo + rendimiento - (comision - bonificacion) + aportes[i]
+        saldos[:, i] = saldo
+        rendimientos[:, i] = rendimiento
+        comisiones[:, i] = comision
+        bonificaciones[:, i] = bonificacion
+        pct_bonificacion[:, i] = porcentajes_mes[fila, i]
+
+    # Cada saldo usado en un producto quedó registrado: si ninguno pasa el
+    # límite, ningún producto desbordó
+    if np.abs(saldos).max(initial=0) > LIMITE_CENTIMOS:
+        raise OverflowError(f"Saldo fuera del rango del modo exacto (máximo {LIMITE_CENTIMOS / 100:,.0f})")
+
+    saldo_final = saldos / 100
+    return {
+        "fecha_inicio": start_date,
+        "es_dolares": es_dolares,
+        "comision_pct": comision_pct,
+        "tasa_bruta_pct": tasas_brutas_pct,
+        "tasa_mensual_bruta": tasa_mensual_bruta,
+        "aporte_total": aportes / 100,
+        "aportes_acumulados": np.cumsum(aportes) / 100,
+        "pct_bonificacion": pct_bonificacion,
+        "saldo_final": saldo_final,
+        "saldo_real": saldo_final / factor_inflacion(normalizar(inflacion_pct, meses), meses),
+        "redondeo": redondeo,
+        "aporte_centimos": aportes,
+        "saldo_centimos": saldos,
+        "rendimiento_centimos": rendimientos,
+        "comision_bruta_centimos": comisiones,
+        "bonificacion_centimos": bonificaciones,
+    }
@@ -0,0 +1,109 @@
+"""
+Exportación de la tabla detallada por bloques de filas.
+
+Ninguna función arma la tabla completa en memoria: las filas se derivan
+bloque a bloque desde la proyección compacta (construir_df_detalle con
+desde/hasta) y se escriben de inmediato. El Excel usa el modo
+constant_memory de xlsxwriter, que vuelca cada fila a disco al escribirla.
+"""
+import tempfile
+
+from .proyeccion import COLUMNAS_DETALLE, construir_df_detalle
+
+FILAS_POR_BLOQUE = 1_000
+
+# Archivos temporales: en memoria hasta este tamaño, luego a disco
+MAX_BYTES_EN_MEMORIA = 4 * 1024**2
+
+COLUMNAS_MONEDA = [
+    "Saldo Inicial", "Aporte Total", "Rendimiento Bruto", "Comisión Bruta",
+    "Monto Bonificación", "Comisión Real", "Rendimiento Neto", "Saldo Final"
+]
+
+
+def bloques_detalle(proyeccion, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Itera la tabla detallada de una proyección en DataFrames consecutivos de
+    a lo sumo filas_por_bloque filas.
+    """
+    total = len(proyeccion["saldo_final"])
+    for desde in range(0, total, filas_por_bloque):
+        yield construir_df_detalle(proyeccion, desde, desde + filas_por_bloque)
+
+
+def iterar_csv(proyeccion, columnas_extra=None, encabezado=True, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Genera el CSV de la tabla detallada como trozos de bytes UTF-8. Produce
+    el mismo texto que DataFrame.to_csv(index=False) de la tabla completa.
+    columnas_extra ({nombre: valor}) agrega columnas constantes al final.
+    """
+    for n, bloque in enumerate(bloques_detalle(proyeccion, filas_por_bloque)):
+        if columnas_extra:
+            bloque = bloque.assign(**columnas_extra)
+        yield bloque.to_csv(index=False, header=encabezado and n == 0).encode("utf-8")
+
+
+def escribir_csv(destino, proyeccion, columnas_extra=None, encabezado=True, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Escribe el CSV de la tabla detallada en `destino` (archivo binario
+    abierto) bloque a bloque.
+    """
+    for trozo in iterar_csv(proyeccion, columnas_extra, encabezado, filas_por_bloque):
+        destino.write(trozo)
+
+
+def escribir_excel(destino, hojas, simbolo="₡", filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Escribe un libro .xlsx con una hoja por proyección ({nombre_hoja:
+    proyeccion}) en `destino` (ruta o archivo binario). Las filas se
+    escriben en orden en modo constant_memory; por eso el formato va por
+    columna, con autofiltro y encabezado fijo en lugar de tabla de Excel
+    (add_table no está disponible en ese modo).
+    """
+    import xlsxwriter
+
+    libro = xlsxwriter.Workbook(destino, {"constant_memory": True, "tmpdir": tempfile.gettempdir()})
+    try:
+        fmt_encabezado = libro.add_format({"bold": True, "font_color": "#FFFFFF", "bg_color": "#1F4E78", "border": 1})
+        fmt_moneda = libro.add_format({"num_format": f"{simbolo}#,##0.00"})
+        # Los valores de % Bonificación ya vienen en puntos porcentuales (2.5 = 2.5%)
+        fmt_pct = libro.add_format({"num_format": '0.00"%"'})
+        fmt_fecha = libro.add_format({"num_format": "dd/mm/yyyy"})
+
+        for nombre, proyeccion in hojas.items():
+            hoja = libro.add_worksheet(str(nombre)[:31])
+            for i, col in enumerate(COLUMNAS_DETALLE):
+                if col == "% Bonificación":
+                    hoja.set_column(i, i, 12, fmt_pct)
+                elif col in COLUMNAS_MONEDA:
+                    hoja.set_column(i, i, 18, fmt_moneda)
+                elif col == "Fecha":
+                    hoja.set_column(i, i, 12, fmt_fecha)
+                else:
+                    hoja.set_column(i, i, 10)
+            hoja.write_row(0, 0, COLUMNAS_DETALLE, fmt_encabezado)
+            hoja.freeze_panes(1, 0)
+
+            fila = 1
+            for bloque in bloques_detalle(proyeccion, filas_por_bloque):
+                fechas = bloque["Fecha"].to_numpy().astype("datetime64[ms]").astype(object)
+                valores = bloque.to_numpy(dtype=object)
+                valores[:, COLUMNAS_DETALLE.index("Fecha")] = fechas
+                for registro in valores.tolist():
+                    hoja.write_row(fila, 0, registro)
+                    fila += 1
+            hoja.autofilter(0, 0, fila - 1, len(COLUMNAS_DETALLE) - 1)
+    finally:
+        libro.close()
+
+
+def a_archivo_temporal(escribir, *args, **kwargs):
+    """
+    Ejecuta escribir(archivo, *args, **kwargs) sobre un archivo temporal
+    (en memoria si es pequeño, en disco si crece) y lo devuelve rebobinado,
+    listo para leerse o entregarse como descarga.
+    """
+    archivo = tempfile.SpooledTemporaryFile(max_size=MAX_BYTES_EN_MEMORIA)
+    escribir(archivo, *args, **kwargs)
+    archivo.seek(0)
+    return archivo
@@ -0,0 +1,172 @@
+"""
+Backtesting histórico: cómo le habría ido al plan con los rendimientos
+reales del fondo, para cada fecha de inicio posible de una serie mensual.
+
+La serie (CSV o Excel) trae una fila por mes con el rendimiento bruto
+mensual del fondo (%) y, opcionalmente, la inflación mensual (%) o el
+nivel del IPC. Cada ventana de `anos` años de la serie se recorre con las
+mismas reglas BN Vital que Monte Carlo (comisión sobre rendimientos
+positivos y matriz de bonificación) y se deflacta con la inflación
+observada en esa misma ventana. Todas las ventanas avanzan a la vez: la
+recurrencia es vectorizada entre fechas de inicio y lee el rendimiento de
+cada mes de una vista deslizante de la serie, sin copiarla.
+"""
+from pathlib import Path
+
+import numpy as np
+
+from .bonificacion import matriz_por_mes
+from .proyeccion import avanzar_mes, vector_aportes
+
+PERCENTILES_HISTORICO = (5, 25, 50, 75, 95)
+
+
+def _numeros(columna):
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(columna):
+        return columna.astype(float)
+    limpios = columna.astype(str).str.replace(r"[%\s]", "", regex=True).str.replace(",", ".", regex=False)
+    return pd.to_numeric(limpios, errors="coerce")
+
+
+def leer_serie_historica(archivo, nombre=None):
+    """
+    Lee la serie mensual desde CSV o Excel (ruta o archivo subido). Busca
+    las columnas Fecha, Rendimiento (% mensual) e Inflación (% mensual) o
+    IPC (nivel del índice), sin importar mayúsculas ni tildes.
+
+    Devuelve las fechas (datetime64[M], meses consecutivos), el rendimiento
+    y la inflación mensuales como fracción (inflación None si la serie no
+    la trae). Lanza ValueError si faltan columnas o hay meses salteados.
+    """
+    import pandas as pd
+
+    from .abonos import parsear_fechas
+
+    nombre = nombre or getattr(archivo, "name", None) or str(archivo)
+    if Path(nombre).suffix.lower() in (".xlsx", ".xls"):
+        df = pd.read_excel(archivo, dtype=object)
+    else:
+        df = pd.read_csv(archivo, dtype=str, sep=None, engine="python")
+
+    sin_tildes = str.maketrans("áéíóú", "aeiou")
+    columnas = {str(c).strip().lower().translate(sin_tildes): c for c in df.columns}
+    if "fecha" not in columnas or "rendimiento" not in columnas:
+        raise ValueError("La serie histórica debe tener columnas Fecha y Rendimiento (% mensual)")
+
+    # Orden cronológico antes de nada: la inflación del IPC compara cada mes
+    # con el anterior, y los archivos exportados a veces vienen al revés
+    fechas = parsear_fechas(df[columnas["fecha"]])
+    fechas = fechas.dropna().sort_values(kind="stable")
+    df = df.loc[fechas.index]
+
+    rendimiento = _numeros(df[columnas["rendimiento"]]) / 100
+    if "inflacion" in columnas:
+        inflacion = _numeros(df[columnas["inflacion"]]) / 100
+    elif "ipc" in columnas:
+        inflacion = _numeros(df[columnas["ipc"]]).pct_change(fill_method=None)
+    else:
+        inflacion = None
+
+    validas = rendimiento.notna()
+    if inflacion is not None:
+        validas &= inflacion.notna()
+    orden = fechas[validas].index
+    if len(orden) < 2:
+        raise ValueError("La serie histórica necesita al menos 2 meses con datos válidos")
+
+    meses = fechas[orden].to_numpy().astype("datetime64[M]")
+    saltos = np.flatnonzero(np.diff(meses.astype(np.int64)) != 1)
+    if len(saltos):
+        raise ValueError(f"La serie histórica no es mensual consecutiva (después de {meses[saltos[0]]})")
+    return {
+        "fechas": meses,
+        "rendimiento": rendimiento[orden].to_numpy(dtype=float),
+        "inflacion": None if inflacion is None else inflacion[orden].to_numpy(dtype=float),
+    }
+
+
+def backtesting(serie, anos, aporte, inicial, comision_pct, abonos_map, es_dolares, inflacion_pct=None,
+                paso_inicio=1, paso_meses=12, percentiles=PERCENTILES_HISTORICO):
+    """
+    Reproduce el plan sobre cada ventana de `anos` años de la serie (una
+    fecha de inicio cada paso_inicio meses). Los abonos de abonos_map son
+    relativos al inicio de cada ventana. Si la serie no trae inflación se
+    usa inflacion_pct anual constante.
+
+    Devuelve las fechas de inicio, el saldo nominal en los meses múltiplos
+    de paso_meses (ventanas x puntos), saldo final nominal y real, la tasa
+    bruta y la inflación anual equivalentes de cada ventana, y las bandas
+    de percentiles nominales y reales entre ventanas.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    meses = int(anos * 12)
+    rendimiento = serie["rendimiento"]
+    if serie["inflacion"] is not None:
+        inflacion = serie["inflacion"]
+    elif inflacion_pct is not None:
+        inflacion = np.full(len(rendimiento), (1 + inflacion_pct / 100)**(1/12) - 1)
+    else:
+        raise ValueError("La serie no trae inflación: indique inflacion_pct")
+    if len(rendimiento) < meses:
+        raise ValueError(f"La serie tiene {len(rendimiento)} meses; el plazo necesita {meses}")
+
+    # Ventana k: meses k .. k + meses - 1 de la serie (vistas, sin copia)
+    rendimientos = sliding_window_view(rendimiento, meses)[::paso_inicio]
+    inflaciones = sliding_window_view(inflacion, meses)[::paso_inicio]
+    n_ventanas = len(rendimientos)
+
+    aportes = vector_aportes(meses, aporte, inicial, abonos_map)
+    umbrales_saldo, porcentajes_mes = matriz_por_mes(meses, es_dolares)
+    factor_comision = comision_pct / 100
+    meses_registro = np.unique(np.append(np.arange(0, meses + 1, paso_meses), meses))
+    posicion = np.full(meses + 1, -1)
+    posicion[meses_registro] = np.arange(len(meses_registro))
+
+    registro = np.empty((n_ventanas, len(meses_registro)))
+    saldo = np.full(n_ventanas, float(aportes[0]))
+    registro[:, 0] = saldo
+    for i in range(1, meses + 1):
+        pct = porcentajes_mes[np.searchsorted(umbrales_saldo, saldo, side="right"), i]
+        # Como en Monte Carlo, la comisión se cobra sobre rendimientos positivos
+        saldo = avanzar_mes(saldo, rendimientos[:, i - 1], factor_comision, pct, aportes[i], solo_positivos=True)
+        if posicion[i] >= 0:
+            registro[:, posicion[i]] = saldo
+
+    # Inflación acumulada de cada ventana en los meses registrados
+    nivel = np.exp(np.cumsum(np.log1p(inflaciones), axis=1))
+    factor_inflacion = np.hstack([np.ones((n_ventanas, 1)), nivel])[:, meses_registro]
+    registro_real = registro / factor_inflacion
+
+    return {
+        "fechas_inicio": serie["fechas"][:n_ventanas * paso_inicio:paso_inicio],
+        "meses": meses_registro,
+        "saldos": registro,
+        "saldo_final": registro[:, -1],
+        "saldo_real": registro_real[:, -1],
+        "total_depositado": float(aportes.sum()),
+        "tasa_anual_equivalente": np.expm1(12 * np.log1p(rendimientos).mean(axis=1)),
+        "inflacion_anual_equivalente": np.expm1(12 * np.log1p(inflaciones).mean(axis=1)),
+        "percentiles": np.asarray(percentiles),
+        "bandas_nominales": np.percentile(registro, percentiles, axis=0),
+        "bandas_reales": np.percentile(registro_real, percentiles, axis=0),
+    }
+
+
+def tabla_ventanas(resultado, meses):
+    """
+    Una fila por fecha de inicio (para ordenar, filtrar o exportar).
+    """
+    import pandas as pd
+
+    inicio = resultado["fechas_inicio"]
+    return pd.DataFrame({
+        "Inicio": inicio.astype("datetime64[D]"),
+        "Fin": (inicio + meses).astype("datetime64[D]"),
+        "Tasa Bruta Equivalente (%)": resultado["tasa_anual_equivalente"] * 100,
+        "Inflación Equivalente (%)": resultado["inflacion_anual_equivalente"] * 100,
+        "Saldo Nominal": resultado["saldo_final"],
+        "Saldo Real": resultado["saldo_real"],
+    })
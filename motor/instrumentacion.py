@@ -0,0 +1,191 @@
+"""
+Medición de tiempos por etapa (tramos) de cada ejecución de la app.
+
+Una MedicionEjecucion agrupa los tramos de un rerun de Streamlit (o de
+cualquier otra corrida): cada tramo guarda su duración y los datos que se
+le anoten, como los aciertos y fallos del caché de resultados, que
+CacheResultados informa al tramo activo del hilo. Al cerrar la ejecución
+se emite una línea JSON en el logger "motor.tiempos" y se acumulan
+métricas del proceso (conteo, total y máximo por tramo, aciertos y fallos
+del caché) exportables en formato de texto de Prometheus.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+registro = logging.getLogger("motor.tiempos")
+
+# Tramo abierto en el contexto actual (cada sesión de Streamlit corre en su hilo)
+_tramo_activo = ContextVar("tramo_activo", default=None)
+
+_metricas = {}
+_lock_metricas = threading.Lock()
+
+
+def configurar_logs(nivel=logging.INFO):
+    """
+    Envía los registros de "motor.tiempos" a stderr (una línea JSON por
+    ejecución) si todavía no tienen un handler.
+    """
+    if not registro.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        registro.addHandler(handler)
+    registro.setLevel(nivel)
+    registro.propagate = False
+
+
+def anotar(clave, valor=1):
+    """
+    Suma `valor` a `clave` en el tramo activo (si hay uno).
+    """
+    tramo = _tramo_activo.get()
+    if tramo is not None:
+        tramo[clave] = tramo.get(clave, 0) + valor
+
+
+def anotar_cache(acierto):
+    anotar("cache_aciertos" if acierto else "cache_fallos")
+
+
+def _acumular(tramo):
+    with _lock_metricas:
+        m = _metricas.setdefault(tramo["tramo"], {"cuenta": 0, "total_ms": 0.0, "max_ms": 0.0, "cache_aciertos": 0, "cache_fallos": 0})
+        m["cuenta"] += 1
+        m["total_ms"] += tramo["ms"]
+        m["max_ms"] = max(m["max_ms"], tramo["ms"])
+        m["cache_aciertos"] += tramo.get("cache_aciertos", 0)
+        m["cache_fallos"] += tramo.get("cache_fallos", 0)
+
+
+@contextmanager
+def medir_tramo(nombre, **datos):
+    """
+    Mide un tramo suelto (fuera de una MedicionEjecucion, p. ej. una
+    descarga generada bajo demanda): se registra en el log y en las
+    métricas del proceso.
+    """
+    tramo = {"tramo": nombre, **datos}
+    token = _tramo_activo.set(tramo)
+    inicio = time.perf_counter()
+    try:
+        yield tramo
+    finally:
+        tramo["ms"] = (time.perf_counter() - inicio) * 1000
+        _tramo_activo.reset(token)
+        _acumular(tramo)
+        registro.info(json.dumps({"evento": "tramo", **tramo}, ensure_ascii=False))
+
+
+class MedicionEjecucion:
+    """
+    Tramos de una ejecución, en orden. Se miden con un bloque `with` o como
+    etapas consecutivas (cada etapa termina donde empieza la siguiente, sin
+    reindentar el script):
+
+        medicion = MedicionEjecucion()
+        medicion.etapa("entradas")
+        ...
+        with medicion.tramo("calculo", escenarios=3):
+            ...
+        medicion.cerrar()
+    """
+
+    def __init__(self, **datos):
+        self.datos = datos
+        self.tramos = []
+        self._inicio = time.perf_counter()
+        self._etapa = None
+        self.total_ms = None
+
+    def etapa(self, nombre, **datos):
+        """
+        Cierra la etapa abierta (si hay) y abre una nueva; queda como tramo
+        activo para las anotaciones hasta la siguiente etapa o cerrar().
+        """
+        self._cerrar_etapa()
+        tramo = {"tramo": nombre, **datos}
+        self._etapa = (tramo, _tramo_activo.set(tramo), time.perf_counter())
+        return tramo
+
+    def _cerrar_etapa(self):
+        if self._etapa is not None:
+            tramo, token, inicio = self._etapa
+            tramo["ms"] = (time.perf_counter() - inicio) * 1000
+            _tramo_activo.reset(token)
+            self.tramos.append(tramo)
+            self._etapa = None
+
+    @contextmanager
+    def tramo(self, nombre, **datos):
+        tramo = {"tramo": nombre, **datos}
+        token = _tramo_activo.set(tramo)
+        inicio = time.perf_counter()
+        try:
+            yield tramo
+        finally:
+            tramo["ms"] = (time.perf_counter() - inicio) * 1000
+            _tramo_activo.reset(token)
+            self.tramos.append(tramo)
+
+    def cerrar(self):
+        """
+        Fija el total, acumula las métricas del proceso y emite el log de la
+        ejecución. Devuelve el registro emitido.
+        """
+        if self.total_ms is None:
+            self._cerrar_etapa()
+            self.total_ms = (time.perf_counter() - self._inicio) * 1000
+            for tramo in self.tramos:
+                _acumular(tramo)
+            _acumular({"tramo": "ejecucion", "ms": self.total_ms})
+            registro.info(json.dumps(self.resumen(), ensure_ascii=False))
+        return self.resumen()
+
+    def resumen(self):
+        total = self.total_ms if self.total_ms is not None else (time.perf_counter() - self._inicio) * 1000
+        return {"evento": "ejecucion", **self.datos, "total_ms": round(total, 3),
+                "tramos": [{**t, "ms": round(t["ms"], 3)} for t in self.tramos]}
+
+
+def metricas():
+    """
+    Copia de las métricas acumuladas del proceso por tramo.
+    """
+    with _lock_metricas:
+        return {nombre: dict(m) for nombre, m in _metricas.items()}
+
+
+def metricas_prometheus(prefijo="calculadora"):
+    """
+    Métricas acumuladas en formato de texto de Prometheus.
+    """
+    lineas = [
+        f"# TYPE {prefijo}_tramo_segundos summary",
+        f"# TYPE {prefijo}_tramo_max_segundos gauge",
+        f"# TYPE {prefijo}_cache_total counter",
+    ]
+    for nombre, m in sorted(metricas().items()):
+        etiqueta = f'tramo="{nombre}"'
+        lineas.append(f"{prefijo}_tramo_segundos_count{{{etiqueta}}} {m['cuenta']}")
+        lineas.append(f"{prefijo}_tramo_segundos_sum{{{etiqueta}}} {m['total_ms'] / 1000:.6f}")
+        lineas.append(f"{prefijo}_tramo_max_segundos{{{etiqueta}}} {m['max_ms'] / 1000:.6f}")
+        if m["cache_aciertos"] or m["cache_fallos"]:
+            lineas.append(f'{prefijo}_cache_total{{{etiqueta},resultado="acierto"}} {m["cache_aciertos"]}')
+            lineas.append(f'{prefijo}_cache_total{{{etiqueta},resultado="fallo"}} {m["cache_fallos"]}')
+    return "\n".join(lineas) + "\n"
+
+
+def escribir_metricas(ruta):
+    """
+    Escribe metricas_prometheus() en `ruta` de forma atómica (para el
+    colector de archivos de texto de node_exporter, por ejemplo).
+    """
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(metricas_prometheus())
+    os.replace(temporal, ruta)
@@ -0,0 +1,160 @@
+"""
+Búsqueda de metas: qué aporte mensual, saldo inicial, tasa bruta o plazo
+hace falta para llegar a un saldo objetivo.
+
+El saldo final es no decreciente en cada una de esas variables (más saldo
+nunca baja el tramo de bonificación), pero no es continuo: al cruzar un
+umbral de la matriz BN Vital el saldo salta. Por eso se busca el menor
+valor que alcanza el objetivo con una bisección de k puntos: cada pasada
+evalúa k candidatos a la vez en el motor vectorizado (una columna por
+candidato) y reduce el intervalo k + 1 veces.
+"""
+import time
+from datetime import date
+
+import numpy as np
+
+from .abonos import procesar_abonos
+from .bonificacion import matriz_por_mes
+from .proyeccion import avanzar_mes, proyectar_escenarios, vector_aportes
+
+VARIABLES_META = ("aporte", "inicial", "tasa", "plazo")
+
+# Precisión por defecto de cada variable (moneda, puntos porcentuales)
+TOLERANCIAS = {"aporte": 0.01, "inicial": 0.01, "tasa": 1e-6}
+
+# Intervalo de búsqueda por defecto; None = sin tope (se amplía solo)
+LIMITES = {"aporte": (0.0, None), "inicial": (0.0, None), "tasa": (0.0, 100.0)}
+
+PLAZO_MAXIMO_ANOS = 50
+
+
+def _saldos_finales(candidatos, variable, plan):
+    """
+    Saldo final nominal de cada candidato (arreglo 1-D) en una sola pasada
+    de la recurrencia. Misma aritmética que proyectar_escenarios.
+    """
+    candidatos = np.asarray(candidatos, dtype=float)
+    tasas = candidatos if variable == "tasa" else np.full(len(candidatos), plan["tasa_bruta_pct"])
+    tasa_mensual_bruta = (1 + tasas / 100)**(1/12) - 1
+    aportes = plan["extras"] + (candidatos[:, None] if variable == "aporte" else plan["aporte"])
+    aportes = np.broadcast_to(aportes, (len(candidatos), plan["meses"] + 1))
+    saldo = candidatos.copy() if variable == "inicial" else np.full(len(candidatos), plan["inicial"])
+
+    umbrales_saldo, porcentajes_mes = plan["matriz"]
+    for i in range(1, plan["meses"] + 1):
+        pct = porcentajes_mes[np.searchsorted(umbrales_saldo, saldo, side="right"), i]
+        saldo = avanzar_mes(saldo, tasa_mensual_bruta, plan["factor_comision"], pct, aportes[:, i])
+    return saldo
+
+
+def _buscar(evaluar, objetivo, inferior, superior, tolerancia, puntos, max_iteraciones):
+    """
+    Menor x en [inferior, superior] con evaluar(x) >= objetivo, para una
+    función no decreciente evaluada por lotes. Devuelve (x, f(x),
+    pasadas); x es None si ni el extremo superior alcanza el objetivo.
+    """
+    pasadas = 1
+    f_inferior = evaluar(np.array([inferior]))[0]
+    if f_inferior >= objetivo:
+        return inferior, f_inferior, pasadas
+
+    if superior is None:
+        # Sin tope: candidatos geométricos hasta encontrar uno que alcance
+        escala = max(abs(objetivo), 1.0)
+        while True:
+            candidatos = inferior + escala * 2.0**np.arange(puntos)
+            valores = evaluar(candidatos)
+            pasadas += 1
+            alcanzan = np.flatnonzero(valores >= objetivo)
+            if len(alcanzan):
+                k = alcanzan[0]
+                if k > 0:
+                    inferior = candidatos[k - 1]
+                superior, f_superior = candidatos[k], valores[k]
+                break
+            inferior, escala = candidatos[-1], escala * 2.0**puntos
+            if pasadas >= max_iteraciones:
+                return None, valores[-1], pasadas
+    else:
+        f_superior = evaluar(np.array([superior]))[0]
+        pasadas += 1
+        if f_superior < objetivo:
+            return None, f_superior, pasadas
+
+    while superior - inferior > tolerancia and pasadas < max_iteraciones:
+        candidatos = np.linspace(inferior, superior, puntos + 2)[1:-1]
+        valores = evaluar(candidatos)
+        pasadas += 1
+        alcanzan = np.flatnonzero(valores >= objetivo)
+        if len(alcanzan):
+            k = alcanzan[0]
+            if k > 0:
+                inferior = candidatos[k - 1]
+            superior, f_superior = candidatos[k], valores[k]
+        else:
+            inferior = candidatos[-1]
+    return superior, f_superior, pasadas
+
+
+def resolver_meta(variable, objetivo, tasa_bruta_pct, anos, aporte, inicial, comision_pct, inflacion_pct,
+                  abonos_extra_df, start_date, es_dolares, real=True, tolerancia=None, limites=None,
+                  puntos=16, max_iteraciones=60):
+    """
+    Valor de `variable` ("aporte", "inicial", "tasa" o "plazo") con el que
+    el saldo al final del plazo llega a `objetivo`; las demás variables
+    quedan fijas. Con real=True el objetivo está en poder de compra de hoy
+    (saldo real); si no, en saldo nominal.
+
+    Devuelve el menor valor que alcanza el objetivo (None si no se alcanza
+    dentro de `limites`), el saldo obtenido con él, las pasadas del motor
+    y el tiempo de cálculo. El plazo se resuelve en años enteros, como en
+    la app, con una sola proyección a PLAZO_MAXIMO_ANOS.
+    """
+    if variable not in VARIABLES_META:
+        raise ValueError(f"Variable desconocida: {variable} (use {', '.join(VARIABLES_META)})")
+    if start_date is None:
+        start_date = date.today()
+    inicio = time.perf_counter()
+    inflacion_mensual = (1 + inflacion_pct/100)**(1/12) - 1
+
+    if variable == "plazo":
+        abonos_map, _ = procesar_abonos(abonos_extra_df, start_date, PLAZO_MAXIMO_ANOS)
+        lote = proyectar_escenarios([tasa_bruta_pct], PLAZO_MAXIMO_ANOS, aporte, inicial, comision_pct,
+                                    inflacion_pct, abonos_map, start_date, es_dolares)
+        serie = (lote["saldo_real"] if real else lote["saldo_final"])[0, 12::12]
+        alcanzan = np.flatnonzero(serie >= objetivo)
+        valor = int(alcanzan[0]) + 1 if len(alcanzan) else None
+        meses = 12 * (valor or PLAZO_MAXIMO_ANOS)
+        saldo_nominal = float(lote["saldo_final"][0, meses])
+        pasadas = 1
+    else:
+        meses = int(anos * 12)
+        abonos_map, _ = procesar_abonos(abonos_extra_df, start_date, anos)
+        plan = {
+            "meses": meses,
+            "tasa_bruta_pct": tasa_bruta_pct,
+            "aporte": aporte,
+            "inicial": inicial,
+            "factor_comision": comision_pct / 100,
+            "extras": vector_aportes(meses, 0.0, 0.0, abonos_map),
+            "matriz": matriz_por_mes(meses, es_dolares),
+        }
+        objetivo_nominal = objetivo * (1 + inflacion_mensual)**meses if real else objetivo
+        inferior, superior = (limites or LIMITES[variable])
+        valor, saldo_nominal, pasadas = _buscar(
+            lambda candidatos: _saldos_finales(candidatos, variable, plan), objetivo_nominal,
+            inferior, superior, tolerancia or TOLERANCIAS[variable], puntos, max_iteraciones
+        )
+        valor = None if valor is None else float(valor)
+        saldo_nominal = float(saldo_nominal)
+
+    return {
+        "variable": variable,
+        "valor": valor,
+        "alcanzable": valor is not None,
+        "saldo_nominal": saldo_nominal,
+        "saldo_real": saldo_nominal / (1 + inflacion_mensual)**meses,
+        "iteraciones": pasadas,
+        "segundos": time.perf_counter() - inicio,
+    }
@@ -0,0 +1,96 @@
+import numpy as np
+
+from .bonificacion import matriz_por_mes
+from .paralelo import dividir_rango, mapear
+from .proyeccion import avanzar_mes, vector_aportes
+
+# Trayectorias por bloque: acota la memoria de trabajo independientemente
+# del total de trayectorias simuladas.
+TAMANO_BLOQUE = 10_000
+
+
+def parametros_lognormales(media_pct, volatilidad_pct):
+    """
+    Convierte rendimiento bruto anual esperado y volatilidad anual (en %) en
+    la media y desviación del log-rendimiento mensual.
+    """
+    sigma_mensual = (volatilidad_pct / 100) / np.sqrt(12)
+    mu_mensual = np.log1p(media_pct / 100) / 12 - sigma_mensual**2 / 2
+    return mu_mensual, sigma_mensual
+
+
+def simular_bloque(rng, n_trayectorias, meses, mu_mensual, sigma_mensual, aportes, factor_comision,
+                   umbrales_saldo, porcentajes_mes, meses_registro):
+    """
+    Simula un bloque de trayectorias (vectorizado entre trayectorias) y
+    devuelve el saldo nominal en cada mes de meses_registro
+    (trayectorias x puntos).
+    """
+    registro = np.empty((n_trayectorias, len(meses_registro)))
+    posicion = np.full(meses + 1, -1)
+    posicion[meses_registro] = np.arange(len(meses_registro))
+
+    saldo = np.full(n_trayectorias, float(aportes[0]))
+    if posicion[0] >= 0:
+        registro[:, posicion[0]] = saldo
+    for i in range(1, meses + 1):
+        tasa_mes = np.expm1(rng.normal(mu_mensual, sigma_mensual, n_trayectorias))
+        pct = porcentajes_mes[np.searchsorted(umbrales_saldo, saldo, side="right"), i]
+        # La comisión se cobra sobre rendimientos positivos
+        saldo = avanzar_mes(saldo, tasa_mes, factor_comision, pct, aportes[i], solo_positivos=True)
+        if posicion[i] >= 0:
+            registro[:, posicion[i]] = saldo
+    return registro
+
+
+def _simular_tarea(tarea):
+    semilla_bloque, *argumentos = tarea
+    return simular_bloque(np.random.default_rng(semilla_bloque), *argumentos)
+
+
+def simular_montecarlo(media_pct, volatilidad_pct, n_trayectorias, anos, aporte, inicial, comision_pct, inflacion_pct,
+                       abonos_map, es_dolares, semilla=None, paso_meses=12, percentiles=(5, 50, 95),
+                       tamano_bloque=TAMANO_BLOQUE, n_procesos=1):
+    """
+    Proyección estocástica del plan con rendimientos mensuales log-normales.
+
+    Aplica la misma comisión y matriz de bonificación BN Vital que el motor
+    determinístico. Las trayectorias se simulan por bloques, cada uno con su
+    propia semilla derivada de `semilla`, de modo que el resultado no depende
+    del orden ni del número de procesos (n_procesos > 1 reparte los bloques
+    en un pool; None usa todos los núcleos). Sólo se guardan los meses
+    múltiplos de paso_meses (y el último), así la memoria es
+    trayectorias x puntos.
+
+    Devuelve los meses registrados, las bandas de percentiles nominales y
+    reales (percentil x punto) y el saldo final nominal de cada trayectoria.
+    """
+    meses = int(anos * 12)
+    meses_registro = np.unique(np.append(np.arange(0, meses + 1, paso_meses), meses))
+    mu_mensual, sigma_mensual = parametros_lognormales(media_pct, volatilidad_pct)
+    aportes = vector_aportes(meses, aporte, inicial, abonos_map)
+    umbrales_saldo, porcentajes_mes = matriz_por_mes(meses, es_dolares)
+
+    bloques = dividir_rango(n_trayectorias, tamano_bloque)
+    semillas = np.random.SeedSequence(semilla).spawn(len(bloques))
+    tareas = [
+        (semilla_bloque, fin - inicio, meses, mu_mensual, sigma_mensual, aportes,
+         comision_pct / 100, umbrales_saldo, porcentajes_mes, meses_registro)
+        for (inicio, fin), semilla_bloque in zip(bloques, semillas)
+    ]
+
+    saldos = np.empty((n_trayectorias, len(meses_registro)))
+    for (inicio, fin), registro in zip(bloques, mapear(_simular_tarea, tareas, n_procesos)):
+        saldos[inicio:fin] = registro
+
+    factor_inflacion = (1 + inflacion_pct/100)**(meses_registro / 12)
+    bandas = np.percentile(saldos, percentiles, axis=0)
+
+    return {
+        "meses": meses_registro,
+        "percentiles": np.asarray(percentiles),
+        "bandas_nominales": bandas,
+        "bandas_reales": bandas / factor_inflacion,
+        "aportes_acumulados": np.cumsum(aportes)[meses_registro],
+        "saldo_final": saldos[:, -1],
+    }
@@ -0,0 +1,44 @@
+import os
+
+
+def procesos_disponibles():
+    """
+    Núcleos que el proceso puede usar (respeta la afinidad de CPU en Linux).
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def mapear(funcion, tareas, n_procesos=1):
+    """
+    Aplica `funcion` a cada tarea y devuelve los resultados en el orden de
+    las tareas.
+
+    Con n_procesos=1 se ejecuta en el proceso actual; con n_procesos > 1 (o
+    None para usar todos los núcleos) reparte las tareas en un pool de
+    procesos. `funcion` debe ser de nivel de módulo y las tareas
+    serializables. Como cada tarea lleva todo lo que necesita (incluida su
+    semilla), el resultado no depende del número de procesos.
+    """
+    tareas = list(tareas)
+    if n_procesos is None:
+        n_procesos = procesos_disponibles()
+    n_procesos = min(n_procesos, len(tareas))
+    if n_procesos <= 1:
+        return [funcion(tarea) for tarea in tareas]
+
+    # multiprocessing sólo se importa cuando de verdad se reparte
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+        return list(pool.map(funcion, tareas))
+
+
+def dividir_rango(total, tamano_bloque):
+    """
+    Parte el rango 0..total en bloques consecutivos (inicio, fin) de a lo
+    sumo tamano_bloque elementos.
+    """
+    return [(inicio, min(inicio + tamano_bloque, total)) for inicio in range(0, total, tamano_bloque)]
@@ -0,0 +1,295 @@
+import numpy as np
+from datetime import date
+
+from .bonificacion import matriz_por_mes
+from .cronogramas import factor_inflacion, normalizar, tasa_mensual, tasas_por_escenario
+from .instrumentacion import anotar
+
+# Orden y nombres de columnas de la tabla detallada (igual que en la app)
+COLUMNAS_DETALLE = [
+    "Mes", "Fecha", "Antigüedad (Meses)", "Saldo Inicial", "Aporte Total",
+    "Rendimiento Bruto", "Comisión Bruta", "% Bonificación", "Monto Bonificación",
+    "Comisión Real", "Rendimiento Neto", "Saldo Final"
+]
+
+
+# --- EJE DE FECHAS ---
+def fechas_mensuales(start_date, meses):
+    """
+    Devuelve las fechas de los meses 0..meses como datetime64[D].
+    Equivale a pd.Timestamp(start_date) + pd.DateOffset(months=i): si el día
+    no existe en el mes destino se usa el último día de ese mes.
+    """
+    inicio = np.datetime64(start_date, "D")
+    meses_eje = inicio.astype("datetime64[M]") + np.arange(meses + 1)
+    primer_dia = meses_eje.astype("datetime64[D]")
+    dias_en_mes = ((meses_eje + 1).astype("datetime64[D]") - primer_dia).astype(np.int64)
+    dia_inicio = (inicio - inicio.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64)
+    return primer_dia + np.minimum(dia_inicio, dias_en_mes - 1)
+
+
+def vector_aportes(meses, aporte, inicial, abonos_map):
+    """
+    Arma el vector de aportes por mes: el mes 0 es el saldo inicial y los
+    meses 1..meses son el aporte mensual más los abonos extraordinarios.
+    """
+    extras = np.zeros(meses + 1)
+    for mes, monto in abonos_map.items():
+        extras[mes] += monto
+    aportes = aporte + extras
+    aportes[0] = inicial
+    return aportes
+
+
+def avanzar_mes(saldo, tasa_mes, factor_comision, pct, aporte, solo_positivos=False):
+    """
+    Un mes de la recurrencia del saldo: rendimiento bruto, comisión sobre
+    el rendimiento, bonificación (pct, el % de la matriz para el tramo de
+    cada saldo) y aporte al final del mes. Los argumentos se combinan con
+    broadcasting (escenarios, candidatos, trayectorias o planes). Con
+    solo_positivos la comisión se cobra sólo sobre rendimientos positivos.
+    """
+    rendimiento_bruto = saldo * tasa_mes
+    comision_bruta = (np.maximum(rendimiento_bruto, 0.0) if solo_positivos else rendimiento_bruto) * factor_comision
+    comision_real = comision_bruta - comision_bruta * (pct / 100)
+    return saldo + (rendimiento_bruto - comision_real) + aporte
+
+
+# --- MOTOR VECTORIZADO ---
+# El motor devuelve sólo los arreglos primarios (saldos, % de bonificación y
+# aportes); las demás columnas de la tabla detallada se derivan bajo demanda
+# con columnas_detalle, por rango de filas.
+
+# Claves que dependen de la tasa (una fila por escenario en el lote)
+COLUMNAS_POR_ESCENARIO = [
+    "tasa_bruta_pct", "tasa_mensual_bruta", "pct_bonificacion", "saldo_final", "saldo_real",
+    # Sólo en el modo exacto (motor.exacto)
+    "saldo_centimos", "rendimiento_centimos", "comision_bruta_centimos", "bonificacion_centimos",
+]
+
+
+def mes_de_reanudacion(previo, tasas_brutas_pct, aportes, comision_pct, es_dolares):
+    """
+    Primer mes que hay que recalcular si se parte de la proyección `previo`
+    (un lote de proyectar_escenarios). Devuelve 0 si no es reutilizable:
+    cambia la cantidad de escenarios o la moneda, o `previo` es del modo
+    exacto. Si sólo cambian aportes, abonos, tasas o comisión desde cierto
+    mes (p. ej. un tramo nuevo del cronograma), o se extiende el plazo, los
+    meses anteriores se conservan tal cual.
+
+    Las tasas y la comisión vienen ya normalizadas (ver motor.cronogramas).
+    """
+    if (previo is None or "saldo_centimos" in previo or previo["es_dolares"] != es_dolares
+            or len(previo["tasa_bruta_pct"]) != len(tasas_brutas_pct)):
+        return 0
+    comun = min(len(previo["aporte_total"]), len(aportes))
+    distintos = previo["aporte_total"][:comun] != aportes[:comun]
+    distintos |= (_tasas_por_mes(previo["tasa_bruta_pct"], comun) != _tasas_por_mes(tasas_brutas_pct, comun)).any(axis=0)
+    distintos |= _comision_por_mes(previo["comision_pct"], comun) != _comision_por_mes(comision_pct, comun)
+    primero = np.flatnonzero(distintos)
+    return int(primero[0]) if len(primero) else comun
+
+
+def _tasas_por_mes(tasas_brutas_pct, meses):
+    # Escenario x mes (0..meses-1), sea la tasa constante o con cronograma
+    tasas_brutas_pct = np.asarray(tasas_brutas_pct)
+    if tasas_brutas_pct.ndim == 1:
+        return np.broadcast_to(tasas_brutas_pct[:, None], (len(tasas_brutas_pct), meses))
+    return tasas_brutas_pct[:, :meses]
+
+
+def _comision_por_mes(comision_pct, meses):
+    if np.ndim(comision_pct) == 0:
+        return np.broadcast_to(comision_pct, meses)
+    return comision_pct[:meses]
+
+
+def proyectar_escenarios(tasas_brutas_pct, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_map, start_date, es_dolares, previo=None):
+    """
+    Proyección mensual de varios escenarios de tasa bruta en una sola pasada.
+
+    Los aportes y los factores de inflación se calculan una vez y se
+    comparten; la recurrencia del saldo recorre los meses operando sobre
+    todos los escenarios a la vez. Las claves de COLUMNAS_POR_ESCENARIO
+    tienen una fila por escenario (los arreglos mensuales son 2-D,
+    escenario x mes); los arreglos compartidos son 1-D de largo meses + 1,
+    donde la posición 0 es la fila inicial.
+
+    Tasas, aporte, comisión e inflación aceptan cronogramas (ver
+    motor.cronogramas): se expanden una vez a arreglos por mes y la
+    inflación acumulada es un producto acumulado, así que el único bucle
+    sigue siendo el de la recurrencia, que lee la tasa y la comisión de
+    cada mes como lee los aportes. Con alguna tasa con cronograma,
+    "tasa_bruta_pct" y "tasa_mensual_bruta" son escenario x mes; con
+    comisión con cronograma, "comision_pct" es un arreglo por mes.
+
+    Con `previo` (el lote de una proyección anterior) la recurrencia se
+    reanuda desde el primer mes afectado (ver mes_de_reanudacion): editar
+    un abono en el mes 240 o extender el plazo sólo recalcula la cola.
+    """
+    meses = int(anos * 12)
+    if start_date is None:
+        start_date = date.today()
+
+    # --- Tasas Mensuales (constantes o con cronograma) ---
+    tasas_brutas_pct = tasas_por_escenario(tasas_brutas_pct, meses)
+    comision_pct = normalizar(comision_pct, meses)
+    n_escenarios = len(tasas_brutas_pct)
+    tasa_mensual_bruta = tasa_mensual(tasas_brutas_pct)
+
+    # Tasas (por escenario) y comisión de cada mes, listas para indexar en
+    # la recurrencia; con valores constantes todas las entradas son el mismo
+    if tasa_mensual_bruta.ndim == 1:
+        tasas_mes = [tasa_mensual_bruta] * (meses + 1)
+    else:
+        tasas_mes = list(np.ascontiguousarray(tasa_mensual_bruta.T))
+    comisiones_mes = np.broadcast_to(np.asarray(comision_pct) / 100, meses + 1).tolist()
+
+    aportes = vector_aportes(meses, normalizar(aporte, meses), inicial, abonos_map)
+
+    # --- Matriz de bonificación: columna de antigüedad de cada mes ---
+    umbrales_saldo, porcentajes_mes = matriz_por_mes(meses, es_dolares)
+
+    # --- Recurrencia del saldo (vectorizada entre escenarios) ---
+    saldos = np.empty((n_escenarios, meses + 1))
+    pct_bonificacion = np.zeros((n_escenarios, meses + 1))
+    reanudar = mes_de_reanudacion(previo, tasas_brutas_pct, aportes, comision_pct, es_dolares)
+    if reanudar > 0:
+        # Se conservan los meses ya calculados y se sigue desde el último
+        saldos[:, :reanudar] = previo["saldo_final"][:, :reanudar]
+        pct_bonificacion[:, :reanudar] = previo["pct_bonificacion"][:, :reanudar]
+        saldo = saldos[:, reanudar - 1].copy()
+    else:
+        reanudar = 1
+        saldo = np.full(n_escenarios, float(inicial))
+        saldos[:, 0] = saldo
+    anotar("meses_calculados", (meses + 1 - reanudar) * n_escenarios)
+    for i in range(reanudar, meses + 1):
+        pct = porcentajes_mes[np.searchsorted(umbrales_saldo, saldo, side="right"), i]
+        saldo = avanzar_mes(saldo, tasas_mes[i], comisiones_mes[i], pct, aportes[i])
+        saldos[:, i] = saldo
+        pct_bonificacion[:, i] = pct
+
+    return {
+        "fecha_inicio": start_date,
+        "es_dolares": es_dolares,
+        "comision_pct": comision_pct,
+        "tasa_bruta_pct": tasas_brutas_pct,
+        "tasa_mensual_bruta": tasa_mensual_bruta,
+        "aporte_total": aportes,
+        "aportes_acumulados": np.cumsum(aportes),
+        "pct_bonificacion": pct_bonificacion,
+        "saldo_final": saldos,
+        "saldo_real": saldos / factor_inflacion(normalizar(inflacion_pct, meses), meses),
+    }
+
+
+def seleccionar_escenario(lote, k):
+    """
+    Extrae del resultado de proyectar_escenarios la proyección 1-D del
+    escenario k (vistas, sin copiar).
+    """
+    return {
+        col: (valores[k] if col in COLUMNAS_POR_ESCENARIO else valores)
+        for col, valores in lote.items()
+    }
+
+
+def unir_escenarios(proyecciones):
+    """
+    Inversa de seleccionar_escenario: arma un lote a partir de las
+    proyecciones 1-D de cada escenario (mismo plan, distintas tasas).
+    """
+    return {
+        col: (np.stack([p[col] for p in proyecciones]) if col in COLUMNAS_POR_ESCENARIO else valores)
+        for col, valores in proyecciones[0].items()
+    }
+
+
+def proyectar(tasa_bruta_pct, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_map, start_date, es_dolares):
+    """
+    Proyección mensual de un único escenario. Devuelve los arreglos
+    primarios 1-D de largo meses + 1, donde la posición 0 es la fila inicial.
+    """
+    lote = proyectar_escenarios(
+        [tasa_bruta_pct], anos, aporte, inicial, comision_pct, inflacion_pct,
+        abonos_map, start_date, es_dolares
+    )
+    return seleccionar_escenario(lote, 0)
+
+
+# --- TABLA DETALLADA (BAJO DEMANDA) ---
+def columnas_detalle(proyeccion, desde=0, hasta=None):
+    """
+    Deriva todas las columnas de la tabla detallada para las filas
+    desde..hasta-1 de una proyección de un escenario. Si la proyección es
+    del modo exacto, los montos salen de sus céntimos ya redondeados.
+    """
+    saldo_final = proyeccion["saldo_final"]
+    hasta = len(saldo_final) if hasta is None else min(hasta, len(saldo_final))
+    desde = max(0, min(desde, hasta))
+    mes = np.arange(desde, hasta)
+
+    # El saldo inicial de cada mes es el final del anterior (0 en la fila inicial)
+    saldo_inicial = np.where(mes > 0, saldo_final[np.maximum(mes - 1, 0)], 0.0)
+    pct_bonificacion = proyeccion["pct_bonificacion"][desde:hasta]
+    if "saldo_centimos" in proyeccion:
+        rendimiento_c = proyeccion["rendimiento_centimos"][desde:hasta]
+        comision_c = proyeccion["comision_bruta_centimos"][desde:hasta]
+        bonificacion_c = proyeccion["bonificacion_centimos"][desde:hasta]
+        rendimiento_bruto = rendimiento_c / 100
+        comision_bruta = comision_c / 100
+        monto_bonificacion = bonificacion_c / 100
+        comision_real = (comision_c - bonificacion_c) / 100
+        rendimiento_neto = (rendimiento_c - comision_c + bonificacion_c) / 100
+    else:
+        tasa = proyeccion["tasa_mensual_bruta"]
+        comision_pct = proyeccion["comision_pct"]
+        # Con cronograma, la tasa y la comisión de cada fila
+        if np.ndim(tasa):
+            tasa = tasa[desde:hasta]
+        if np.ndim(comision_pct):
+            comision_pct = comision_pct[desde:hasta]
+        rendimiento_bruto = saldo_inicial * tasa
+        comision_bruta = rendimiento_bruto * (comision_pct / 100)
+        monto_bonificacion = comision_bruta * (pct_bonificacion / 100)
+        comision_real = comision_bruta - monto_bonificacion
+        rendimiento_neto = rendimiento_bruto - comision_real
+
+    return {
+        "mes": mes,
+        "fecha": fechas_mensuales(proyeccion["fecha_inicio"], hasta - 1)[desde:] if hasta else np.array([], dtype="datetime64[D]"),
+        "saldo_inicial": saldo_inicial,
+        "aporte_total": proyeccion["aporte_total"][desde:hasta],
+        "rendimiento_bruto": rendimiento_bruto,
+        "comision_bruta": comision_bruta,
+        "pct_bonificacion": pct_bonificacion,
+        "monto_bonificacion": monto_bonificacion,
+        "comision_real": comision_real,
+        "rendimiento_neto": rendimiento_neto,
+        "saldo_final": saldo_final[desde:hasta],
+    }
+
+
+def construir_df_detalle(proyeccion, desde=0, hasta=None):
+    """
+    Construye la tabla detallada (una fila por mes) columna por columna para
+    las filas desde..hasta-1 (por defecto, todas).
+    """
+    import pandas as pd
+
+    columnas = columnas_detalle(proyeccion, desde, hasta)
+    return pd.DataFrame({
+        "Mes": columnas["mes"],
+        "Fecha": columnas["fecha"],
+        "Antigüedad (Meses)": columnas["mes"],
+        "Saldo Inicial": columnas["saldo_inicial"],
+        "Aporte Total": columnas["aporte_total"],
+        "Rendimiento Bruto": columnas["rendimiento_bruto"],
+        "Comisión Bruta": columnas["comision_bruta"],
+        "% Bonificación": columnas["pct_bonificacion"],
+        "Monto Bonificación": columnas["monto_bonificacion"],
+        "Comisión Real": columnas["comision_real"],
+        "Rendimiento Neto": columnas["rendimiento_neto"],
+        "Saldo Final": columnas["saldo_final"],
+    }, columns=COLUMNAS_DETALLE)
@@ -0,0 +1,335 @@
+"""
+Fase de retiro (desacumulación): cuánto dura el saldo acumulado pagando
+un retiro mensual, con rendimientos fijos o aleatorios.
+
+Modalidades de retiro:
+
+    "fijo"        el mismo monto nominal cada mes
+    "indexado"    el monto sigue a la inflación (mismo poder de compra)
+    "programado"  el saldo se reparte en los meses restantes como una renta
+                  a la tasa técnica, recalculada cada mes (no se agota)
+
+Un `perfil` opcional (cronograma, ver motor.cronogramas) multiplica el
+monto de cada mes, p. ej. {0: 1.0, 120: 0.8} para bajarlo a los 10 años.
+
+Cada mes se aplican el rendimiento, la comisión sobre rendimientos
+positivos con la bonificación BN Vital (la antigüedad sigue contando desde
+la acumulación) y el retiro al final del mes. Si el saldo no alcanza para
+el retiro completo se paga lo que queda y el fondo se agota ese mes.
+
+La recurrencia es vectorizada entre niveles de retiro y trayectorias a la
+vez (nivel x trayectoria), y todos los niveles ven los mismos rendimientos
+aleatorios. La tabla de retiro máximo sostenible no recorre una malla de
+montos: calcula el monto crítico de cada trayectoria y horizonte (unas
+pocas pasadas de Newton sobre todas a la vez) y toma cuantiles.
+"""
+import time
+
+import numpy as np
+
+from .bonificacion import matriz_por_mes
+from .cronogramas import expandir, factor_inflacion, normalizar, tasa_mensual
+from .montecarlo import parametros_lognormales
+from .proyeccion import avanzar_mes
+
+MODALIDADES = ("fijo", "indexado", "programado")
+
+PERCENTILES_RETIRO = (5, 50, 95)
+
+# Confianza = probabilidad de no agotar el fondo antes del horizonte
+CONFIANZAS = (0.5, 0.75, 0.9, 0.95)
+
+
+def factores_retiro(meses, modalidad, inflacion_pct, perfil=None):
+    """
+    Multiplicador del monto de retiro en cada mes 0..meses. En "indexado"
+    el primer retiro es el monto indicado y desde ahí sigue a la inflación.
+    """
+    factores = np.ones(meses + 1)
+    if modalidad == "indexado":
+        factores[1:] = factor_inflacion(normalizar(inflacion_pct, meses), meses)[:-1]
+    if perfil is not None:
+        factores = factores * expandir(perfil, meses)
+    return factores
+
+
+def factores_renta(meses, tasa_tecnica_pct=0.0):
+    """
+    Fracción del saldo que se retira cada mes en el retiro programado: la
+    cuota de una renta anticipada por los meses que faltan a la tasa
+    técnica (con tasa 0, el saldo entre los meses restantes). El último
+    mes se retira todo.
+    """
+    restantes = (meses + 1 - np.arange(meses + 1)).astype(float)
+    tasa = float(tasa_mensual(tasa_tecnica_pct))
+    if tasa == 0:
+        return 1 / restantes
+    descuento = 1 / (1 + tasa)
+    return (1 - descuento) / (1 - descuento**restantes)
+
+
+def _recorrer(saldo_inicial, montos, plan, meses, meses_registro, percentiles):
+    """
+    Recorre los meses 1..meses con saldos de forma (niveles, trayectorias).
+    `montos` (niveles x 1) se multiplica por el factor de cada mes; en
+    "programado" se ignora. Devuelve el mes de agotamiento (0 si no se
+    agota), el saldo final, el total retirado nominal y real, y las bandas
+    del saldo y del retiro pagado en meses_registro.
+    """
+    forma = (len(montos), plan["trayectorias"])
+    saldo = np.empty(forma)
+    saldo[:] = saldo_inicial
+    agotado = np.zeros(forma, dtype=bool)
+    meses_agotado = np.zeros(forma, dtype=np.int32)
+    retirado = np.zeros(forma)
+    retirado_real = np.zeros(forma)
+
+    posicion = np.full(meses + 1, -1)
+    posicion[meses_registro] = np.arange(len(meses_registro))
+    bandas = np.empty((forma[0], len(percentiles), len(meses_registro)))
+    bandas[:, :, 0] = np.percentile(saldo, percentiles, axis=1).T
+    bandas_retiro = np.zeros_like(bandas)
+
+    umbrales_saldo, porcentajes_mes = plan["umbrales"], plan["porcentajes"]
+    programado = plan["modalidad"] == "programado"
+    rng = np.random.default_rng(plan["semilla"])
+    for i in range(1, meses + 1):
+        if plan["sigma"] == 0:
+            tasa_mes = np.expm1(plan["mu"])
+        else:
+            tasa_mes = np.expm1(rng.normal(plan["mu"], plan["sigma"], forma[1]))
+        pct = porcentajes_mes[i].take(np.searchsorted(umbrales_saldo, saldo, side="right"))
+        saldo = avanzar_mes(saldo, tasa_mes, plan["factor_comision"], pct, 0.0, solo_positivos=True)
+
+        retiro = saldo * plan["renta"][i] if programado else montos * plan["factores"][i]
+        # Con saldo insuficiente se paga lo que queda: el fondo se agota ese mes
+        agotado |= saldo < retiro
+        meses_agotado += agotado
+        pagado = np.minimum(retiro, saldo)
+        saldo = saldo - pagado
+        retirado += pagado
+        retirado_real += pagado / plan["deflactor"][i]
+        if posicion[i] >= 0:
+            bandas[:, :, posicion[i]] = np.percentile(saldo, percentiles, axis=1).T
+            bandas_retiro[:, :, posicion[i]] = np.percentile(pagado, percentiles, axis=1).T
+
+    mes_agotamiento = np.where(meses_agotado > 0, meses + 1 - meses_agotado, 0)
+    return mes_agotamiento, saldo, retirado, retirado_real, bandas, bandas_retiro
+
+
+def _preparar(saldo_inicial, anos, media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct, es_dolares,
+              modalidad, antiguedad_meses, tasa_tecnica_pct, perfil, semilla):
+    if modalidad not in MODALIDADES:
+        raise ValueError(f"Modalidad de retiro desconocida: {modalidad} (use {', '.join(MODALIDADES)})")
+    meses = int(anos * 12)
+    saldo_inicial = np.asarray(saldo_inicial, dtype=float)
+    if saldo_inicial.ndim:
+        # Un saldo por trayectoria (p. ej. los saldos finales de Monte Carlo)
+        n_trayectorias = len(saldo_inicial)
+    elif volatilidad_pct == 0:
+        n_trayectorias = 1
+    mu_mensual, sigma_mensual = parametros_lognormales(media_pct, volatilidad_pct)
+    umbrales_saldo, porcentajes_mes = matriz_por_mes(antiguedad_meses + meses, es_dolares)
+    return saldo_inicial, meses, {
+        "trayectorias": int(n_trayectorias),
+        "modalidad": modalidad,
+        "mu": mu_mensual,
+        "sigma": sigma_mensual,
+        # Misma semilla en cada pasada: todos los niveles ven los mismos rendimientos
+        "semilla": np.random.SeedSequence(semilla).entropy,
+        "umbrales": umbrales_saldo,
+        "factor_comision": comision_pct / 100,
+        # % de bonificación por mes (antigüedad desde la acumulación) y tramo
+        "porcentajes": np.ascontiguousarray(porcentajes_mes[:, antiguedad_meses:].T),
+        "factores": factores_retiro(meses, modalidad, inflacion_pct, perfil),
+        "renta": factores_renta(meses, tasa_tecnica_pct),
+        "deflactor": factor_inflacion(normalizar(inflacion_pct, meses), meses),
+    }
+
+
+def simular_retiro(saldo_inicial, anos, retiros, media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct,
+                   es_dolares, modalidad="fijo", antiguedad_meses=0, tasa_tecnica_pct=0.0, perfil=None, semilla=None,
+                   paso_meses=12, percentiles=PERCENTILES_RETIRO):
+    """
+    Simula la fase de retiro durante `anos` años para uno o varios montos
+    mensuales (`retiros`, en "programado" se ignora) sobre n_trayectorias
+    de rendimientos log-normales (con volatilidad 0, una sola trayectoria
+    determinística). `saldo_inicial` es un número o un saldo por
+    trayectoria (p. ej. el saldo_final de simular_montecarlo).
+
+    Devuelve, por nivel de retiro: la probabilidad de agotar el fondo
+    antes del plazo, el mes de agotamiento de cada trayectoria (0 si no se
+    agota), el total retirado promedio (nominal y real) y las bandas de
+    percentiles del saldo y del retiro pagado (nivel x percentil x punto)
+    en los meses múltiplos de paso_meses.
+    """
+    saldo_inicial, meses, plan = _preparar(
+        saldo_inicial, anos, media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct, es_dolares,
+        modalidad, antiguedad_meses, tasa_tecnica_pct, perfil, semilla
+    )
+    niveles = np.atleast_1d(np.asarray(retiros if modalidad != "programado" else 0.0, dtype=float))
+    meses_registro = np.unique(np.append(np.arange(0, meses + 1, paso_meses), meses))
+    agotamiento, saldo, retirado, retirado_real, bandas, bandas_retiro = _recorrer(
+        saldo_inicial, niveles[:, None], plan, meses, meses_registro, percentiles
+    )
+    deflactor = plan["deflactor"][meses_registro]
+    return {
+        "niveles": niveles,
+        "meses": meses_registro,
+        "percentiles": np.asarray(percentiles),
+        "mes_agotamiento": agotamiento,
+        "prob_ruina": (agotamiento > 0).mean(axis=1),
+        "saldo_final": saldo,
+        "retiro_total": retirado.mean(axis=1),
+        "retiro_total_real": retirado_real.mean(axis=1),
+        "bandas_nominales": bandas,
+        "bandas_reales": bandas / deflactor,
+        "bandas_retiro": bandas_retiro,
+        "bandas_retiro_reales": bandas_retiro / deflactor,
+    }
+
+
+def _retiros_criticos(saldo_inicial, horizontes_meses, plan, tolerancia, max_iteraciones):
+    """
+    Mayor monto que cada trayectoria sostiene hasta cada horizonte
+    (horizonte x trayectoria), con los mismos rendimientos en cada pasada.
+
+    Sin recortar el saldo en cero, sostener el retiro hasta el horizonte
+    equivale a terminar con saldo no negativo (un saldo negativo ya no
+    vuelve a ser positivo), y ese saldo es lineal por tramos y decreciente
+    en el monto: sólo cambia de pendiente cuando cambia el tramo de
+    bonificación. Cada pasada lleva el saldo y su derivada respecto del
+    monto y da un paso de Newton desde el último monto, dentro del
+    intervalo [sostenible, no sostenible] conocido (si sale de él, o tras
+    varias pasadas, se biseca). Cada pasada recorre sólo las celdas
+    (horizonte, trayectoria) que aún no convergen, y sólo hasta su horizonte.
+    """
+    n_trayectorias = plan["trayectorias"]
+    forma = (len(horizontes_meses), n_trayectorias)
+    trayectoria = np.tile(np.arange(n_trayectorias), forma[0])
+    horizonte = np.repeat(horizontes_meses, n_trayectorias)
+    saldo_inicial = np.broadcast_to(saldo_inicial, n_trayectorias)
+    umbrales_saldo, porcentajes_mes, factores = plan["umbrales"], plan["porcentajes"], plan["factores"]
+    factor_comision = plan["factor_comision"]
+    mu_mensual, sigma_mensual = plan["mu"], plan["sigma"]
+
+    # Los rendimientos de cada mes (mes x trayectoria) se sortean una vez:
+    # mismos números que _recorrer con la misma semilla
+    meses = max(horizontes_meses)
+    if sigma_mensual == 0:
+        tasas = np.full((meses + 1, 1), np.expm1(mu_mensual))
+        trayectoria_tasa = np.zeros(trayectoria.size, dtype=int)
+    else:
+        tasas = np.empty((meses + 1, n_trayectorias))
+        tasas[1:] = np.expm1(np.random.default_rng(plan["semilla"]).normal(mu_mensual, sigma_mensual, (meses, n_trayectorias)))
+        trayectoria_tasa = trayectoria
+
+    monto = np.zeros(trayectoria.size)
+    inferior = np.zeros(trayectoria.size)
+    superior = np.full(trayectoria.size, np.inf)
+    activos = np.arange(trayectoria.size)
+    for pasada in range(1, max_iteraciones + 1):
+        horizonte_activo, monto_activo = horizonte[activos], monto[activos]
+        capturas = {h: np.flatnonzero(horizonte_activo == h) for h in np.unique(horizonte_activo)}
+        tray = trayectoria_tasa[activos]
+        saldo = saldo_inicial[trayectoria[activos]]
+        derivada = np.zeros(len(activos))
+        saldo_h = np.empty(len(activos))
+        derivada_h = np.empty(len(activos))
+        for i in range(1, int(horizonte_activo.max()) + 1):
+            tasa_mes = tasas[i].take(tray)
+            pct = porcentajes_mes[i].take(np.searchsorted(umbrales_saldo, saldo, side="right"))
+            saldo = avanzar_mes(saldo, tasa_mes, factor_comision, pct, -monto_activo * factores[i], solo_positivos=True)
+            # Mientras el saldo no es negativo el rendimiento tiene el signo
+            # de la tasa y el mes es lineal en el saldo: ésta es su pendiente
+            crecimiento = (1 + tasa_mes) - np.maximum(tasa_mes, 0.0) * factor_comision * (1 - pct / 100)
+            derivada = derivada * crecimiento - factores[i]
+            if i in capturas:
+                celdas = capturas[i]
+                saldo_h[celdas], derivada_h[celdas] = saldo[celdas], derivada[celdas]
+
+        sostiene = saldo_h >= 0
+        inferior[activos] = np.where(sostiene, monto_activo, inferior[activos])
+        superior[activos] = np.where(sostiene, superior[activos], monto_activo)
+        abajo, arriba = inferior[activos], superior[activos]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            paso = np.where(derivada_h < 0, saldo_h / -derivada_h, np.inf)
+        escala = np.maximum(abajo, 1.0)
+        convergido = (arriba - abajo <= tolerancia * escala) | (sostiene & (paso <= tolerancia * escala))
+
+        nuevo = monto_activo + paso
+        fuera = ~((nuevo > abajo) & (nuevo < arriba))
+        biseccion = np.isfinite(arriba) & (fuera | (pasada > 4))
+        nuevo = np.where(biseccion, (abajo + arriba) / 2, nuevo)
+        # Sin tope conocido y sin paso finito (el retiro no afecta el saldo)
+        monto[activos] = np.where(np.isfinite(nuevo), nuevo, abajo)
+        activos = activos[~convergido]
+        if not len(activos):
+            break
+    return inferior.reshape(forma), pasada
+
+
+def retiro_sostenible(saldo_inicial, horizontes_anos, media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct,
+                      es_dolares, confianzas=CONFIANZAS, modalidad="fijo", antiguedad_meses=0, perfil=None, semilla=None,
+                      tolerancia=1e-4, max_iteraciones=40):
+    """
+    Retiro mensual máximo sostenible (horizonte x confianza): el mayor
+    monto cuyo riesgo de agotar el fondo antes del horizonte no supera
+    1 - confianza. En "indexado" es el primer retiro, que luego sigue a la
+    inflación.
+
+    Calcula el monto crítico de cada trayectoria y horizonte (ver
+    _retiros_criticos, precisión relativa `tolerancia`); el máximo
+    sostenible para una confianza es un cuantil de esos montos, así que
+    cualquier confianza sale sin volver a simular, igual que la
+    probabilidad de ruina de cualquier monto (prob_ruina_de_monto).
+    """
+    if modalidad == "programado":
+        raise ValueError("El retiro programado no se agota: no tiene un máximo sostenible")
+    inicio = time.perf_counter()
+    horizontes_anos = np.unique(np.asarray(horizontes_anos))
+    horizontes_meses = [int(h * 12) for h in horizontes_anos]
+    saldo_inicial, _, plan = _preparar(
+        saldo_inicial, horizontes_anos.max(), media_pct, volatilidad_pct, n_trayectorias, comision_pct, inflacion_pct,
+        es_dolares, modalidad, antiguedad_meses, 0.0, perfil, semilla
+    )
+    criticos, pasadas = _retiros_criticos(saldo_inicial, horizontes_meses, plan, tolerancia, max_iteraciones)
+    criticos.sort(axis=1)
+
+    # Con el monto crítico k-ésimo (de menor a mayor) se agotan las k
+    # trayectorias de montos críticos menores
+    n = plan["trayectorias"]
+    posicion = np.minimum(np.floor((1 - np.asarray(confianzas)) * n + 1e-9).astype(int), n - 1)
+    return {
+        "horizontes_anos": horizontes_anos,
+        "confianzas": np.asarray(confianzas),
+        "retiro_maximo": criticos[:, posicion],
+        "criticos": criticos,
+        "trayectorias": n,
+        "pasadas": pasadas,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def prob_ruina_de_monto(sostenible, montos):
+    """
+    Probabilidad de agotar el fondo antes de cada horizonte con cada monto
+    (horizonte x monto), a partir de los montos críticos ya calculados.
+    """
+    montos = np.atleast_1d(np.asarray(montos, dtype=float))
+    criticos = sostenible["criticos"]
+    return np.stack([np.searchsorted(fila, montos, side="left") for fila in criticos]) / criticos.shape[1]
+
+
+def tabla_sostenible(sostenible):
+    """
+    Tabla del retiro máximo sostenible: una fila por horizonte y una
+    columna por confianza.
+    """
+    import pandas as pd
+
+    return pd.DataFrame(
+        sostenible["retiro_maximo"],
+        index=pd.Index(sostenible["horizontes_anos"], name="Horizonte (Años)"),
+        columns=[f"{c:.0%} de confianza" for c in sostenible["confianzas"]],
+    )
@@ -0,0 +1,147 @@
+"""
+Barridos de sensibilidad: saldo final sobre mallas completas de tasa bruta
+x comisión x inflación x plazo.
+
+Sólo la tasa y la comisión cambian la trayectoria del saldo, así que la
+recurrencia se corre una vez por par (tasa, comisión), vectorizada entre
+pares y por bloques para acotar la memoria, hasta el plazo más largo. Los
+plazos se leen de esa misma trayectoria (el saldo del año T no depende de
+lo que pase después) y la inflación se aplica al final por broadcasting.
+"""
+import numpy as np
+
+from .bonificacion import matriz_por_mes
+from .cerrada import saldos_forma_cerrada
+from .paralelo import dividir_rango, mapear
+from .proyeccion import avanzar_mes, vector_aportes
+
+# Pares (tasa, comisión) por bloque de la recurrencia
+TAMANO_BLOQUE = 20_000
+
+EJES_BARRIDO = ("tasa_bruta_pct", "comision_pct", "inflacion_pct", "plazo_anos")
+
+
+def barrer_bloque(tasas_brutas_pct, comisiones_pct, inicial, aporte, extras, umbrales_saldo, porcentajes_mes,
+                  meses_registro, metodo="mensual"):
+    """
+    Recorre la recurrencia del saldo para un bloque de pares (tasa,
+    comisión) y devuelve el saldo nominal en cada mes de meses_registro
+    (pares x puntos). Misma aritmética que proyectar_escenarios; con
+    metodo="cerrada" salta entre tramos de bonificación (motor.cerrada).
+    """
+    tasa_mensual_bruta = (1 + tasas_brutas_pct / 100)**(1/12) - 1
+    factor_comision = comisiones_pct / 100
+    if metodo == "cerrada":
+        meses = np.full(len(tasas_brutas_pct), meses_registro[-1])
+        _, registro, _ = saldos_forma_cerrada(tasa_mensual_bruta, factor_comision, inicial, aporte, meses,
+                                              umbrales_saldo, porcentajes_mes, extras, meses_registro)
+        return registro
+
+    aportes = aporte + extras
+    aportes[0] = inicial
+    registro = np.empty((len(tasas_brutas_pct), len(meses_registro)))
+    posicion = np.full(len(aportes), -1)
+    posicion[meses_registro] = np.arange(len(meses_registro))
+
+    saldo = np.full(len(tasas_brutas_pct), float(aportes[0]))
+    for i in range(1, meses_registro[-1] + 1):
+        pct = porcentajes_mes[np.searchsorted(umbrales_saldo, saldo, side="right"), i]
+        saldo = avanzar_mes(saldo, tasa_mensual_bruta, factor_comision, pct, aportes[i])
+        if posicion[i] >= 0:
+            registro[:, posicion[i]] = saldo
+    return registro
+
+
+def _barrer_tarea(tarea):
+    return barrer_bloque(*tarea)
+
+
+def barrido_parametros(tasas_brutas_pct, comisiones_pct, inflaciones_pct, plazos_anos, aporte, inicial,
+                       abonos_map, es_dolares, tamano_bloque=TAMANO_BLOQUE, n_procesos=1, metodo="mensual"):
+    """
+    Saldo final de cada combinación de la malla tasas x comisiones x
+    inflaciones x plazos para un mismo plan (aporte, saldo inicial y
+    abonos). n_procesos > 1 reparte los bloques en un pool (ver mapear);
+    metodo="cerrada" usa el motor por tramos (ver motor.cerrada).
+
+    Devuelve los ejes de la malla, saldo_nominal (tasa x comisión x plazo;
+    no depende de la inflación) y saldo_real (tasa x comisión x inflación
+    x plazo).
+    """
+    tasas = np.atleast_1d(np.asarray(tasas_brutas_pct, dtype=float))
+    comisiones = np.atleast_1d(np.asarray(comisiones_pct, dtype=float))
+    inflaciones = np.atleast_1d(np.asarray(inflaciones_pct, dtype=float))
+    plazos = np.unique(np.asarray(plazos_anos, dtype=int))
+    if plazos[0] < 1:
+        raise ValueError("Los plazos deben ser de al menos 1 año")
+
+    meses_registro = plazos * 12
+    meses = int(meses_registro.max())
+    extras = vector_aportes(meses, 0.0, 0.0, abonos_map)
+    umbrales_saldo, porcentajes_mes = matriz_por_mes(meses, es_dolares)
+
+    # Pares (tasa, comisión) aplanados en orden tasa-mayor
+    pares_tasa = np.repeat(tasas, len(comisiones))
+    pares_comision = np.tile(comisiones, len(tasas))
+    bloques = dividir_rango(len(pares_tasa), tamano_bloque)
+    tareas = [
+        (pares_tasa[inicio:fin], pares_comision[inicio:fin], float(inicial), float(aporte), extras,
+         umbrales_saldo, porcentajes_mes, meses_registro, metodo)
+        for inicio, fin in bloques
+    ]
+
+    saldo_nominal = np.empty((len(pares_tasa), len(plazos)))
+    for (inicio, fin), registro in zip(bloques, mapear(_barrer_tarea, tareas, n_procesos)):
+        saldo_nominal[inicio:fin] = registro
+    saldo_nominal = saldo_nominal.reshape(len(tasas), len(comisiones), len(plazos))
+
+    inflacion_mensual = (1 + inflaciones / 100)**(1/12) - 1
+    factor_inflacion = (1 + inflacion_mensual[:, None])**meses_registro[None, :]
+
+    return {
+        "tasa_bruta_pct": tasas,
+        "comision_pct": comisiones,
+        "inflacion_pct": inflaciones,
+        "plazo_anos": plazos,
+        "saldo_nominal": saldo_nominal,
+        "saldo_real": saldo_nominal[:, :, None, :] / factor_inflacion[None, None, :, :],
+    }
+
+
+def corte_barrido(barrido, eje_x, eje_y, fijos, real=True):
+    """
+    Matriz 2-D (eje_y x eje_x) del barrido con los otros dos ejes fijos en
+    los valores de `fijos` ({eje: valor}); se toma el punto más cercano de
+    la malla. Devuelve (valores_y, valores_x, matriz).
+    """
+    datos = barrido["saldo_real"]
+    if not real:
+        datos = np.broadcast_to(barrido["saldo_nominal"][:, :, None, :], datos.shape)
+    indices = tuple(
+        slice(None) if eje in (eje_x, eje_y) else int(np.abs(barrido[eje] - fijos[eje]).argmin())
+        for eje in EJES_BARRIDO
+    )
+    corte = datos[indices]
+    # Los ejes que quedan están en el orden de EJES_BARRIDO
+    if EJES_BARRIDO.index(eje_y) > EJES_BARRIDO.index(eje_x):
+        corte = corte.T
+    return barrido[eje_y], barrido[eje_x], corte
+
+
+def tabla_barrido(barrido):
+    """
+    Barrido en formato largo (una fila por combinación) para exportar.
+    """
+    import pandas as pd
+
+    forma = barrido["saldo_real"].shape
+    indices = np.indices(forma).reshape(len(forma), -1)
+    tasa, comision, inflacion, plazo = indices
+    return pd.DataFrame({
+        "Tasa Bruta (%)": barrido["tasa_bruta_pct"][tasa],
+        "Comisión (%)": barrido["comision_pct"][comision],
+        "Inflación (%)": barrido["inflacion_pct"][inflacion],
+        "Plazo (Años)": barrido["plazo_anos"][plazo],
+        "Saldo Nominal": barrido["saldo_nominal"][tasa, comision, plazo],
+        "Saldo Real": barrido["saldo_real"].reshape(-1),
+    })
@@ -0,0 +1,108 @@
+"""
+Series para gráficos: extrae de las series mensuales del motor (arreglos
+NumPy indexados por mes) sólo los puntos que se van a dibujar.
+
+Las resoluciones fijas (anual, trimestral, mensual) toman un mes de cada
+tantos con un slice, sin copiar la serie; la "automática" reduce la serie
+mensual a un número de puntos con LTTB (Largest-Triangle-Three-Buckets),
+que conserva la forma de la curva (quiebres por abonos, cambios de tramo)
+mucho mejor que tomar un punto fijo de cada grupo.
+"""
+import numpy as np
+
+# Meses entre puntos de cada resolución fija
+RESOLUCIONES = {"anual": 12, "trimestral": 3, "mensual": 1}
+
+# Puntos por serie de la resolución automática
+PUNTOS_GRAFICO = 200
+
+# Máximo de saldos (trayectorias x meses registrados) que se guardan en
+# Monte Carlo para calcular bandas más finas que anuales (~160 MB)
+MAX_VALORES_MONTECARLO = 20_000_000
+
+
+def lttb(x, y, puntos):
+    """
+    Índices de los `puntos` que conservan la forma de la curva (x, y) según
+    LTTB. `y` puede ser 2-D (series x puntos): se elige el mismo índice para
+    todas las series, sumando el área de sus triángulos.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    n = len(x)
+    if puntos >= n:
+        return np.arange(n)
+    if puntos < 3:
+        raise ValueError("LTTB necesita al menos 3 puntos")
+
+    # Primer y último punto fijos; el resto se reparte en puntos - 2 grupos
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(np.int64)
+    elegidos = np.empty(puntos, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for k in range(puntos - 2):
+        inicio, fin = bordes[k], bordes[k + 1]
+        # Vértice C: promedio del grupo siguiente (o el último punto)
+        sig_inicio, sig_fin = (bordes[k + 1], bordes[k + 2]) if k + 2 < len(bordes) else (n - 1, n)
+        xc = x[sig_inicio:sig_fin].mean()
+        yc = y[:, sig_inicio:sig_fin].mean(axis=1, keepdims=True)
+        areas = np.abs((x[a] - xc) * (y[:, inicio:fin] - y[:, a:a + 1])
+                       - (x[a] - x[inicio:fin]) * (yc - y[:, a:a + 1])).sum(axis=0)
+        a = inicio + int(areas.argmax())
+        elegidos[k + 1] = a
+    return elegidos
+
+
+def indices_grafico(meses, resolucion="anual", series=None, puntos=PUNTOS_GRAFICO):
+    """
+    Posiciones a dibujar de una serie cuyos puntos corresponden a `meses`
+    (arreglo creciente; el último siempre se incluye). Con resolucion
+    "automatica" se aplica LTTB sobre `series` (lista de arreglos).
+    Devuelve un slice cuando alcanza (sin copia) o un arreglo de índices.
+    """
+    meses = np.asarray(meses)
+    if resolucion == "automatica":
+        return lttb(meses, np.vstack(series), puntos)
+    if resolucion not in RESOLUCIONES:
+        raise ValueError(f"Resolución desconocida: {resolucion} (use {', '.join([*RESOLUCIONES, 'automatica'])})")
+    paso = RESOLUCIONES[resolucion]
+    # Meses consecutivos desde 0 con el último múltiplo del paso: un slice basta
+    if meses[0] == 0 and (len(meses) - 1) % paso == 0 and np.all(np.diff(meses) == 1):
+        return slice(None, None, paso)
+    posiciones = np.flatnonzero(meses % paso == 0)
+    if not len(posiciones) or posiciones[-1] != len(meses) - 1:
+        posiciones = np.append(posiciones, len(meses) - 1)
+    return posiciones
+
+
+def tabla_grafico(series, meses=None, resolucion="anual", puntos=PUNTOS_GRAFICO):
+    """
+    DataFrame listo para st.line_chart/st.area_chart con una columna por
+    serie ({nombre: arreglo mensual}) y el tiempo en años como índice
+    ("Año"), con sólo los puntos de la resolución pedida.
+    """
+    import pandas as pd
+
+    valores = list(series.values())
+    meses = np.arange(len(valores[0])) if meses is None else np.asarray(meses)
+    indices = indices_grafico(meses, resolucion, valores, puntos)
+    anos = meses[indices] / 12
+    if np.all(anos == np.round(anos)):
+        anos = anos.astype(np.int64)
+    return pd.DataFrame(
+        {nombre: np.asarray(serie)[indices] for nombre, serie in series.items()},
+        index=pd.Index(anos, name="Año"),
+    )
+
+
+def paso_montecarlo(n_trayectorias, meses, resolucion="anual", max_valores=MAX_VALORES_MONTECARLO):
+    """
+    Paso (en meses) con el que Monte Carlo debe registrar los saldos para
+    dibujar bandas en `resolucion`, sin pasar de max_valores guardados;
+    si no alcanza la memoria, se usa la siguiente resolución más gruesa.
+    """
+    deseado = 1 if resolucion == "automatica" else RESOLUCIONES[resolucion]
+    for paso in sorted({deseado, *RESOLUCIONES.values()}):
+        if paso >= deseado and n_trayectorias * (meses // paso + 2) <= max_valores:
+            return paso
+    return RESOLUCIONES["anual"]
@@ -0,0 +1,357 @@
+"""
+Servicio HTTP/JSON de proyecciones para otros sistemas (CRM, app móvil de
+asesores) sin pasar por la página de Streamlit.
+
+Uso:
+    python -m motor.servicio --puerto 8080 --procesos 4
+
+Rutas:
+    POST /v1/proyeccion   plan -> resumen y series por escenario (y tabla
+                          mensual con "detalle": true)
+    POST /v1/resumen      plan -> sólo el resumen por escenario
+    POST /v1/lote         {"planes": [plan, ...]} -> resumen de cada plan
+    GET  /salud           estado, solicitudes en curso y caché
+    GET  /metricas        métricas en formato de texto de Prometheus
+
+El plan usa el mismo JSON que `python -m motor` (ver motor.cli), más las
+opciones "exacto", "redondeo", "resolucion" y "detalle".
+
+Es un servidor asyncio de la biblioteca estándar: las conexiones HTTP/1.1
+se mantienen abiertas entre solicitudes (keep-alive) y el cálculo corre en
+un pool de procesos, que también serializa la respuesta a JSON para no
+ocupar el bucle de eventos. Las solicitudes idénticas que llegan mientras
+otra igual está en curso esperan ese mismo cálculo en vez de repetirlo, y
+las respuestas recientes quedan en un CacheResultados.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+from .cache import CacheResultados
+from .cli import normalizar_plan
+from .escenarios import calcular_escenarios, resumir_resultado
+from .exacto import REDONDEOS
+from .instrumentacion import configurar_logs, medir_tramo, metricas_prometheus
+from .paralelo import procesos_disponibles
+from .proyeccion import columnas_detalle
+from .series import RESOLUCIONES, indices_grafico
+
+registro = logging.getLogger("motor.servicio")
+
+# Límites de cada solicitud
+MAX_BYTES_CUERPO = 2 * 1024**2
+MAX_PLANES_LOTE = 1_000
+
+# Segundos que una conexión keep-alive puede quedar inactiva
+ESPERA_INACTIVA = 30
+
+RUTAS = {
+    ("POST", "/v1/proyeccion"): "proyeccion",
+    ("POST", "/v1/resumen"): "resumen",
+    ("POST", "/v1/lote"): "lote",
+    ("GET", "/salud"): "salud",
+    ("GET", "/metricas"): "metricas",
+}
+
+MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+OPCIONES_PLAN = ("exacto", "redondeo", "resolucion", "detalle")
+
+
+class ErrorSolicitud(Exception):
+    """
+    Error del cliente: se responde con `estado` y el mensaje en JSON.
+    """
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _a_json(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, (np.integer, np.floating)):
+        return valor.item()
+    if isinstance(valor, (date, np.datetime64)):
+        return str(valor)
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+def a_bytes_json(valor):
+    return json.dumps(valor, ensure_ascii=False, default=_a_json).encode("utf-8")
+
+
+def leer_solicitud_plan(datos):
+    """
+    Separa las opciones de la solicitud y normaliza el plan (ValueError si
+    no es válido). Devuelve (plan, opciones).
+    """
+    if not isinstance(datos, dict):
+        raise ValueError("El plan debe ser un objeto JSON")
+    opciones = {
+        "exacto": bool(datos.get("exacto", False)),
+        "redondeo": datos.get("redondeo", "mitad_arriba"),
+        "resolucion": datos.get("resolucion", "anual"),
+        "detalle": bool(datos.get("detalle", False)),
+    }
+    if opciones["redondeo"] not in REDONDEOS:
+        raise ValueError(f"Redondeo desconocido: {opciones['redondeo']} (use {', '.join(REDONDEOS)})")
+    if opciones["resolucion"] not in (*RESOLUCIONES, "automatica"):
+        raise ValueError(f"Resolución desconocida: {opciones['resolucion']}")
+    plan = normalizar_plan({k: v for k, v in datos.items() if k not in OPCIONES_PLAN and k != "id"})
+    return plan, opciones
+
+
+def calcular_respuesta(plan, opciones, con_series=True):
+    """
+    Proyecta un plan normalizado y devuelve la respuesta ya serializada
+    (bytes JSON). Se ejecuta en los procesos del pool.
+    """
+    abonos_df = None
+    if plan["abonos"]:
+        import pandas as pd
+        abonos_df = pd.DataFrame(plan["abonos"], columns=["Fecha", "Monto"])
+
+    resultados = calcular_escenarios(
+        tuple(plan["escenarios"].values()), plan["plazo_anos"], plan["aporte_mensual"], plan["saldo_inicial"],
+        plan["comision_pct"], plan["inflacion_pct"], abonos_df, plan["fecha_inicio"], plan["moneda"] == "USD",
+        exacto=opciones["exacto"], redondeo=opciones["redondeo"]
+    )
+    escenarios = {}
+    for nombre, res in zip(plan["escenarios"], resultados):
+        escenario = {"tasa_bruta_pct": plan["escenarios"][nombre], **resumir_resultado(res)}
+        if con_series:
+            series = [res["serie_nominal"], res["serie_real"], res["serie_aportes"]]
+            indices = indices_grafico(np.arange(len(series[0])), opciones["resolucion"], series)
+            escenario["series"] = {
+                "mes": np.arange(len(series[0]))[indices],
+                "saldo_nominal": series[0][indices],
+                "saldo_real": series[1][indices],
+                "aportes_acumulados": series[2][indices],
+            }
+        if con_series and opciones["detalle"]:
+            escenario["detalle"] = columnas_detalle(res["proyeccion"])
+        escenarios[nombre] = escenario
+    return a_bytes_json({
+        "moneda": plan["moneda"],
+        "escenarios": escenarios,
+        "abonos_ignorados": resultados[0]["abonos_ignorados"] if resultados else [],
+    })
+
+
+def _calcular_resumen(plan, opciones):
+    return calcular_respuesta(plan, opciones, con_series=False)
+
+
+class ServicioProyecciones:
+    """
+    Despacha las rutas sobre un pool de procesos, con caché de respuestas y
+    unión de solicitudes idénticas en curso.
+    """
+
+    def __init__(self, n_procesos=None, cache=None):
+        self.n_procesos = n_procesos or procesos_disponibles()
+        self.cache = cache if cache is not None else CacheResultados(max_entradas=4096, max_bytes=256 * 1024**2, ttl_segundos=900)
+        self._pool = None
+        self._en_curso = {}
+        self.solicitudes = 0
+        self.unidas = 0
+        self.calculos = 0
+
+    def iniciar(self):
+        self._pool = ProcessPoolExecutor(max_workers=self.n_procesos)
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def calcular(self, funcion, plan, opciones):
+        """
+        Respuesta (bytes) para el plan: del caché, de un cálculo idéntico en
+        curso o de un cálculo nuevo en el pool.
+        """
+        clave = (funcion.__name__, json.dumps(plan, sort_keys=True, default=str), tuple(sorted(opciones.items())))
+        respuesta = self.cache.obtener(clave)
+        if respuesta is not None:
+            return respuesta
+
+        futuro = self._en_curso.get(clave)
+        if futuro is not None:
+            self.unidas += 1
+        else:
+            self.calculos += 1
+            futuro = asyncio.get_running_loop().run_in_executor(self._pool, funcion, plan, opciones)
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda f: self._terminar(clave, f))
+        # shield: si un cliente se desconecta, los demás siguen esperando
+        return await asyncio.shield(futuro)
+
+    def _terminar(self, clave, futuro):
+        if self._en_curso.get(clave) is futuro:
+            del self._en_curso[clave]
+        if not futuro.cancelled() and futuro.exception() is None:
+            self.cache.guardar(clave, futuro.result())
+
+    async def despachar(self, metodo, ruta, cuerpo):
+        """
+        Devuelve (estado, tipo de contenido, bytes) para una solicitud.
+        """
+        ruta = ruta.split("?", 1)[0]
+        nombre = RUTAS.get((metodo, ruta))
+        if nombre is None:
+            if any(r == ruta for _, r in RUTAS):
+                raise ErrorSolicitud(f"Método {metodo} no permitido en {ruta}", 405)
+            raise ErrorSolicitud(f"Ruta desconocida: {ruta}", 404)
+        self.solicitudes += 1
+
+        with medir_tramo(f"http_{nombre}"):
+            if nombre == "salud":
+                return 200, "application/json", a_bytes_json({
+                    "estado": "ok", "procesos": self.n_procesos, "en_curso": len(self._en_curso),
+                    "solicitudes": self.solicitudes, "calculos": self.calculos, "unidas": self.unidas,
+                    "cache": self.cache.estadisticas(),
+                })
+            if nombre == "metricas":
+                return 200, "text/plain; version=0.0.4", metricas_prometheus("servicio").encode("utf-8")
+
+            try:
+                datos = json.loads(cuerpo or b"null")
+            except ValueError as e:
+                raise ErrorSolicitud(f"JSON inválido: {e}") from e
+
+            if nombre == "lote":
+                return 200, "application/json", await self._lote(datos)
+            try:
+                plan, opciones = leer_solicitud_plan(datos)
+            except (ValueError, TypeError) as e:
+                raise ErrorSolicitud(str(e)) from e
+            funcion = calcular_respuesta if nombre == "proyeccion" else _calcular_resumen
+            try:
+                return 200, "application/json", await self.calcular(funcion, plan, opciones)
+            except (ValueError, OverflowError) as e:
+                raise ErrorSolicitud(str(e)) from e
+
+    async def _lote(self, datos):
+        planes = datos.get("planes") if isinstance(datos, dict) else None
+        if not isinstance(planes, list):
+            raise ErrorSolicitud('Se espera {"planes": [...]}')
+        if len(planes) > MAX_PLANES_LOTE:
+            raise ErrorSolicitud(f"A lo sumo {MAX_PLANES_LOTE} planes por lote", 413)
+
+        async def uno(n, datos_plan):
+            id_plan = datos_plan.get("id", n) if isinstance(datos_plan, dict) else n
+            encabezado = b'{"plan": ' + a_bytes_json(id_plan)
+            try:
+                plan, opciones = leer_solicitud_plan(datos_plan)
+                resultado = await self.calcular(_calcular_resumen, plan, opciones)
+            except (ValueError, TypeError, OverflowError) as e:
+                return encabezado + b', "error": ' + a_bytes_json(str(e)) + b"}"
+            return encabezado + b', "resultado": ' + resultado + b"}"
+
+        partes = await asyncio.gather(*(uno(n, d) for n, d in enumerate(planes, start=1)))
+        return b"[" + b", ".join(partes) + b"]"
+
+    async def atender(self, lector, escritor):
+        """
+        Atiende una conexión: solicitudes HTTP/1.1 sucesivas mientras el
+        cliente la mantenga abierta.
+        """
+        try:
+            while True:
+                try:
+                    linea = await asyncio.wait_for(lector.readline(), ESPERA_INACTIVA)
+                except asyncio.TimeoutError:
+                    break
+                if not linea.strip():
+                    break
+                partes = linea.decode("latin-1").split()
+                encabezados = {}
+                while True:
+                    cabecera = await lector.readline()
+                    if cabecera in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = cabecera.decode("latin-1").partition(":")
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                version = partes[2] if len(partes) == 3 else "HTTP/1.0"
+                conexion = encabezados.get("connection", "").lower()
+                mantener = conexion == "keep-alive" if version == "HTTP/1.0" else conexion != "close"
+                try:
+                    if len(partes) != 3:
+                        raise ErrorSolicitud("Línea de solicitud inválida")
+                    largo = encabezados.get("content-length") or "0"
+                    if not largo.isdigit():
+                        mantener = False
+                        raise ErrorSolicitud("Content-Length inválido")
+                    largo = int(largo)
+                    if largo > MAX_BYTES_CUERPO:
+                        mantener = False
+                        raise ErrorSolicitud(f"Cuerpo mayor a {MAX_BYTES_CUERPO} bytes", 413)
+                    cuerpo = await lector.readexactly(largo) if largo else b""
+                    estado, tipo, respuesta = await self.despachar(partes[0].upper(), partes[1], cuerpo)
+                except ErrorSolicitud as e:
+                    estado, tipo, respuesta = e.estado, "application/json", a_bytes_json({"error": str(e)})
+                except Exception:
+                    registro.exception("Error al atender %s", linea)
+                    estado, tipo, respuesta = 500, "application/json", a_bytes_json({"error": "Error interno"})
+
+                escritor.write(
+                    f"HTTP/1.1 {estado} {MOTIVOS.get(estado, '')}\r\n"
+                    f"Content-Type: {tipo}\r\n"
+                    f"Content-Length: {len(respuesta)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode("latin-1") + respuesta
+                )
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            escritor.close()
+
+
+async def servir(host="127.0.0.1", puerto=8080, n_procesos=None, listo=None):
+    """
+    Levanta el servicio y atiende hasta que se cancele. `listo` (un
+    asyncio.Event) se activa cuando el puerto ya acepta conexiones.
+    """
+    servicio = ServicioProyecciones(n_procesos)
+    servicio.iniciar()
+    try:
+        servidor = await asyncio.start_server(servicio.atender, host, puerto, backlog=1024)
+        registro.info("Servicio de proyecciones en http://%s:%d (%d procesos)", host, puerto, servicio.n_procesos)
+        if listo is not None:
+            listo.set()
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m motor.servicio", description="Servicio HTTP/JSON de proyecciones.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interfaz donde escuchar. Por defecto 127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080, help="Puerto. Por defecto 8080")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos de cálculo. Por defecto todos los núcleos")
+    args = parser.parse_args(argv)
+
+    configurar_logs(logging.WARNING)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.procesos))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
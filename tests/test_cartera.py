@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from motor import procesar_cartera, proyectar_cartera
+
+
+def cartera_aleatoria(n_planes, semilla=2025):
+    rng = np.random.default_rng(semilla)
+    es_dolares = rng.random(n_planes) < 0.3
+    return (
+        np.where(es_dolares, rng.integers(0, 50_000, n_planes), rng.integers(0, 20_000_000, n_planes)).astype(float),
+        np.where(es_dolares, rng.integers(10, 500, n_planes), rng.integers(5_000, 300_000, n_planes)).astype(float),
+        rng.integers(1, 51, n_planes) * 12,
+        es_dolares,
+        rng.uniform(2, 18, n_planes),
+    )
+
+
+@pytest.mark.parametrize("metodo", ["mensual", "cerrada"])
+def test_cartera_en_paralelo_igual_a_secuencial(metodo):
+    inicial, aporte, meses, es_dolares, tasas = cartera_aleatoria(2_500)
+    secuencial = proyectar_cartera(inicial, aporte, meses, es_dolares, tasas, 10.0, 3.0, metodo)
+    paralelo = proyectar_cartera(inicial, aporte, meses, es_dolares, tasas, 10.0, 3.0, metodo,
+                                 n_procesos=2, tamano_bloque=700)
+    assert secuencial.keys() == paralelo.keys()
+    for clave in secuencial:
+        np.testing.assert_array_equal(paralelo[clave], secuencial[clave])
+
+
+def test_procesar_cartera_en_paralelo(tmp_path):
+    inicial, aporte, meses, es_dolares, tasas = cartera_aleatoria(1_000)
+    entrada = tmp_path / "cartera.csv"
+    pd.DataFrame({
+        "id": np.arange(1_000), "saldo_inicial": inicial, "aporte_mensual": aporte, "plazo_anos": meses // 12,
+        "moneda": np.where(es_dolares, "USD", "CRC"), "tasa_bruta_pct": tasas,
+    }).to_csv(entrada, index=False)
+
+    procesar_cartera(entrada, tmp_path / "secuencial.csv", tamano_bloque=300)
+    stats = procesar_cartera(entrada, tmp_path / "paralelo.csv", tamano_bloque=300, n_procesos=2)
+    assert stats["planes"] == 1_000
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "paralelo.csv"), pd.read_csv(tmp_path / "secuencial.csv"))
@@ -0,0 +1,63 @@
+import asyncio
+import json
+from datetime import date
+
+import pytest
+
+from motor.cli import main, normalizar_plan
+from motor.servicio import ErrorSolicitud, ServicioProyecciones
+
+INVALIDOS = {
+    "escenarios_lista": {"escenarios": [9.0, 10.0]},
+    "escenarios_texto": {"escenarios": "Moderado"},
+    "escenarios_numero": {"escenarios": 10},
+    "escenarios_vacios": {"escenarios": {}},
+    "abonos_objeto": {"abonos": {"Fecha": "05/03/2026", "Monto": 1000}},
+    "saldo_texto": {"saldo_inicial": "mucho"},
+    "saldo_lista": {"saldo_inicial": [1, 2]},
+    "saldo_negativo": {"saldo_inicial": -1},
+    "aporte_negativo": {"aporte_mensual": -200},
+    "aporte_cronograma_negativo": {"aporte_mensual": {"0": 200, "60": -50}},
+    "plazo_objeto": {"plazo_anos": {"anos": 30}},
+    "fecha_numero": {"fecha_inicio": 20250115},
+    "fecha_texto": {"fecha_inicio": "15/01/2025"},
+}
+
+
+@pytest.mark.parametrize("caso", INVALIDOS)
+def test_plan_invalido_lanza_value_error(caso):
+    with pytest.raises(ValueError):
+        normalizar_plan(INVALIDOS[caso])
+
+
+def test_plan_valido():
+    plan = normalizar_plan({"saldo_inicial": "1000", "aporte_mensual": 0, "fecha_inicio": "2025-01-15"})
+    assert plan["saldo_inicial"] == 1000.0
+    assert plan["fecha_inicio"] == date(2025, 1, 15)
+
+
+@pytest.mark.parametrize("caso", ["escenarios_lista", "escenarios_texto", "saldo_negativo"])
+def test_servicio_responde_400(caso):
+    servicio = ServicioProyecciones(n_procesos=1)
+    cuerpo = json.dumps(INVALIDOS[caso]).encode("utf-8")
+    with pytest.raises(ErrorSolicitud) as error:
+        asyncio.run(servicio.despachar("POST", "/v1/resumen", cuerpo))
+    assert error.value.estado == 400
+
+
+def test_lote_informa_cada_plan_con_error(tmp_path, capsys):
+    planes = [
+        5,
+        "plan",
+        [1, 2],
+        {"id": "grande", "saldo_inicial": 1e12, "plazo_anos": 50},
+        {"id": "bueno", "aporte_mensual": 200, "plazo_anos": 10},
+    ]
+    ruta = tmp_path / "planes.json"
+    ruta.write_text(json.dumps(planes), encoding="utf-8")
+
+    assert main([str(ruta), "--exacto"]) == 0
+    salida = capsys.readouterr()
+    assert [r["plan"] for r in json.loads(salida.out)] == ["bueno"]
+    for id_plan in ("Plan 1:", "Plan 2:", "Plan 3:", "Plan grande:"):
+        assert id_plan in salida.err
@@ -0,0 +1,83 @@
+from datetime import date
+from decimal import ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+
+from motor import matriz_por_mes
+from motor.exacto import ESCALA_TASA, proyectar_escenarios_centimos
+
+MODOS_DECIMAL = {"mitad_arriba": ROUND_HALF_UP, "mitad_par": ROUND_HALF_EVEN}
+INICIO = date(2025, 1, 15)
+
+
+def saldos_decimal(lote, k, comision_pct, es_dolares):
+    """
+    Recurrencia de un escenario con Decimal, con las mismas reglas de
+    redondeo que motor.exacto. Devuelve los saldos en céntimos.
+    """
+    modo = MODOS_DECIMAL[lote["redondeo"]]
+    meses = len(lote["aporte_centimos"]) - 1
+    umbrales, porcentajes = matriz_por_mes(meses, es_dolares)
+    tasa = Decimal(int(round(lote["tasa_mensual_bruta"][k] * ESCALA_TASA))) / ESCALA_TASA
+    comision = Decimal(str(comision_pct)) / 100
+    aportes = [Decimal(int(c)) for c in lote["aporte_centimos"]]
+
+    saldo = aportes[0]
+    saldos = [int(saldo)]
+    for i in range(1, meses + 1):
+        fila = int(np.searchsorted(umbrales * 100, int(saldo), side="right"))
+        rendimiento = (saldo * tasa).quantize(Decimal(1), modo)
+        comision_bruta = (rendimiento * comision).quantize(Decimal(1), modo)
+        bonificacion = (comision_bruta * Decimal(str(porcentajes[fila, i])) / 100).quantize(Decimal(1), modo)
+        saldo = saldo + rendimiento - (comision_bruta - bonificacion) + aportes[i]
+        saldos.append(int(saldo))
+    return np.array(saldos, dtype=np.int64)
+
+
+def comparar(tasas, anos, aporte, inicial, comision, abonos, es_dolares, redondeo):
+    lote = proyectar_escenarios_centimos(tasas, anos, aporte, inicial, comision, 3.0, abonos, INICIO, es_dolares, redondeo)
+    for k in range(len(tasas)):
+        np.testing.assert_array_equal(lote["saldo_centimos"][k], saldos_decimal(lote, k, comision, es_dolares))
+    return lote
+
+
+CASOS = {
+    # Comisión del 50 %: media comisión de un rendimiento impar cae justo en medio céntimo
+    "crc_empates": dict(anos=10, aporte=50_000.005, inicial=999_999.99, comision=50.0, abonos={1: 0.015, 120: 2_000_000},
+                        es_dolares=False),
+    "usd_empates": dict(anos=10, aporte=100.005, inicial=1_999.99, comision=50.0, abonos={1: 0.015, 120: 4_000},
+                        es_dolares=True),
+    "crc_cruza_tramos": dict(anos=30, aporte=150_000.37, inicial=0.0, comision=12.3456, abonos={48: 3_000_000.5},
+                             es_dolares=False),
+    "usd_cruza_tramos": dict(anos=30, aporte=300.37, inicial=0.0, comision=12.3456, abonos={48: 6_000.5},
+                             es_dolares=True),
+}
+
+
+@pytest.mark.parametrize("redondeo", list(MODOS_DECIMAL))
+@pytest.mark.parametrize("caso", CASOS)
+def test_exacto_igual_a_decimal(caso, redondeo):
+    comparar([0.0, 4.0, 10.5, 18.0], **CASOS[caso], redondeo=redondeo)
+
+
+@pytest.mark.parametrize("caso", ["crc_empates", "usd_empates"])
+def test_redondeos_distintos_en_empates(caso):
+    arriba = comparar([10.5], **CASOS[caso], redondeo="mitad_arriba")
+    par = comparar([10.5], **CASOS[caso], redondeo="mitad_par")
+    # Los casos con empates sí distinguen los dos modos
+    assert (arriba["saldo_centimos"] != par["saldo_centimos"]).any()
+
+
+def test_exacto_planes_aleatorios():
+    rng = np.random.default_rng(2025)
+    for _ in range(30):
+        anos = int(rng.integers(1, 51))
+        es_dolares = bool(rng.random() < 0.5)
+        escala = 1 if es_dolares else 500
+        abonos = {int(rng.integers(1, anos * 12 + 1)): float(rng.uniform(1, 100_000)) * escala
+                  for _ in range(rng.integers(0, 4))}
+        comparar(
+            rng.uniform(0, 20, 2), anos, float(rng.uniform(0, 400)) * escala, float(rng.uniform(0, 20_000)) * escala,
+            round(float(rng.uniform(0, 30)), 2), abonos, es_dolares, str(rng.choice(list(MODOS_DECIMAL)))
+        )
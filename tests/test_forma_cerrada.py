@@ -0,0 +1,72 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from motor import matriz_por_mes, proyectar_escenarios, vector_aportes
+from motor.cerrada import saldos_forma_cerrada
+
+# La forma cerrada reordena las operaciones de la recurrencia: se compara con
+# tolerancia relativa, no al céntimo
+TOLERANCIA = 1e-9
+
+TASAS = [0.0, 4.0, 10.0, 18.0]
+
+CASOS = {
+    # Saldo inicial a un céntimo del umbral: cruza en el primer mes
+    "crc_bajo_umbral": dict(anos=10, aporte=50_000, inicial=999_999.99, comision=10.0, abonos={}, es_dolares=False),
+    "crc_en_umbral": dict(anos=10, aporte=50_000, inicial=1_000_000, comision=10.0, abonos={}, es_dolares=False),
+    "usd_bajo_umbral": dict(anos=10, aporte=100, inicial=1_999.99, comision=10.0, abonos={}, es_dolares=True),
+    "usd_en_umbral": dict(anos=10, aporte=100, inicial=2_000, comision=10.0, abonos={}, es_dolares=True),
+    # Aporte que recorre todas las filas de la matriz a lo largo de los cortes de antigüedad
+    "crc_cruza_tramos": dict(anos=40, aporte=150_000, inicial=0, comision=25.0, abonos={}, es_dolares=False),
+    "usd_cruza_tramos": dict(anos=40, aporte=300, inicial=0, comision=25.0, abonos={}, es_dolares=True),
+    # Abonos que saltan una o varias filas a mitad de un tramo de antigüedad
+    "crc_abono_cruza_umbral": dict(anos=12, aporte=20_000, inicial=900_000, comision=15.0,
+                                   abonos={30: 1_500_000, 61: 7_000_000, 144: 40_000_000}, es_dolares=False),
+    "usd_abono_cruza_umbral": dict(anos=12, aporte=40, inicial=1_800, comision=15.0,
+                                   abonos={1: 250, 30: 3_000, 85: 15_000}, es_dolares=True),
+    "sin_aporte_con_abonos": dict(anos=9, aporte=0, inicial=0, comision=20.0,
+                                  abonos={24: 999_999.99, 48: 0.02, 72: 3_000_000}, es_dolares=False),
+}
+
+
+def error_relativo(valor, referencia):
+    return float(np.nanmax(np.abs(valor - referencia) / np.maximum(np.abs(referencia), 1.0)))
+
+
+def comparar(tasas, anos, aporte, inicial, comision, abonos, es_dolares):
+    meses = anos * 12
+    lote = proyectar_escenarios(tasas, anos, aporte, inicial, comision, 3.0, abonos, date(2025, 1, 1), es_dolares)
+    umbrales, porcentajes = matriz_por_mes(meses, es_dolares)
+    registro_meses = np.arange(meses + 1)
+    saldo, registro, _ = saldos_forma_cerrada(
+        lote["tasa_mensual_bruta"], comision / 100, inicial, aporte, np.full(len(tasas), meses),
+        umbrales, porcentajes, vector_aportes(meses, 0.0, 0.0, abonos), registro_meses
+    )
+    assert error_relativo(saldo, lote["saldo_final"][:, -1]) <= TOLERANCIA
+    assert error_relativo(registro, lote["saldo_final"]) <= TOLERANCIA
+    return lote, umbrales
+
+
+@pytest.mark.parametrize("caso", CASOS)
+def test_forma_cerrada_igual_a_recurrencia(caso):
+    lote, umbrales = comparar(TASAS, **CASOS[caso])
+    # El caso realmente cambia de fila de la matriz durante el plazo
+    filas = np.searchsorted(umbrales, lote["saldo_final"][1:, :-1], side="right")
+    assert (filas.max(axis=1) > filas.min(axis=1)).all()
+
+
+def test_forma_cerrada_planes_aleatorios():
+    rng = np.random.default_rng(2025)
+    for _ in range(40):
+        anos = int(rng.integers(1, 51))
+        meses = anos * 12
+        es_dolares = bool(rng.random() < 0.5)
+        escala = 1 if es_dolares else 500
+        abonos = {int(rng.integers(1, meses + 1)): float(rng.integers(1, 100_000)) * escala
+                  for _ in range(rng.integers(0, 4))}
+        comparar(
+            rng.uniform(0, 20, 5), anos, float(rng.integers(0, 400)) * escala, float(rng.integers(0, 20_000)) * escala,
+            float(rng.uniform(0, 30)), abonos, es_dolares
+        )
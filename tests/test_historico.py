@@ -0,0 +1,39 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from motor import backtesting, leer_serie_historica
+
+
+def serie_csv(filas):
+    return io.BytesIO(pd.DataFrame(filas).to_csv(index=False).encode("utf-8"))
+
+
+@pytest.mark.parametrize("columna", ["IPC", "Inflación"])
+def test_orden_del_archivo_no_cambia_la_serie(columna):
+    meses = pd.period_range("2000-01", periods=36, freq="M")
+    rng = np.random.default_rng(7)
+    if columna == "IPC":
+        valores = 100 * 1.01**np.arange(36)
+    else:
+        valores = np.full(36, 1.0)
+    filas = {
+        "Fecha": [m.to_timestamp().strftime("%d/%m/%Y") for m in meses],
+        "Rendimiento": rng.normal(0.8, 2.0, 36).round(4),
+        columna: valores,
+    }
+    ascendente = leer_serie_historica(serie_csv(filas), "serie.csv")
+    descendente = leer_serie_historica(serie_csv({k: v[::-1] for k, v in filas.items()}), "serie.csv")
+
+    for clave in ("fechas", "rendimiento", "inflacion"):
+        assert np.array_equal(ascendente[clave], descendente[clave]), clave
+    # Con IPC el primer mes no tiene inflación y se descarta
+    assert ascendente["fechas"][0] == np.datetime64("2000-02" if columna == "IPC" else "2000-01", "M")
+    assert np.allclose(ascendente["inflacion"], 0.01)
+
+    plan = (2, 10_000, 100_000, 10, {}, False)
+    a, d = backtesting(ascendente, *plan), backtesting(descendente, *plan)
+    assert np.array_equal(a["saldo_real"], d["saldo_real"])
+    assert np.array_equal(a["saldo_final"], d["saldo_final"])
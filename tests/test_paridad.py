@@ -0,0 +1,270 @@
+"""
+Paridad al céntimo del motor vectorizado con el cálculo original de la
+calculadora (bucle mes a mes sobre iterrows), copiado abajo tal cual estaba
+antes de extraer el motor. Los resultados deben ser idénticos bit a bit:
+saldos nominal y real, tabla detallada y mensajes de abonos ignorados.
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from motor import calcular_escenario_completo, construir_df_detalle
+
+
+# --- CÁLCULO ORIGINAL (congelado, no modificar) ---
+def obtener_tasa_bonificacion_original(meses_antiguedad, saldo_acumulado, es_dolares=False):
+    if meses_antiguedad < 24:
+        col_idx = 0
+    elif meses_antiguedad < 48:
+        col_idx = 1
+    elif meses_antiguedad < 72:
+        col_idx = 2
+    elif meses_antiguedad < 96:
+        col_idx = 3
+    else:
+        col_idx = 4
+
+    porcentajes = [0.0] * 5
+
+    if not es_dolares:
+        if saldo_acumulado < 1000000:
+            porcentajes = [0.0, 1.00, 2.50, 4.50, 6.00]
+        elif saldo_acumulado < 2000000:
+            porcentajes = [1.00, 2.50, 4.00, 6.00, 8.00]
+        elif saldo_acumulado < 5000000:
+            porcentajes = [2.00, 4.50, 6.00, 8.00, 12.00]
+        elif saldo_acumulado < 10000000:
+            porcentajes = [3.00, 6.50, 9.00, 12.00, 15.00]
+        elif saldo_acumulado < 50000000:
+            porcentajes = [5.50, 8.50, 12.00, 15.00, 18.00]
+        elif saldo_acumulado < 100000000:
+            porcentajes = [7.50, 10.50, 15.00, 18.00, 21.00]
+        else:
+            porcentajes = [9.50, 12.50, 18.00, 21.00, 25.00]
+    else:
+        if saldo_acumulado < 2000:
+            porcentajes = [0.0, 1.00, 2.50, 4.50, 6.00]
+        elif saldo_acumulado < 4000:
+            porcentajes = [1.00, 2.50, 4.00, 6.00, 8.00]
+        elif saldo_acumulado < 10000:
+            porcentajes = [2.00, 4.50, 6.00, 8.00, 12.00]
+        elif saldo_acumulado < 20000:
+            porcentajes = [3.00, 6.50, 9.00, 12.00, 15.00]
+        elif saldo_acumulado < 100000:
+            porcentajes = [5.50, 8.50, 12.00, 15.00, 18.00]
+        elif saldo_acumulado < 200000:
+            porcentajes = [7.50, 10.50, 15.00, 18.00, 21.00]
+        else:
+            porcentajes = [9.50, 12.50, 18.00, 21.00, 25.00]
+
+    return porcentajes[col_idx]
+
+
+def calcular_escenario_original(tasa_bruta_pct, anos, aporte, inicial, comision_pct, inflacion_pct, abonos_extra_df, start_date, es_dolares):
+    meses = int(anos * 12)
+    abonos_map = {}
+    abonos_ignorados = []
+
+    if start_date is None:
+        start_date = date.today()
+
+    if not abonos_extra_df.empty:
+        df_limpio = abonos_extra_df.copy()
+        for index, row in df_limpio.iterrows():
+            try:
+                raw_fecha = row.get("Fecha")
+                fecha_abono = None
+
+                if isinstance(raw_fecha, (date, datetime)):
+                    fecha_abono = raw_fecha if isinstance(raw_fecha, date) else raw_fecha.date()
+                elif isinstance(raw_fecha, pd.Timestamp):
+                    fecha_abono = raw_fecha.date()
+                elif isinstance(raw_fecha, str) and raw_fecha.strip():
+                    try:
+                        ts = pd.to_datetime(raw_fecha, dayfirst=True)
+                        fecha_abono = ts.date()
+                    except:
+                        pass
+
+                if not fecha_abono: continue
+
+                monto_raw = row.get("Monto")
+                if isinstance(monto_raw, str):
+                    monto_raw = monto_raw.replace(",", "").replace("₡", "").replace("$", "").strip()
+
+                monto_abono = pd.to_numeric(monto_raw, errors='coerce')
+
+                if pd.isna(monto_abono) or monto_abono <= 0: continue
+
+                monto_abono = float(monto_abono)
+
+                diff_meses = (fecha_abono.year - start_date.year) * 12 + (fecha_abono.month - start_date.month)
+
+                if 0 <= diff_meses < meses:
+                    abonos_map[diff_meses] = abonos_map.get(diff_meses, 0) + monto_abono
+                elif diff_meses < 0:
+                    abonos_ignorados.append(f"Fila {index+1}: Fecha {fecha_abono.strftime('%d/%m/%Y')} es anterior al inicio")
+                else:
+                    abonos_ignorados.append(f"Fila {index+1}: Fecha fuera del plazo ({anos} años)")
+
+            except Exception:
+                continue
+
+    tasa_anual_bruta = tasa_bruta_pct / 100
+    tasa_mensual_bruta = (1 + tasa_anual_bruta)**(1/12) - 1
+    inflacion_mensual = (1 + inflacion_pct/100)**(1/12) - 1
+
+    valores_nominales = [inicial]
+    serie_aportes = [inicial]
+    serie_real = [inicial]
+    filas_detalle = []
+
+    saldo_actual = inicial
+    total_depositado = inicial
+
+    filas_detalle.append({
+        "Mes": 0,
+        "Fecha": start_date,
+        "Antigüedad (Meses)": 0,
+        "Saldo Inicial": 0,
+        "Aporte Total": inicial,
+        "Rendimiento Bruto": 0,
+        "Comisión Bruta": 0,
+        "% Bonificación": 0,
+        "Monto Bonificación": 0,
+        "Comisión Real": 0,
+        "Rendimiento Neto": 0,
+        "Saldo Final": inicial
+    })
+
+    for i in range(1, meses + 1):
+        fecha_mes = pd.Timestamp(start_date) + pd.DateOffset(months=i)
+        extra_este_mes = abonos_map.get(i, 0)
+        saldo_inicial_mes = saldo_actual
+        rendimiento_bruto = saldo_inicial_mes * tasa_mensual_bruta
+        comision_bruta = rendimiento_bruto * (comision_pct / 100)
+        pct_bonificacion = obtener_tasa_bonificacion_original(i, saldo_inicial_mes, es_dolares)
+        monto_bonificacion = comision_bruta * (pct_bonificacion / 100)
+        comision_real = comision_bruta - monto_bonificacion
+        rendimiento_neto = rendimiento_bruto - comision_real
+        aporte_total_mes = aporte + extra_este_mes
+        nuevo_saldo = saldo_inicial_mes + rendimiento_neto + aporte_total_mes
+        nuevo_aporte_acumulado = total_depositado + aporte_total_mes
+        factor_inflacion = (1 + inflacion_mensual)**i
+        saldo_real = nuevo_saldo / factor_inflacion
+
+        valores_nominales.append(nuevo_saldo)
+        serie_aportes.append(nuevo_aporte_acumulado)
+        serie_real.append(saldo_real)
+
+        filas_detalle.append({
+            "Mes": i,
+            "Fecha": fecha_mes.date(),
+            "Antigüedad (Meses)": i,
+            "Saldo Inicial": saldo_inicial_mes,
+            "Aporte Total": aporte_total_mes,
+            "Rendimiento Bruto": rendimiento_bruto,
+            "Comisión Bruta": comision_bruta,
+            "% Bonificación": pct_bonificacion,
+            "Monto Bonificación": monto_bonificacion,
+            "Comisión Real": comision_real,
+            "Rendimiento Neto": rendimiento_neto,
+            "Saldo Final": nuevo_saldo
+        })
+
+        saldo_actual = nuevo_saldo
+        total_depositado = nuevo_aporte_acumulado
+
+    return {
+        "serie_nominal": valores_nominales,
+        "serie_real": serie_real,
+        "saldo_nominal": valores_nominales[-1],
+        "saldo_real": serie_real[-1],
+        "total_depositado": total_depositado,
+        "abonos_ignorados": abonos_ignorados,
+        "df_detalle": pd.DataFrame(filas_detalle),
+    }
+
+
+# --- CASOS ---
+INICIO = date(2025, 1, 31)
+SIN_ABONOS = pd.DataFrame(columns=["Fecha", "Monto"])
+
+
+def abonos(*filas):
+    return pd.DataFrame(list(filas), columns=["Fecha", "Monto"])
+
+
+CASOS = {
+    # Saldos que quedan justo en el umbral de un tramo (saldo sin rendimiento ni aporte)
+    "crc_bajo_umbral": (10.0, 2, 0, 999_999.99, 10, 3, SIN_ABONOS, INICIO, False),
+    "crc_en_umbral": (10.0, 2, 0, 1_000_000, 10, 3, SIN_ABONOS, INICIO, False),
+    "crc_tasa_cero_en_umbral": (0.0, 9, 0, 1_000_000, 10, 3, SIN_ABONOS, INICIO, False),
+    "usd_bajo_umbral": (8.0, 2, 0, 1_999.99, 10, 3, SIN_ABONOS, INICIO, True),
+    "usd_en_umbral": (8.0, 2, 0, 2_000, 10, 3, SIN_ABONOS, INICIO, True),
+    "usd_tasa_cero_en_umbral": (0.0, 9, 0, 2_000, 10, 3, SIN_ABONOS, INICIO, True),
+    # Cruza varios tramos de saldo y los cambios de antigüedad 24/48/72/96
+    "crc_cruza_tramos": (12.0, 10, 150_000, 900_000, 12, 4, SIN_ABONOS, INICIO, False),
+    "usd_cruza_tramos": (9.0, 10, 150, 1_900, 8, 2.5, SIN_ABONOS, INICIO, True),
+    "plazo_en_limite_antiguedad": (7.0, 8, 50_000, 0, 10, 3, SIN_ABONOS, INICIO, False),
+    # Abonos en el primer y el último mes del plazo, fuera del plazo y antes del inicio
+    "abonos_bordes": (10.0, 4, 20_000, 100_000, 10, 3, abonos(
+        (date(2025, 1, 15), 500_000),
+        (date(2025, 2, 1), 250_000),
+        (date(2028, 12, 31), 777_777.77),
+        (date(2029, 1, 1), 1_000),
+        (date(2024, 12, 31), 1_000),
+    ), INICIO, False),
+    "abonos_texto_usd": (6.0, 3, 100, 1_000, 10, 3, abonos(
+        ("01/02/2025", "$1,500"),
+        ("28/12/2027", "2,000.50"),
+        ("15/01/2029", "300"),
+        (pd.Timestamp("2026-06-30"), 999.99),
+    ), INICIO, True),
+    "fin_de_mes_bisiesto": (10.0, 5, 10_000, 0, 10, 3, SIN_ABONOS, date(2024, 2, 29), False),
+}
+
+
+@pytest.mark.parametrize("nombre", CASOS)
+def test_paridad_con_calculo_original(nombre):
+    plan = CASOS[nombre]
+    original = calcular_escenario_original(*plan)
+    nuevo = calcular_escenario_completo(*plan)
+
+    assert np.array_equal(np.asarray(nuevo["serie_nominal"]), np.asarray(original["serie_nominal"], dtype=float))
+    assert np.array_equal(np.asarray(nuevo["serie_real"]), np.asarray(original["serie_real"], dtype=float))
+    assert nuevo["saldo_nominal"] == original["saldo_nominal"]
+    assert nuevo["saldo_real"] == original["saldo_real"]
+    assert nuevo["total_depositado"] == original["total_depositado"]
+    assert nuevo["abonos_ignorados"] == original["abonos_ignorados"]
+
+    detalle = construir_df_detalle(nuevo["proyeccion"])
+    esperado = original["df_detalle"]
+    assert list(detalle.columns) == list(esperado.columns)
+    assert [pd.Timestamp(f).date() for f in detalle["Fecha"]] == list(esperado["Fecha"])
+    for columna in esperado.columns.drop("Fecha"):
+        assert np.array_equal(detalle[columna].to_numpy(dtype=float), esperado[columna].to_numpy(dtype=float)), columna
+
+
+def test_paridad_planes_aleatorios():
+    rng = np.random.default_rng(2025)
+    for _ in range(30):
+        es_dolares = bool(rng.random() < 0.5)
+        escala = 1 if es_dolares else 500
+        anos = int(rng.integers(1, 16))
+        filas = [
+            (date(2025 + int(rng.integers(-1, anos + 1)), int(rng.integers(1, 13)), int(rng.integers(1, 29))),
+             float(rng.integers(1, 5_000)) * escala)
+            for _ in range(rng.integers(0, 5))
+        ]
+        plan = (
+            float(rng.uniform(0, 20)), anos, float(rng.integers(0, 400)) * escala, float(rng.integers(0, 5_000)) * escala,
+            float(rng.uniform(0, 30)), float(rng.uniform(0, 8)), abonos(*filas), INICIO, es_dolares,
+        )
+        original = calcular_escenario_original(*plan)
+        nuevo = calcular_escenario_completo(*plan)
+        assert np.array_equal(np.asarray(nuevo["serie_nominal"]), np.asarray(original["serie_nominal"], dtype=float))
+        assert np.array_equal(np.asarray(nuevo["serie_real"]), np.asarray(original["serie_real"], dtype=float))
+        assert nuevo["abonos_ignorados"] == original["abonos_ignorados"]